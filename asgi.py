@@ -0,0 +1,289 @@
+"""웹훅 비동기 수신 서버 (ASGI)
+
+사용법: python asgi.py [--host 0.0.0.0] [--port 8001] [--workers 4] [--queue 1000] [--server auto|uvicorn|builtin]
+
+- uvicorn 이 설치되어 있으면 uvicorn 으로, 없으면 내장 asyncio HTTP 서버로 실행한다.
+- uvicorn 에서 직접 불러올 때는 'asgi:application' (예: uvicorn asgi:application --port 8001).
+
+  POST /webhook              잔디 웹훅 JSON (Flask /webhook 과 같은 본문) → 큐에 넣고 바로
+                             202 {"success": true, "queued": true, "ticket": 번호}
+  POST /webhook?wait=1       처리가 끝날 때까지 기다렸다가 Flask /webhook 과 같은 응답 (만들어진 record 포함)
+  GET  /webhook/tickets/번호 처리 결과 ({"status": "queued"} 또는 {"status": "done", "result": 응답})
+  GET  /webhook/stats        큐 길이 / 처리 건수 / 지연 시간
+
+큐가 가득 차면 503 + Retry-After (wait 요청은 WEBHOOK_WAIT_TIMEOUT 초까지 자리가 나길 기다림).
+202 응답은 메모리 큐에 들어갔다는 뜻이다 (정상 종료 때는 남은 웹훅을 처리하고 끝남).
+기록이 저장된 것까지 확인해야 하는 호출은 wait=1 을 쓴다.
+
+기록/원장/알림은 server 모듈을 그대로 쓰므로 (같은 파일 락/SQLite) wsgi.py 워커와 함께 띄울 수 있다.
+이 서버는 웹훅만 받고, 나머지 페이지/API 는 wsgi.py (또는 server.py) 가 맡는다.
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+from urllib.parse import parse_qs, unquote
+
+import server
+from webhook_pipeline import QueueFull, WebhookPipeline
+
+try:
+    import uvicorn
+except ImportError:  # uvicorn 없음 → 내장 서버
+    uvicorn = None
+
+# 큐 크기 / 처리 스레드 수 / wait 요청이 큐 자리를 기다리는 최대 시간(초) / 요청 본문 최대 크기
+WEBHOOK_QUEUE_SIZE = int(os.environ.get('WEBHOOK_QUEUE_SIZE', 1000))
+WEBHOOK_WORKERS = int(os.environ.get('WEBHOOK_WORKERS', 4))
+WEBHOOK_WAIT_TIMEOUT = float(os.environ.get('WEBHOOK_WAIT_TIMEOUT', 30))
+MAX_BODY = 1024 * 1024
+
+TICKET_PREFIX = '/webhook/tickets/'
+
+
+def json_response(body, status=200, headers=()):
+    """(상태, ASGI 헤더 목록, 본문 bytes)"""
+    data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+    return status, [(b'content-type', b'application/json'),
+                    (b'content-length', str(len(data)).encode())] + list(headers), data
+
+
+async def read_body(receive):
+    """요청 본문 전체 (MAX_BODY 를 넘으면 None)"""
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > MAX_BODY:
+            return None
+        chunks.append(chunk)
+        if not message.get('more_body'):
+            break
+    return b''.join(chunks)
+
+
+class WebhookApp:
+    """웹훅 수신 ASGI 앱 (파이프라인 시작/종료는 lifespan, lifespan 이 없는 서버는 첫 요청 때 시작)"""
+
+    def __init__(self, pipeline, wait_timeout=WEBHOOK_WAIT_TIMEOUT):
+        self.pipeline = pipeline
+        self.wait_timeout = wait_timeout
+
+    async def startup(self):
+        if not self.pipeline.running:
+            await self.pipeline.start()
+
+    async def shutdown(self):
+        await self.pipeline.stop()
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        await self.startup()
+        status, headers, body = await self._route(scope, receive)
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await self.startup()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _route(self, scope, receive):
+        path, method = scope['path'], scope['method']
+        if path == '/webhook':
+            if method != 'POST':
+                return json_response({'error': 'POST 만 지원합니다.'}, 405, [(b'allow', b'POST')])
+            query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+            wait = query.get('wait', [''])[0].lower() in ('1', 'true', 'yes')
+            return await self._webhook(receive, wait)
+        if path == '/webhook/stats' and method == 'GET':
+            return json_response(self.pipeline.metrics())
+        if path.startswith(TICKET_PREFIX) and method == 'GET':
+            return self._ticket(path[len(TICKET_PREFIX):])
+        return json_response({'error': '웹훅 수신 서버입니다 (POST /webhook). 다른 페이지는 웹 서버로 접속하세요.'}, 404)
+
+    async def _webhook(self, receive, wait):
+        body = await read_body(receive)
+        if body is None:
+            return json_response({'success': False, 'error': '요청 본문이 너무 큽니다.'}, 413)
+        try:
+            webhook_data = json.loads(body) if body.strip() else None
+        except ValueError as e:
+            return json_response({'success': False, 'error': f'JSON 형식이 아닙니다: {e}'}, 400)
+
+        busy = json_response({'success': False, 'error': '처리 대기 중인 웹훅이 많습니다. 잠시 후 다시 보내주세요.'},
+                             503, [(b'retry-after', b'1')])
+        if wait:
+            try:
+                ticket, result, status = await self.pipeline.process(webhook_data, self.wait_timeout)
+            except QueueFull:
+                return busy
+            return json_response(result, status, [(b'x-webhook-ticket', str(ticket).encode())])
+
+        try:
+            ticket = self.pipeline.submit(webhook_data)
+        except QueueFull:
+            return busy
+        return json_response({'success': True, 'queued': True, 'ticket': ticket}, 202)
+
+    def _ticket(self, value):
+        try:
+            ticket = int(unquote(value))
+        except ValueError:
+            return json_response({'error': '잘못된 티켓 번호입니다.'}, 400)
+        state, result = self.pipeline.status(ticket)
+        if state is None:
+            return json_response({'error': '티켓을 찾을 수 없습니다 (오래된 결과는 지워짐).'}, 404)
+        if state == 'queued':
+            return json_response({'status': 'queued'})
+        body, status = result
+        return json_response({'status': 'done', 'http_status': status, 'result': body})
+
+
+application = WebhookApp(WebhookPipeline(server.process_webhook, WEBHOOK_QUEUE_SIZE, WEBHOOK_WORKERS))
+
+
+# ----------------------------------------------------------------------
+# 내장 asyncio HTTP/1.1 서버 (uvicorn 이 없을 때, Content-Length 본문만 지원)
+# ----------------------------------------------------------------------
+REASONS = {200: 'OK', 202: 'Accepted', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           411: 'Length Required', 413: 'Payload Too Large', 500: 'Internal Server Error',
+           503: 'Service Unavailable'}
+
+
+async def handle_connection(app, reader, writer):
+    """연결 하나 (keep-alive 로 요청 여러 개) 를 ASGI 앱으로 처리"""
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line.strip():
+                break
+            method, target, version = request_line.decode('latin-1').split()
+            headers = []
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers.append((name.strip().lower().encode('latin-1'), value.strip().encode('latin-1')))
+            header_map = dict(headers)
+            keep_alive = (version == 'HTTP/1.1' and header_map.get(b'connection', b'').lower() != b'close')
+
+            if b'transfer-encoding' in header_map:
+                await write_response(writer, *json_response({'error': 'Content-Length 가 필요합니다.'}, 411), False)
+                break
+            length = int(header_map.get(b'content-length', b'0'))
+            if length > MAX_BODY:
+                await write_response(writer, *json_response({'error': '요청 본문이 너무 큽니다.'}, 413), False)
+                break
+            body = await reader.readexactly(length) if length else b''
+
+            path, _, query = target.partition('?')
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': version.split('/')[-1],
+                'method': method.upper(), 'scheme': 'http', 'path': unquote(path), 'raw_path': path.encode('latin-1'),
+                'query_string': query.encode('latin-1'), 'root_path': '', 'headers': headers,
+                'client': writer.get_extra_info('peername'), 'server': writer.get_extra_info('sockname')
+            }
+            requests = [{'type': 'http.request', 'body': body, 'more_body': False}]
+
+            async def receive():
+                return requests.pop() if requests else {'type': 'http.disconnect'}
+
+            response = {'headers': [], 'body': []}
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    response['status'] = message['status']
+                    response['headers'] = [(k, v) for k, v in message.get('headers', [])
+                                           if k.lower() != b'content-length']
+                elif message['type'] == 'http.response.body':
+                    response['body'].append(message.get('body', b''))
+
+            await app(scope, receive, send)
+            data = b''.join(response['body'])
+            await write_response(writer, response['status'],
+                                 response['headers'] + [(b'content-length', str(len(data)).encode())],
+                                 data, keep_alive)
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def write_response(writer, status, headers, body, keep_alive):
+    lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}".encode('latin-1')]
+    lines += [name + b': ' + value for name, value in headers]
+    lines.append(b'connection: ' + (b'keep-alive' if keep_alive else b'close'))
+    writer.write(b'\r\n'.join(lines) + b'\r\n\r\n' + body)
+    await writer.drain()
+
+
+async def serve_builtin(app, host, port):
+    """내장 서버 실행 (SIGINT/SIGTERM 을 받으면 새 연결을 막고 큐에 남은 웹훅을 처리한 뒤 종료)"""
+    await app.startup()
+    httpd = await asyncio.start_server(lambda r, w: handle_connection(app, r, w), host, port, backlog=1024)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, AttributeError):  # Windows: Ctrl+C 는 KeyboardInterrupt
+            pass
+    try:
+        await stop.wait()
+    finally:
+        httpd.close()
+        await httpd.wait_closed()
+        await app.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='웹훅 비동기 수신 서버 (ASGI)')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=int(os.environ.get('WEBHOOK_PORT', 8001)))
+    parser.add_argument('--workers', type=int, default=WEBHOOK_WORKERS, help='처리 스레드 수')
+    parser.add_argument('--queue', type=int, default=WEBHOOK_QUEUE_SIZE, help='수신 큐 크기')
+    parser.add_argument('--server', choices=('auto', 'uvicorn', 'builtin'), default='auto')
+    args = parser.parse_args(argv)
+
+    application.pipeline.workers = args.workers
+    application.pipeline.maxsize = args.queue
+    use_uvicorn = args.server == 'uvicorn' or (args.server == 'auto' and uvicorn is not None)
+    if use_uvicorn and uvicorn is None:
+        print("uvicorn 이 설치되어 있지 않습니다 (pip install uvicorn)")
+        return 1
+
+    print(f"웹훅 수신 서버 시작: http://{args.host}:{args.port}/webhook "
+          f"({'uvicorn' if use_uvicorn else 'builtin'}, 처리 스레드 {args.workers}개, 큐 {args.queue}건)")
+    if use_uvicorn:
+        uvicorn.run(application, host=args.host, port=args.port, lifespan='on', access_log=False)
+    else:
+        try:
+            asyncio.run(serve_builtin(application, args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,263 @@
+"""웹훅 폭주 시 동기(Flask /webhook) 와 비동기 수신(asgi.py) 비교
+
+사용법: python bench_async_webhook.py [--connections 200] [--per-connection 5] [--queue 1000] [--workers 4]
+
+각 서버를 임시 폴더에서 띄우고 (잔디 알림은 jandi_stub.py 로), 연결 connections 개가 동시에
+웹훅을 per-connection 건씩 보낸다.
+  - 응답(접수) 지연 p50/p95/최대, 전부 처리될 때까지 걸린 시간
+  - 서버 프로세스의 최대 OS 스레드 수 (Linux /proc 에서 측정)
+  - 503 (큐가 가득 참) 응답 수: Retry-After 만큼 기다렸다가 다시 보냄
+를 출력하고, 끝나면 모든 웹훅이 기록으로 한 번씩만 저장됐는지,
+wait=1 응답이 Flask /webhook 응답과 같은 형식인지 확인한다. 틀리면 종료 코드 1.
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class Connection:
+    """keep-alive HTTP/1.1 연결 하나 (asyncio)"""
+
+    def __init__(self, port):
+        self.port = port
+        self.reader = self.writer = None
+
+    async def request(self, method, path, payload=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection('127.0.0.1', self.port)
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8') if payload is not None else b''
+        head = (f"{method} {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n")
+        self.writer.write(head.encode('latin-1') + body)
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        data = await self.reader.readexactly(int(headers.get('content-length', 0)))
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        if 'json' in headers.get('content-type', ''):
+            data = json.loads(data)
+        return status, headers, data
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+class ThreadSampler:
+    """서버 프로세스의 OS 스레드 수를 주기적으로 읽어서 최대값 기록 (Linux)"""
+
+    def __init__(self, pid, interval=0.02):
+        self.pid = pid
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        path = f'/proc/{self.pid}/status'
+        while not self._stop.is_set():
+            try:
+                with open(path) as f:
+                    for line in f:
+                        if line.startswith('Threads:'):
+                            self.peak = max(self.peak, int(line.split()[1]))
+            except OSError:
+                return
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+async def wait_ready(port, process, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"서버가 시작하지 못했습니다 (코드 {process.returncode})")
+        try:
+            conn = Connection(port)
+            await conn.request('GET', '/webhook/stats')
+            conn.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError('서버 시작 시간 초과')
+
+
+async def burst(port, connections, per_connection, label):
+    """연결 connections 개가 동시에 웹훅 per_connection 건씩 → (지연 목록(초), 503 수, 응답 목록)"""
+    latencies, responses = [], []
+    busy = 0
+
+    async def client(index):
+        nonlocal busy
+        conn = Connection(port)
+        for i in range(per_connection):
+            payload = {'data': f'평촌 판교 {label}-{index}-{i} Anna', 'writerName': f'B{index}'}
+            started = time.perf_counter()
+            while True:
+                status, headers, body = await conn.request('POST', '/webhook', payload)
+                if status != 503:
+                    break
+                busy += 1
+                await asyncio.sleep(float(headers.get('retry-after', 1)))
+            latencies.append(time.perf_counter() - started)
+            responses.append((status, body))
+        conn.close()
+
+    await asyncio.gather(*(client(i) for i in range(connections)))
+    return latencies, busy, responses
+
+
+async def wait_processed(port, total, timeout=300):
+    """비동기 서버: 받은 웹훅이 모두 처리될 때까지 대기"""
+    conn = Connection(port)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        _, _, stats = await conn.request('GET', '/webhook/stats')
+        if stats['processed'] + stats['failed'] >= total and stats['depth'] == 0:
+            conn.close()
+            return stats
+        await asyncio.sleep(0.05)
+    conn.close()
+    raise RuntimeError('처리 대기 시간 초과')
+
+
+def stored_markers(workdir, label):
+    """서버를 내린 뒤 임시 폴더의 기록 저장소에서 이번 웹훅 기록 (표식 → 건수)"""
+    sys.path.insert(0, ROOT)
+    from storage import open_storage
+    store, _ = open_storage('json', os.path.join(workdir, 'point_data.json'),
+                            os.path.join(workdir, 'employee_data.json'), os.path.join(workdir, 'point_data.db'))
+    counts = {}
+    for record in store.all():
+        if str(record.get('item', '')).startswith(label):
+            counts[record['item']] = counts.get(record['item'], 0) + 1
+    store.close()
+    return counts
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+async def run(args, mode, stub_port):
+    workdir = tempfile.mkdtemp(prefix=f'bench_async_{mode}_')
+    port = free_port()
+    env = dict(os.environ, JANDI_WEBHOOK_URL=f'http://127.0.0.1:{stub_port}/webhook', POINT_STORAGE='json')
+    if mode == 'sync':
+        command = [sys.executable, os.path.join(ROOT, 'wsgi.py'), '--server', 'builtin', '--workers', '1',
+                   '--host', '127.0.0.1', '--port', str(port)]
+    else:
+        command = [sys.executable, os.path.join(ROOT, 'asgi.py'), '--server', args.server,
+                   '--host', '127.0.0.1', '--port', str(port),
+                   '--workers', str(args.workers), '--queue', str(args.queue)]
+    process = subprocess.Popen(command, cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    errors = []
+    total = args.connections * args.per_connection
+    try:
+        # Flask 서버에는 /webhook/stats 가 없어서 404 가 오지만, 응답이 오면 준비된 것
+        await wait_ready(port, process)
+        with ThreadSampler(process.pid) as sampler:
+            started = time.perf_counter()
+            latencies, busy, responses = await burst(port, args.connections, args.per_connection, mode)
+            acked = time.perf_counter() - started
+            if mode == 'async':
+                await wait_processed(port, total)
+            done = time.perf_counter() - started
+
+        bad = [status for status, _ in responses if status not in (200, 202)]
+        if bad:
+            errors.append(f"{mode}: 실패 응답 {len(bad)}건 (예: {bad[:5]})")
+
+        if mode == 'async':
+            # wait=1 은 Flask /webhook 과 같은 응답 (만들어진 record 포함)
+            conn = Connection(port)
+            status, _, body = await conn.request('POST', '/webhook?wait=1',
+                                                 {'data': f'평촌 판교 {mode}-wait Anna', 'writerName': 'W'})
+            conn.close()
+            if status != 200 or body.get('action') != 'request_created' or body['record'].get('item') != f'{mode}-wait':
+                errors.append(f"wait=1 응답 형식이 다름: {status} {body}")
+    finally:
+        process.terminate()
+        process.wait(timeout=60)
+
+    counts = stored_markers(workdir, mode)
+    shutil.rmtree(workdir, ignore_errors=True)
+    expected = total + (1 if mode == 'async' else 0)
+    duplicated = [marker for marker, count in counts.items() if count > 1]
+    if len(counts) != expected or duplicated:
+        errors.append(f"{mode}: 저장된 웹훅 기록 {len(counts)}건 (기대 {expected}건), 중복 {len(duplicated)}건")
+
+    print(f"{mode:<6}{total:>8,}{percentile(latencies, 0.5) * 1000:>10.1f}{percentile(latencies, 0.95) * 1000:>10.1f}"
+          f"{max(latencies) * 1000:>10.1f}{acked:>10.2f}{done:>10.2f}{busy:>8,}{sampler.peak:>10}")
+    return errors
+
+
+async def main_async(args):
+    stub_port = free_port()
+    stub = subprocess.Popen([sys.executable, os.path.join(ROOT, 'jandi_stub.py'), '--port', str(stub_port)],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    print(f"연결 {args.connections}개 x {args.per_connection}건, 비동기 큐 {args.queue}건 / 처리 스레드 {args.workers}개")
+    print(f"{'방식':<6}{'웹훅':>8}{'p50(ms)':>10}{'p95(ms)':>10}{'최대(ms)':>10}{'접수(초)':>10}{'처리(초)':>10}"
+          f"{'503':>8}{'최대 스레드':>10}")
+    errors = []
+    try:
+        for mode in args.modes:
+            errors += await run(args, mode, stub_port)
+    finally:
+        stub.terminate()
+        stub.wait()
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--connections', type=int, default=200)
+    parser.add_argument('--per-connection', type=int, default=5)
+    parser.add_argument('--queue', type=int, default=1000, help='비동기 수신 큐 크기')
+    parser.add_argument('--workers', type=int, default=4, help='비동기 처리 스레드 수')
+    parser.add_argument('--server', choices=('builtin', 'uvicorn'), default='builtin')
+    parser.add_argument('--modes', nargs='+', choices=('sync', 'async'), default=['sync', 'async'])
+    args = parser.parse_args()
+
+    errors = asyncio.run(main_async(args))
+    for error in errors:
+        print(f"실패: {error}")
+    print('\n통과' if not errors else '\n실패')
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""적립일 범위 조회 성능 / 정확성 확인
+
+사용법: python bench_date_index.py [건수 ...]   (기본: 10000 100000)
+
+1. 예전 방식 (매번 전체 기록의 accumulate_date 를 문자열 비교) 과 적립일 색인의 범위 조회 시간 비교
+2. 색인 결과가 전체를 훑은 결과와 같은지 (적립일 없는 요청은 범위 조회에서 제외) 확인
+3. 기록을 수정(적립/적립 취소)/삭제/추가한 뒤에도 같은지, SQLite 저장소 결과와도 같은지 확인
+틀리면 종료 코드 1.
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import bench_storage
+from date_index import DateIndex
+from sqlite_storage import SQLiteStorage
+from storage import RecordStore, write_json_atomic
+
+# (date_from, date_to): 하루, 한 달, 한 해, 시작만, 끝만, 범위 밖, 뒤집힌 범위
+RANGES = [
+    ('2021-03-01', '2021-03-01'),
+    ('2021-03-01', '2021-03-31'),
+    ('2022-01-01', '2022-12-31'),
+    ('2025-06-01', ''),
+    ('', '2020-01-31'),
+    ('2030-01-01', '2030-12-31'),
+    ('2022-01-01', '2021-01-01')
+]
+
+
+def scan(records, date_from, date_to):
+    """색인 없이 전체를 훑은 결과 (기대값, 적립일 없는 요청 제외)"""
+    return [r['id'] for r in records if r.get('accumulate_date') and
+            (not date_from or r['accumulate_date'] >= date_from) and
+            (not date_to or r['accumulate_date'] <= date_to)]
+
+
+def legacy_scan(records, date_from, date_to):
+    """예전 방식"""
+    result = []
+    for record in records:
+        accumulate_date = record.get('accumulate_date', '')
+        if date_from and accumulate_date < date_from:
+            continue
+        if date_to and accumulate_date > date_to:
+            continue
+        result.append(record)
+    return result
+
+
+def timed(func, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) * 1000 / repeat
+
+
+def check(store, label, errors):
+    records = store.all()
+    for date_from, date_to in RANGES:
+        expected = scan(records, date_from, date_to)
+        actual = [r['id'] for r in store.query('', date_from, date_to)]
+        if actual != expected:
+            errors.append(f"{label} {date_from}~{date_to}: {len(actual)}건 (기대 {len(expected)}건)")
+
+
+def bench(count, workdir):
+    errors = []
+    records = bench_storage.make_records(count)
+    repeat = max(1, 200000 // count)
+
+    index = DateIndex()
+    started = time.perf_counter()
+    index.reset(records)
+    print(f"\n[{count:,}건] 색인 생성 {(time.perf_counter() - started) * 1000:,.0f}ms, {index.stats()}")
+    print(f"{'범위':<24}{'결과':>8}{'예전(ms)':>12}{'색인(ms)':>12}")
+    for date_from, date_to in RANGES:
+        legacy_ms = timed(lambda: legacy_scan(records, date_from, date_to), repeat)
+        index_ms = timed(lambda: index.between(date_from, date_to), repeat * 10)
+        label = f"{date_from or '...'} ~ {date_to or '...'}"
+        print(f"{label:<24}{len(index.between(date_from, date_to)):>8,}{legacy_ms:>12.3f}{index_ms:>12.3f}")
+
+    # 실제 저장소 (JSON / SQLite) 로 결과 비교, 적립/적립 취소/삭제/추가 후 다시 비교
+    json_path = os.path.join(workdir, f'records_{count}.json')
+    write_json_atomic(json_path, records)
+    json_store = RecordStore(json_path, durable=False, compact_threshold=10 ** 9)
+    db = SQLiteStorage(os.path.join(workdir, f'records_{count}.db'))
+    db.records.replace_all(records)
+
+    rng = random.Random(5)
+    for record in rng.sample(records, min(300, count)):
+        if record['accumulate_date']:
+            changes = {'accumulate_date': '', 'status': '진행중'}
+        else:
+            changes = {'accumulate_date': f"2021-03-{rng.randint(1, 28):02d}", 'status': '완료'}
+        json_store.update(record['id'], changes)
+        db.records.update(record['id'], changes)
+    for record in rng.sample(records, min(100, count)):
+        json_store.delete(record['id'])
+        db.records.delete(record['id'])
+    for record in bench_storage.make_records(50, seed=9):
+        record['id'] = json_store.allocate_id()
+        json_store.insert(record)
+        db.records.insert(dict(record))
+
+    check(json_store, 'JSON', errors)
+    check(db.records, 'SQLite', errors)
+    for date_from, date_to in RANGES:
+        totals = json_store.totals('', date_from, date_to), db.records.totals('', date_from, date_to)
+        if totals[0] != totals[1]:
+            errors.append(f"JSON/SQLite 합계 다름 {date_from}~{date_to}: {totals}")
+    json_store.close()
+    db.records.close()
+    return errors
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [10000, 100000]
+    workdir = tempfile.mkdtemp(prefix='bench_date_index_')
+    errors = []
+    try:
+        for count in counts:
+            errors += bench(count, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    for error in errors:
+        print(f"실패: {error}")
+    print('\n통과' if not errors else '\n실패')
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""직원 일괄 등록: 기존 iterrows 방식 / 새 방식 (CSV 는 pandas 없이) 비교
+
+사용법: python bench_employee_import.py [행 수 ...]   (기본: 10000 50000)
+같은 CSV 를 두 방식으로 읽어서 결과(직원 데이터, 추가/수정 수)가 같은지 확인하고 시간을 잰다.
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from employee_import import ingest_employees
+from storage import JsonEmployeeStore
+from sqlite_storage import SQLiteStorage
+
+DEPARTMENTS = ['평촌', '판교', '광주본사', '광주R&D']
+
+
+def write_sheet(path, rows, seed=42):
+    """테스트용 직원 CSV (절반 정도는 기존 직원 ID, 일부는 파일 안에서 중복)"""
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8-sig') as f:
+        f.write('ID,이름,부서,포인트\n')
+        for i in range(rows):
+            emp_id = f"E{rng.randrange(rows * 2):06d}"
+            f.write(f"{emp_id},직원{i},{rng.choice(DEPARTMENTS)},{rng.randrange(0, 100) * 1000}\n")
+
+
+def existing_employees(rows):
+    return {f"E{i:06d}": {'name': f'기존{i}', 'department': '평촌', 'total_points': 5000}
+            for i in range(0, rows * 2, 4)}
+
+
+def legacy_ingest(path, employee_store):
+    """기존 upload_employees 처리 방식"""
+    df = pd.read_csv(path, encoding='utf-8-sig')
+    employees = {emp_id: dict(info) for emp_id, info in employee_store.load().items()}
+    added_count = 0
+    updated_count = 0
+    for _, row in df.iterrows():
+        emp_id = str(row['ID'])
+        if emp_id in employees:
+            updated_count += 1
+        else:
+            added_count += 1
+        employees[emp_id] = {
+            'name': row['이름'],
+            'department': row['부서'],
+            'total_points': int(row.get('포인트', 0))
+        }
+    employee_store.save(employees)
+    return employees, added_count, updated_count
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 50000]
+    workdir = tempfile.mkdtemp(prefix='bench_employee_')
+    failed = False
+    try:
+        for rows in sizes:
+            sheet = os.path.join(workdir, f'employees_{rows}.csv')
+            write_sheet(sheet, rows)
+
+            legacy_store = JsonEmployeeStore(os.path.join(workdir, f'legacy_{rows}.json'))
+            legacy_store.save(existing_employees(rows))
+            started = time.perf_counter()
+            expected, added, updated = legacy_ingest(sheet, legacy_store)
+            legacy_time = time.perf_counter() - started
+            print(f"{rows:,}행 기존 방식: {legacy_time:.2f}초 (추가 {added:,}, 수정 {updated:,} - 중복 행 포함)")
+
+            json_store = JsonEmployeeStore(os.path.join(workdir, f'new_{rows}.json'))
+            json_store.save(existing_employees(rows))
+            db = SQLiteStorage(os.path.join(workdir, f'new_{rows}.db'))
+            db.employees.save(existing_employees(rows))
+
+            for label, employee_store in (('JSON', json_store), ('SQLite', db.employees)):
+                started = time.perf_counter()
+                result = ingest_employees(sheet, employee_store)
+                elapsed = time.perf_counter() - started
+                same = employee_store.load() == expected
+                failed = failed or not same
+                print(f"{rows:,}행 {label}: {elapsed:.2f}초 ({legacy_time / elapsed:.1f}배), "
+                      f"추가 {result['added']:,}, 수정 {result['updated']:,}, 결과 {'일치' if same else '불일치'}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
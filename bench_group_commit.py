@@ -0,0 +1,153 @@
+"""웹훅 폭주 상황에서 기록 저장 처리량 / 지연 비교
+
+사용법: python bench_group_commit.py [--threads 32] [--requests 20] [--records 5000] [--dir 경로] [--fsync-ms 0]
+
+스레드 여러 개가 동시에 '요청 기록 추가' (ID 발급 + 저장) 를 보내고, 요청마다 응답까지 걸린 시간을 잰다.
+- 전체 저장: 요청마다 전체 기록을 JSON 으로 다시 써서 fsync (예전 save_data 방식)
+- 요청별 fsync: 저널에 쓰고 요청마다 직접 fsync
+- 그룹 커밋: 저널에 쓰고 커밋 스레드가 모아서 fsync 한 뒤 응답 (기본 설정)
+- fsync 안 기다림: fsync 전에 응답 (참고용, 응답 후 죽으면 잃을 수 있음)
+fsync 비용은 디스크에 따라 크게 다르므로 실제 데이터가 있는 디스크를 --dir 로 지정해서 재는 것이 좋다.
+--fsync-ms 를 주면 fsync 마다 그만큼 더 걸리게 해서 느린 디스크(네트워크 디스크 등)를 흉내 낸다.
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+import bench_storage
+from storage import RecordStore, write_json_atomic
+
+
+def new_record(record_id, thread, i):
+    return {
+        'id': record_id,
+        'request_date': '2025-10-01',
+        'applicant': f'W{thread}',
+        'transporter': '',
+        'from_location': '평촌',
+        'to_location': '판교',
+        'item': f'burst-{thread}-{i}',
+        'applicant_amount': 5000,
+        'transporter_amount': 5000,
+        'accumulate_date': '',
+        'deadline_date': '',
+        'status': '대기중',
+        'created_at': '2025-10-01T09:00:00',
+        'source': 'webhook'
+    }
+
+
+class FullSaveStore:
+    """예전 방식: 메모리 목록을 바꾸고 매번 파일 전체를 다시 씀"""
+
+    def __init__(self, path, records):
+        self.path = path
+        self.records = list(records)
+        self.lock = threading.Lock()
+
+    def add(self, thread, i):
+        with self.lock:
+            record_id = max((r['id'] for r in self.records), default=0) + 1
+            self.records.append(new_record(record_id, thread, i))
+            write_json_atomic(self.path, self.records)
+
+    def close(self):
+        pass
+
+
+class JournalStore:
+    """RecordStore 사용, per_request_fsync 이면 요청마다 직접 fsync"""
+
+    def __init__(self, path, records, durable, per_request_fsync=False):
+        write_json_atomic(path, records)
+        self.store = RecordStore(path, durable=durable, compact_threshold=10 ** 9)
+        self.per_request_fsync = per_request_fsync
+
+    def add(self, thread, i):
+        with self.store.transaction():
+            self.store.insert(new_record(self.store.allocate_id(), thread, i))
+        if self.per_request_fsync:
+            self.store.flush()
+
+    def close(self):
+        stats = self.store.stats()
+        self.store.close()
+        return stats
+
+
+def burst(target, threads, requests):
+    """스레드 threads 개가 동시에 requests 건씩 → (요청별 지연 목록, 걸린 시간)"""
+    latencies = [[] for _ in range(threads)]
+    start = threading.Barrier(threads + 1)
+
+    def worker(thread):
+        start.wait()
+        for i in range(requests):
+            begin = time.perf_counter()
+            target.add(thread, i)
+            latencies[thread].append(time.perf_counter() - begin)
+
+    workers = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    for t in workers:
+        t.start()
+    start.wait()
+    began = time.perf_counter()
+    for t in workers:
+        t.join()
+    return [x for per_thread in latencies for x in per_thread], time.perf_counter() - began
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='웹훅 폭주 시 저장 처리량/지연 비교')
+    parser.add_argument('--threads', type=int, default=32, help='동시 요청 수')
+    parser.add_argument('--requests', type=int, default=20, help='스레드당 요청 수')
+    parser.add_argument('--records', type=int, default=5000, help='미리 들어 있는 기록 수')
+    parser.add_argument('--dir', default=None, help='측정용 파일을 만들 폴더 (기본: 임시 폴더)')
+    parser.add_argument('--fsync-ms', type=float, default=0, help='fsync 마다 추가할 지연 (느린 디스크 흉내)')
+    args = parser.parse_args()
+
+    if args.fsync_ms:
+        real_fsync = os.fsync
+
+        def slow_fsync(fd):
+            real_fsync(fd)
+            time.sleep(args.fsync_ms / 1000)
+
+        os.fsync = slow_fsync
+
+    workdir = tempfile.mkdtemp(prefix='bench_group_commit_', dir=args.dir)
+    base = bench_storage.make_records(args.records)
+    modes = [
+        ('전체 저장', lambda path: FullSaveStore(path, base)),
+        ('요청별 fsync', lambda path: JournalStore(path, base, durable=False, per_request_fsync=True)),
+        ('그룹 커밋', lambda path: JournalStore(path, base, durable=True)),
+        ('fsync 안 기다림', lambda path: JournalStore(path, base, durable=False))
+    ]
+    total = args.threads * args.requests
+    print(f"동시 {args.threads}개 x {args.requests}건 = {total}건, 기존 기록 {args.records:,}건, "
+          f"fsync 추가 지연 {args.fsync_ms}ms, 폴더 {workdir}")
+    print(f"{'방식':<14}{'처리량(건/초)':>14}{'p50(ms)':>10}{'p99(ms)':>10}{'최대(ms)':>10}{'fsync':>8}")
+    try:
+        for index, (label, factory) in enumerate(modes):
+            target = factory(os.path.join(workdir, f'mode{index}.json'))
+            latencies, elapsed = burst(target, args.threads, args.requests)
+            stats = target.close() or {}
+            fsyncs = stats.get('fsyncs', total)  # 전체 저장은 요청마다 fsync
+            print(f"{label:<14}{total / elapsed:>14,.0f}{statistics.median(latencies) * 1000:>10.2f}"
+                  f"{percentile(latencies, 0.99) * 1000:>10.2f}{max(latencies) * 1000:>10.2f}{fsyncs:>8}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
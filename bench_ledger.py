@@ -0,0 +1,150 @@
+"""포인트 원장 성능 / 정확성 확인
+
+사용법: python bench_ledger.py [건수 ...]   (기본: 10000 100000)
+
+1. 직원 잔액 조회: 기록을 전부 합산하는 방식과 원장 잔액 (O(1)) 시간 비교
+2. 원장 다시 열기: 체크포인트가 있을 때와 처음부터 다시 읽을 때 시간 비교
+3. 완료 적립 / 완료 취소 / 금액 수정 / 삭제 / 관리자 조정 뒤 원장이 기록과 맞는지 확인
+   (리스너 변경은 묶어서 기록: 변경 건수와 fsync 횟수, 다시 읽기(reset) 때 전체 대조와 바뀐 기록만 반영하는 시간 비교)
+4. 원장을 손으로 건드리면 (중복 적립, 쓰다 만 줄) verify 가 찾아내고 reconcile 로 맞춰지는지 확인
+틀리면 종료 코드 1.
+"""
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import bench_storage
+from points_ledger import PointsLedger, record_credits
+
+
+def summed_balance(records, emp_id):
+    """원장 없이 기록을 전부 훑어서 합산 (비교용)"""
+    return sum(record_credits(record).get(emp_id, 0) for record in records)
+
+
+def timed(func, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) * 1000 / repeat
+
+
+def bench(count, workdir):
+    errors = []
+    records = {record['id']: record for record in bench_storage.make_records(count)}
+    employees = {name: {'name': name, 'total_points': 1000} for name in bench_storage.NAMES}
+    path = os.path.join(workdir, f'ledger_{count}.jsonl')
+
+    ledger = PointsLedger(path)
+    started = time.perf_counter()
+    ledger.sync_opening(employees)
+    ledger.sync_records(records.values())
+    print(f"\n[{count:,}건] 원장 생성 {(time.perf_counter() - started) * 1000:,.0f}ms, {ledger.stats()}")
+
+    repeat = max(1, 100000 // count)
+    summed_ms = timed(lambda: summed_balance(records.values(), 'Paul'), repeat)
+    ledger_ms = timed(lambda: ledger.balance('Paul'), repeat * 1000)
+    print(f"잔액 조회: 기록 합산 {summed_ms:.3f}ms, 원장 {ledger_ms:.4f}ms")
+    if ledger.balance('Paul') != summed_balance(records.values(), 'Paul') + 1000:
+        errors.append(f"{count}건 잔액이 기록 합산 + 기초 포인트와 다름")
+    ledger.close()
+
+    started = time.perf_counter()
+    reopened = PointsLedger(path)
+    checkpoint_ms = (time.perf_counter() - started) * 1000
+    reopened.close()
+    os.remove(f"{path}.checkpoint")
+    started = time.perf_counter()
+    ledger = PointsLedger(path)
+    replay_ms = (time.perf_counter() - started) * 1000
+    print(f"다시 열기: 체크포인트 {checkpoint_ms:,.1f}ms, 처음부터 {replay_ms:,.1f}ms")
+
+    # 저장소 리스너처럼 기록 변경을 전달
+    started = time.perf_counter()
+    ledger.reset(list(records.values()))
+    full_ms = (time.perf_counter() - started) * 1000
+    fsyncs = ledger.stats()['fsyncs']
+    changes = 0
+    rng = random.Random(7)
+    for record in rng.sample(list(records.values()), min(300, count)):
+        old = dict(record)
+        if record['status'] == '완료':
+            record.update({'status': '진행중', 'accumulate_date': ''})
+        else:
+            record.update({'status': '완료', 'accumulate_date': '2021-03-05', 'transporter': 'Kai'})
+        record['applicant_amount'] = rng.choice([0, 3000, 5000])
+        ledger.apply(old, dict(record))
+        changes += 1
+    for record_id in rng.sample(sorted(records), min(100, count)):
+        ledger.apply(records.pop(record_id), None)
+        changes += 1
+    # 같은 변경을 다른 워커가 한 번 더 전달해도 적립은 한 번
+    for record in list(records.values())[:50]:
+        ledger.apply(record, dict(record))
+        changes += 1
+    ledger.flush()
+    print(f"리스너 변경 {changes}건 → 원장 fsync {ledger.stats()['fsyncs'] - fsyncs}번")
+
+    # 다른 워커의 변경으로 다시 읽었을 때 (reset): 바뀐 기록만 원장에 반영
+    record = next(r for r in records.values() if r['status'] != '완료')
+    record.update({'status': '완료', 'accumulate_date': '2021-03-06', 'transporter': 'Jack'})
+    started = time.perf_counter()
+    ledger.reset(list(records.values()))
+    fixed = ledger.flush()
+    reset_ms = (time.perf_counter() - started) * 1000
+    print(f"다시 읽기(reset): 처음 전체 대조 {full_ms:,.1f}ms, 이후 바뀐 기록만 {reset_ms:,.1f}ms")
+    if ledger.stats()['pending'] or ledger.balance('Jack') != summed_balance(records.values(), 'Jack') + 1000:
+        errors.append(f"reset 후 바뀐 기록이 반영되지 않음 ({fixed})")
+
+    before = ledger.balance('Anna')
+    if ledger.adjust('Anna', -700, '벤치 조정') != before - 700:
+        errors.append('관리자 조정 후 잔액이 다름')
+    if ledger.set_balance('Anna', 12345, '벤치 설정') != 12345:
+        errors.append('잔액 설정 후 잔액이 다름')
+    mismatches = ledger.verify(records.values(), employees)
+    if mismatches:
+        errors.append(f"{count}건 변경 후 불일치 {len(mismatches)}건 (예: {mismatches[:3]})")
+
+    # 손으로 건드린 원장: 중복 적립 한 줄 + 쓰다 만 줄
+    ledger.close()
+    record_id = next(r['id'] for r in records.values() if record_credits(r))
+    emp_id, amount = next(iter(record_credits(records[record_id]).items()))
+    with open(path, 'ab') as f:
+        event = {'type': 'earned', 'emp_id': emp_id, 'amount': amount, 'record_id': record_id,
+                 'seq': ledger.stats()['events'] + 1, 'at': ''}
+        f.write((json.dumps(event) + '\n').encode('utf-8') + b'{"type": "ear')
+    ledger = PointsLedger(path)
+    mismatches = ledger.verify(records.values(), employees)
+    if [m['kind'] for m in mismatches] != ['record']:
+        errors.append(f"중복 적립을 찾지 못함: {mismatches}")
+    fixed = ledger.reconcile(records.values(), employees)
+    mismatches = ledger.verify(records.values(), employees)
+    print(f"원장 점검: 중복 적립 찾음, 보정 이벤트 {len(fixed)}건, 보정 후 불일치 {len(mismatches)}건")
+    if mismatches:
+        errors.append(f"보정 후에도 불일치 {len(mismatches)}건")
+    ledger.close()
+    return errors
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [10000, 100000]
+    workdir = tempfile.mkdtemp(prefix='bench_ledger_')
+    errors = []
+    try:
+        for count in counts:
+            errors += bench(count, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    for error in errors:
+        print(f"실패: {error}")
+    print('\n통과' if not errors else '\n실패')
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
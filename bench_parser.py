@@ -0,0 +1,287 @@
+"""채팅 메시지 파서 동등성 확인 + 처리 속도 비교
+
+server.py 에 있던 기존 parse_chat_message 를 그대로 옮겨 두고,
+chat_parser.parse_chat_message 와 같은 결과를 내는지 말뭉치 전체로 비교한 뒤
+초당 처리 메시지 수를 측정한다.
+
+사용법: python bench_parser.py [생성할 메시지 수]   (기본: 20000)
+"""
+import contextlib
+import io
+import random
+import re
+import sys
+import time
+
+from chat_parser import parse_chat_message
+
+# 실제로 오가는 형태의 메시지
+CORPUS = [
+    '평촌 판교 센서 Anna',
+    '평촌 판교 센서',
+    '판교 평촌',
+    '광주 판교 샘플 Jake',
+    '광주R&D 평촌 보드 James',
+    '판교R&D 광주본사 케이블',
+    '제조혁신센터 2센터 지그 Kai',
+    '본사 rnd 부품',
+    '/싣고받고 센서 Anna 평촌 판교',
+    '/싣고받고 보드 Jake 광주 평촌',
+    '/싣고받고 평촌 판교',
+    '/싣고받고 접수 12',
+    '/싣고받고 완료 12',
+    '/싣고받고 접수 abc',
+    '/싣고받고 완료',
+    '/싣고받고',
+    '/싣고받고abc 평촌 판교',
+    '평촌 → 판교 센서 2개 이송 부탁드립니다 @홍길동',
+    '평촌 → 판교 센서 이송 부탁드립니다 @Paul(윤희선)',
+    '판교->평촌 전달 부탁해요',
+    '광주 --> 판교 샘플',
+    '평촌에서 광주로 보내주세요',
+    '판교 to 평촌 please',
+    '판교 TO 광주',
+    '센서 전달 요청합니다',
+    '내일 이동하시는 분 계신가요?',
+    '운송 요청 드립니다',
+    '제가 접수하겠습니다',
+    '신청합니다 @L(류주완)',
+    '잘 받았습니다 감사합니다',
+    '수령했습니다',
+    '완료했습니다',
+    '/싣고받고 완료했습니다',
+    '/싣고받고 접수합니다 지금',
+    '안녕하세요',
+    '',
+    '   ',
+    '@Sammy(육성일) @Kai(윤상훈) 확인 부탁드립니다',
+    '평촌',
+    '서울 부산 택배',
+    '광주광주 판교판교',
+]
+
+LOCATION_WORDS = ['평촌', '판교', '광주', '광주본사', '광주R&D', '광주rnd', 'R&D', 'rnd', '본사', '1센터', '2센터',
+                  '제조혁신센터', '판교R&D', '판교rnd', '서울', 'Rnd', 'r&d']
+FILLER_WORDS = ['센서', '보드', '샘플', '부탁드립니다', '이송 부탁', '전달 부탁', '전달 요청', '이동하시는 분',
+                '운송 요청', '접수', '신청', '받았습니다', '수령했습니다', '완료', '감사합니다', 'to', 'TO',
+                '→', '->', '-->', '에서', '로', '@Paul(윤희선)', 'Anna(이한영)', '@홍길동', '12', 'abc']
+
+
+def generate_messages(count, seed=7):
+    """위치/키워드/명령을 섞은 무작위 메시지"""
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(count):
+        words = [rng.choice(LOCATION_WORDS + FILLER_WORDS) for _ in range(rng.randint(0, 7))]
+        if rng.random() < 0.3:
+            words.insert(0, '/싣고받고')
+        if rng.random() < 0.1 and len(words) >= 2:
+            words[1] = rng.choice(['접수', '완료'])
+        separator = rng.choice([' ', ' ', '  ', ''])
+        messages.append(separator.join(words))
+    return messages
+
+
+
+# server.py 에 있던 기존 파서 (비교용, 수정하지 말 것)
+def legacy_parse_chat_message(message):
+    """채팅 메시지에서 운송 정보 추출"""
+    print(f"[DEBUG] parse_chat_message 시작: '{message}'")
+
+    # 위치 패턴 (정확한 사무실 명칭)
+    locations = {
+        '평촌': ['평촌', '제조혁신센터'],
+        '판교': ['판교', '판교R&D', '판교rnd', '1센터', '2센터'],
+        '광주본사': ['광주본사', '광주', '본사'],
+        '광주R&D': ['광주R&D', '광주rnd', 'R&D', 'rnd']
+    }
+
+    from_loc = None
+    to_loc = None
+    from_text = None
+    to_text = None
+
+    # /싣고받고 명령어 처리
+    if message.strip().startswith('/싣고받고'):
+        parts = message.strip().split()
+
+        # /싣고받고 접수 [번호] 패턴 확인
+        if len(parts) >= 3 and parts[1] == '접수':
+            try:
+                request_id = int(parts[2])
+                message_type = 'accept_id'
+                return {
+                    'message_type': message_type,
+                    'request_id': request_id,
+                    'from_location': None,
+                    'to_location': None,
+                    'requester': None,
+                    'transporter': None
+                }
+            except ValueError:
+                pass
+
+        # /싣고받고 완료 [번호] 패턴 확인
+        elif len(parts) >= 3 and parts[1] == '완료':
+            try:
+                request_id = int(parts[2])
+                message_type = 'complete_id'
+                return {
+                    'message_type': message_type,
+                    'request_id': request_id,
+                    'from_location': None,
+                    'to_location': None,
+                    'requester': None,
+                    'transporter': None
+                }
+            except ValueError:
+                pass
+
+        # 운송 요청 패턴: /싣고받고 물품명 수령자 출발지 도착지
+        elif len(parts) >= 5:  # /싣고받고 물품명 수령자 출발지 도착지
+            from_text = parts[3]  # 출발지
+            to_text = parts[4]    # 도착지
+            recipient = parts[2]  # 수령자
+        elif len(parts) >= 3:  # 기존 방식 호환: /싣고받고 출발지 도착지
+            from_text = parts[1]
+            to_text = parts[2]
+            recipient = None
+    else:
+        # 잔디 웹훅에서 data 필드로 오는 경우: 순서대로 인식 (첫번째 두번째는 출발지 도착지)
+        parts = message.strip().split()
+        if len(parts) >= 2:  # 최소 출발지 도착지는 있어야 함
+            from_text = parts[0]  # 출발지
+            to_text = parts[1]    # 도착지
+            # 세번째가 있으면 물품명, 네번째가 있으면 수령자
+            recipient = parts[3] if len(parts) >= 4 else None
+
+    # 위치 정규화
+    if from_text and to_text:
+        print(f"[DEBUG] from_text: '{from_text}', to_text: '{to_text}'")
+        for key, values in locations.items():
+            if any(v in from_text for v in values):
+                from_loc = key
+                print(f"[DEBUG] from_loc 찾음: {key}")
+            if any(v in to_text for v in values):
+                to_loc = key
+                print(f"[DEBUG] to_loc 찾음: {key}")
+    else:
+        print(f"[DEBUG] from_text 또는 to_text가 없음: from_text='{from_text}', to_text='{to_text}'")
+
+    # 위에서 찾지 못했다면 기존 복잡한 패턴들 시도 (하위 호환성)
+    if not from_loc or not to_loc:
+        patterns = [
+            r'(평촌|판교|광주)[\s]*[→>-]+[\s]*(평촌|판교|광주)',
+            r'(평촌|판교|광주)[\s]*--+>[\s]*(평촌|판교|광주)',
+            r'(평촌|판교|광주)[\s]*에서[\s]*(평촌|판교|광주)[\s]*로',
+            r'(평촌|판교|광주).*to.*(평촌|판교|광주)'
+        ]
+
+        for pattern in patterns:
+            match = re.search(pattern, message, re.IGNORECASE)
+            if match:
+                from_text = match.group(1)
+                to_text = match.group(2)
+
+                # 정규화
+                for key, values in locations.items():
+                    if any(v in from_text for v in values):
+                        from_loc = key
+                    if any(v in to_text for v in values):
+                        to_loc = key
+
+                if from_loc and to_loc:
+                    break
+
+    # 메시지 타입 분류
+    message_type = 'unknown'
+    requester = None
+    transporter = None
+
+    # 1. 운송 요청 메시지
+    if message.strip().startswith('/싣고받고') and from_loc and to_loc:
+        message_type = 'request'
+        # 요청자는 메시지 작성자 (웹훅에서 sender로 전달됨)
+    elif from_loc and to_loc:
+        # 잔디 웹훅에서 data 필드로 "평촌 판교 센서" 형태로 오는 경우
+        message_type = 'request'
+        print(f"[DEBUG] 잔디 웹훅 요청으로 인식: from_loc={from_loc}, to_loc={to_loc}")
+        # 요청자는 메시지 작성자 (웹훅에서 sender로 전달됨)
+    elif any(keyword in message for keyword in ['이송 부탁', '전달 부탁', '전달 요청', '이동하시는 분', '운송 요청']):
+        message_type = 'request'
+        # 요청자는 메시지 작성자 (웹훅에서 sender로 전달됨)
+
+    # 2. 전달 수락 메시지 (ID 기반이 아닌 경우만)
+    elif any(keyword in message for keyword in ['접수', '신청']) and not message.strip().startswith('/싣고받고'):
+        message_type = 'accept'
+        # 전달자는 메시지 작성자
+
+    # 3. 완료 메시지
+    elif any(keyword in message for keyword in ['받았습니다', '수령했습니다', '잘 받았습니다', '완료']):
+        message_type = 'complete'
+
+    # 이름 패턴 추출 (태그된 사람들)
+    name_pattern = r'@?([A-Za-z]+)\([가-힣]+\)'
+    names = re.findall(name_pattern, message)
+
+    # 수령자 정보 추출 (메시지 전체에서, @ 없이)
+    recipient = None
+    # /싣고받고 형식이 아닌 경우에만 전체 메시지에서 추출
+    if not message.strip().startswith('/싣고받고'):
+        # 기존 방식에서는 수령자 정보 추출하지 않음
+        pass
+
+    return {
+        'from_location': from_loc,
+        'to_location': to_loc,
+        'message_type': message_type,
+        'names': names,
+        'requester': requester,
+        'transporter': transporter,
+        'recipient': recipient
+    }
+
+
+def check_equivalence(messages):
+    """두 파서 결과가 다른 메시지 목록"""
+    mismatches = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for message in messages:
+            expected = legacy_parse_chat_message(message)
+            actual = parse_chat_message(message)
+            if expected != actual:
+                mismatches.append((message, expected, actual))
+    return mismatches
+
+
+def messages_per_second(parser, messages, repeat=3):
+    best = None
+    with contextlib.redirect_stdout(io.StringIO()) as sink:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for message in messages:
+                parser(message)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+            sink.seek(0)
+            sink.truncate()
+    return len(messages) / best
+
+
+def main(count):
+    messages = CORPUS + generate_messages(count)
+
+    mismatches = check_equivalence(messages)
+    print(f"동등성 확인: {len(messages):,}건 중 불일치 {len(mismatches)}건")
+    for message, expected, actual in mismatches[:10]:
+        print(f"  {message!r}\n    기존: {expected}\n    신규: {actual}")
+
+    legacy_rate = messages_per_second(legacy_parse_chat_message, messages)
+    new_rate = messages_per_second(parse_chat_message, messages)
+    print(f"기존 파서: {legacy_rate:>12,.0f} 건/초 (DEBUG 출력은 버림)")
+    print(f"신규 파서: {new_rate:>12,.0f} 건/초 ({new_rate / legacy_rate:.1f}배)")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))
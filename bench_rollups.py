@@ -0,0 +1,145 @@
+"""/api/stats 집계표 성능 / 정확성 확인
+
+사용법: python bench_rollups.py [건수 ...]   (기본: 10000 100000)
+
+1. 예전 방식 (매번 조건에 맞는 기록을 골라서 합산) 과 집계표의 합계/그룹별 합계 시간 비교
+2. 집계표 결과가 기록을 직접 합산한 결과와 같은지 확인 (형식이 다른 적립일, 적립일 없는 요청 포함)
+3. 기록을 수정(적립/적립 취소/금액/경로)/삭제/추가한 뒤에도 같은지, SQLite 저장소 결과와도 같은지 확인
+틀리면 종료 코드 1.
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import bench_storage
+from rollups import GROUP_BY, group_records
+from sqlite_storage import SQLiteStorage
+from storage import RecordStore, date_matches, summarize, write_json_atomic
+
+# (date_from, date_to): 전체, 하루, 달 중간부터, 여러 달, 한 해, 시작만, 끝만, 뒤집힌 범위
+RANGES = [
+    ('', ''),
+    ('2021-03-05', '2021-03-05'),
+    ('2021-03-05', '2021-05-20'),
+    ('2021-03-01', '2021-08-31'),
+    ('2022-01-01', '2022-12-31'),
+    ('2024-06-15', ''),
+    ('', '2020-02-10'),
+    ('2022-01-01', '2021-01-01')
+]
+
+
+def make_records(count):
+    records = bench_storage.make_records(count)
+    rng = random.Random(3)
+    for record in rng.sample(records, min(20, count)):
+        if record['accumulate_date']:
+            # 손으로 고친 기록처럼 형식이 다른 적립일
+            record['accumulate_date'] = record['accumulate_date'].replace('-0', '-')
+    return records
+
+
+def expected(records, date_from, date_to, group_by=None):
+    """기록을 직접 골라서 합산 (기대값)"""
+    matched = [r for r in records if date_matches(r, date_from, date_to)]
+    return group_records(matched, group_by) if group_by else summarize(matched)
+
+
+def timed(func, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) * 1000 / repeat
+
+
+def check(store, label, errors):
+    records = store.all()
+    for date_from, date_to in RANGES:
+        if store.totals('', date_from, date_to) != expected(records, date_from, date_to):
+            errors.append(f"{label} 합계 {date_from}~{date_to}")
+        for group_by in GROUP_BY:
+            if store.grouped_totals(group_by, '', date_from, date_to) != expected(records, date_from, date_to, group_by):
+                errors.append(f"{label} {group_by} {date_from}~{date_to}")
+        if store.grouped_totals('applicant', 'paul', date_from, date_to) != group_records(
+                store.query('paul', date_from, date_to), 'applicant'):
+            errors.append(f"{label} 검색어+그룹 {date_from}~{date_to}")
+
+
+def bench(count, workdir):
+    errors = []
+    records = make_records(count)
+    repeat = max(1, 100000 // count)
+
+    json_path = os.path.join(workdir, f'records_{count}.json')
+    write_json_atomic(json_path, records)
+    store = RecordStore(json_path, durable=False, compact_threshold=10 ** 9)
+    print(f"\n[{count:,}건] {store.rollups.stats()}")
+    print(f"{'범위':<26}{'예전 합계':>10}{'집계표':>10}{'예전 월별':>10}{'집계표':>10}{'예전 경로별':>12}{'집계표':>10}  (ms)")
+    for date_from, date_to in RANGES:
+        timings = []
+        for group_by in (None, 'month', 'route'):
+            if group_by:
+                old = lambda: group_records(store.query('', date_from, date_to), group_by)
+                new = lambda: store.grouped_totals(group_by, '', date_from, date_to)
+            else:
+                old = lambda: summarize(store.query('', date_from, date_to))
+                new = lambda: store.totals('', date_from, date_to)
+            timings += [timed(old, repeat), timed(new, repeat * 10)]
+        label = f"{date_from or '...'} ~ {date_to or '...'}"
+        print(f"{label:<26}" + ''.join(f"{ms:>10.3f}" if i % 4 != 2 else f"{ms:>12.3f}"
+                                        for i, ms in enumerate(timings)))
+
+    db = SQLiteStorage(os.path.join(workdir, f'records_{count}.db'))
+    db.records.replace_all(records)
+
+    rng = random.Random(13)
+    for record in rng.sample(records, min(300, count)):
+        if record['accumulate_date']:
+            changes = {'accumulate_date': '', 'status': '진행중'}
+        else:
+            changes = {'accumulate_date': f"2021-03-{rng.randint(1, 28):02d}", 'status': '완료'}
+        changes['transporter_amount'] = rng.choice([0, 3000, 7000])
+        changes['to_location'] = rng.choice(bench_storage.LOCATIONS)
+        store.update(record['id'], changes)
+        db.records.update(record['id'], changes)
+    for record in rng.sample(records, min(100, count)):
+        store.delete(record['id'])
+        db.records.delete(record['id'])
+    for record in bench_storage.make_records(50, seed=17):
+        record['id'] = store.allocate_id()
+        store.insert(record)
+        db.records.insert(dict(record))
+
+    check(store, 'JSON', errors)
+    check(db.records, 'SQLite', errors)
+    for date_from, date_to in RANGES:
+        for group_by in GROUP_BY:
+            if (store.grouped_totals(group_by, '', date_from, date_to) !=
+                    db.records.grouped_totals(group_by, '', date_from, date_to)):
+                errors.append(f"JSON/SQLite 다름 {group_by} {date_from}~{date_to}")
+    store.close()
+    db.records.close()
+    return errors
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [10000, 100000]
+    workdir = tempfile.mkdtemp(prefix='bench_rollups_')
+    errors = []
+    try:
+        for count in counts:
+            errors += bench(count, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    for error in errors:
+        print(f"실패: {error}")
+    print('\n통과' if not errors else '\n실패')
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""검색 색인 성능 / 정확성 확인
+
+사용법: python bench_search.py [건수 ...]   (기본: 10000 100000)
+
+1. 예전 방식 (매번 요청자/전달자를 소문자로 바꿔서 전체를 훑음) 과 검색 색인의 검색 시간 비교
+2. 색인 결과가 전체를 훑은 결과 (요청자/전달자/물품/수령자/직원 표시 이름) 와 같은지 확인
+3. 기록을 수정/삭제/추가한 뒤에도 같은지, SQLite 저장소의 검색 결과와도 같은지 확인
+틀리면 종료 코드 1.
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import bench_storage
+from search_index import PERSON_FIELDS, SEARCH_FIELDS, SearchIndex, normalize_text
+from sqlite_storage import SQLiteStorage
+from storage import RecordStore, write_json_atomic
+
+EMPLOYEES = {
+    'Paul': {'name': 'Paul(윤희선)'}, 'L': {'name': 'L(류주완)'}, 'Sammy': {'name': 'Sammy(육성일)'},
+    'Kai': {'name': 'Kai(윤상훈)'}, 'Jack': {'name': 'Jack(정재락)'}, 'Anna': {'name': 'Anna(이한영)'},
+    'Jake': {'name': 'Jake(조준현)'}, 'James': {'name': 'James(정우석)'}, 'Jinie': {'name': 'Jinie(이효진)'},
+    'Yup': {'name': 'Yup(김현엽)'}, 'Brown': {'name': 'Brown(권은성)'}, 'Jayone': {'name': 'Jayone(서재원)'}
+}
+ITEMS = ['센서 모듈', '라이다 샘플', '노트북', '서류 봉투', 'LiDAR 브라켓', '택배 박스', '모니터', '케이블']
+RECIPIENTS = ['김민수', '박지영', '최현우', 'Mina', '정다은', '']
+QUERIES = ['paul', 'PA', 'j', '윤희', '희선', '윤', '라이다', '센서 모', 'lidar', '택배', '다은', 'mina', '없는검색어']
+
+
+def make_records(count):
+    records = bench_storage.make_records(count)
+    rng = random.Random(7)
+    for record in records:
+        record['item'] = f"{rng.choice(ITEMS)} {rng.randint(1, 99)}개"
+        record['recipient'] = rng.choice(RECIPIENTS)
+    return records
+
+
+def scan(records, query):
+    """색인 없이 전체를 훑은 결과 (기대값)"""
+    query = normalize_text(query)
+    names = {emp_id: normalize_text(info['name']) for emp_id, info in EMPLOYEES.items()}
+    return [r['id'] for r in records if any(query in normalize_text(r.get(field)) for field in SEARCH_FIELDS) or any(
+        query in names.get(r.get(field) or '', '') for field in PERSON_FIELDS)]
+
+
+def legacy_scan(records, query):
+    """예전 방식 (요청자/전달자만, 매번 소문자 변환)"""
+    query = query.lower()
+    return [r for r in records if query in (r.get('applicant') or '').lower() or
+            query in (r.get('transporter') or '').lower()]
+
+
+def timed(func, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) * 1000 / repeat
+
+
+def check(store, records, label, errors):
+    for query in QUERIES:
+        expected = scan(records, query)
+        actual = [r['id'] for r in store.query(query)]
+        if actual != expected:
+            errors.append(f"{label} '{query}': {len(actual)}건 (기대 {len(expected)}건)")
+
+
+def bench(count, workdir):
+    errors = []
+    records = make_records(count)
+    repeat = max(1, 200000 // count)
+
+    tracemalloc.start()
+    index = SearchIndex()
+    started = time.perf_counter()
+    index.reset(records)
+    build_ms = (time.perf_counter() - started) * 1000
+    index_mb = tracemalloc.get_traced_memory()[0] / 1024 / 1024
+    tracemalloc.stop()
+
+    print(f"\n[{count:,}건] 색인 생성 {build_ms:,.0f}ms, 메모리 약 {index_mb:.1f}MB, {index.stats()}")
+    print(f"{'검색어':<12}{'결과':>8}{'예전(ms)':>12}{'색인(ms)':>12}")
+    for query in QUERIES:
+        legacy_ms = timed(lambda: legacy_scan(records, query), repeat)
+        index_ms = timed(lambda: index.search(query, EMPLOYEES), repeat * 10)
+        print(f"{query:<12}{len(index.search(query, EMPLOYEES)):>8,}{legacy_ms:>12.3f}{index_ms:>12.3f}")
+
+    # 실제 저장소 (JSON / SQLite) 로 결과 비교, 수정/삭제/추가 후 다시 비교
+    json_path = os.path.join(workdir, f'records_{count}.json')
+    write_json_atomic(os.path.join(workdir, f'employees_{count}.json'), EMPLOYEES)
+    write_json_atomic(json_path, records)
+    json_store = RecordStore(json_path, durable=False, compact_threshold=10 ** 9)
+    json_store.name_source = lambda: EMPLOYEES
+    db = SQLiteStorage(os.path.join(workdir, f'records_{count}.db'))
+    db.employees.save(EMPLOYEES)
+    db.records.replace_all(records)
+
+    rng = random.Random(11)
+    for record in rng.sample(records, min(200, count)):
+        changes = {'item': rng.choice(ITEMS) + ' 수정', 'recipient': rng.choice(RECIPIENTS),
+                   'transporter': rng.choice(list(EMPLOYEES))}
+        json_store.update(record['id'], changes)
+        db.records.update(record['id'], changes)
+    for record in rng.sample(records, min(100, count)):
+        json_store.delete(record['id'])
+        db.records.delete(record['id'])
+    extra = make_records(50)
+    for record in extra:
+        record['id'] = json_store.allocate_id()
+        json_store.insert(record)
+        db.records.insert(dict(record))
+
+    current = json_store.all()
+    check(json_store, current, 'JSON', errors)
+    check(db.records, db.records.all(), 'SQLite', errors)
+    for query in QUERIES:
+        if [r['id'] for r in json_store.query(query)] != [r['id'] for r in db.records.query(query)]:
+            errors.append(f"JSON/SQLite 결과 다름 '{query}'")
+    json_store.close()
+    db.records.close()
+    return errors
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [10000, 100000]
+    workdir = tempfile.mkdtemp(prefix='bench_search_')
+    errors = []
+    try:
+        for count in counts:
+            errors += bench(count, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    for error in errors:
+        print(f"실패: {error}")
+    print('\n통과' if not errors else '\n실패')
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
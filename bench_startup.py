@@ -0,0 +1,72 @@
+"""서버 시작 시간 측정 (import server → 첫 응답)
+
+사용법: python bench_startup.py [--runs 5] [--max-ms 0]
+새 파이썬 프로세스에서 server 를 불러와 GET / 첫 응답까지의 시간과 메모리(RSS 최대값)를 잰다.
+시작 과정에서 pandas/openpyxl 이 불러와지거나, 중앙값이 --max-ms 를 넘으면 종료 코드 1.
+데이터 파일은 임시 폴더에 만들어지므로 실제 데이터에는 영향이 없다.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# 새 프로세스에서 실행할 측정 코드
+PROBE = r'''
+import json, resource, sys, time
+started = time.perf_counter()
+import server
+imported = time.perf_counter()
+response = server.app.test_client().get('/')
+responded = time.perf_counter()
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'first_response_ms': (responded - started) * 1000,
+    'status': response.status_code,
+    'rss_mb': rss / 1024 if sys.platform != 'darwin' else rss / 1024 / 1024,
+    'heavy_modules': sorted(name for name in ('pandas', 'openpyxl', 'numpy') if name in sys.modules)
+}))
+sys.stdout.flush()
+'''
+
+
+def run_once(workdir):
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, '-c', PROBE], cwd=workdir, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='서버 시작 시간 측정')
+    parser.add_argument('--runs', type=int, default=5, help='측정 횟수')
+    parser.add_argument('--max-ms', type=float, default=0, help='첫 응답 중앙값 허용치 (0 이면 검사 안 함)')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_startup_')
+    try:
+        run_once(workdir)  # 처음 한 번은 데이터 파일 생성/디스크 캐시 예열
+        results = [run_once(workdir) for _ in range(args.runs)]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    import_ms = statistics.median(result['import_ms'] for result in results)
+    first_ms = statistics.median(result['first_response_ms'] for result in results)
+    rss_mb = statistics.median(result['rss_mb'] for result in results)
+    heavy = sorted({name for result in results for name in result['heavy_modules']})
+    print(f"import server: {import_ms:.0f}ms, 첫 응답까지: {first_ms:.0f}ms, RSS: {rss_mb:.1f}MB (중앙값, {args.runs}회)")
+    print(f"시작 시 불러온 무거운 모듈: {', '.join(heavy) if heavy else '없음'}")
+
+    failed = bool(heavy) or any(result['status'] != 200 for result in results)
+    if args.max_ms and first_ms > args.max_ms:
+        print(f"첫 응답 {first_ms:.0f}ms > 허용치 {args.max_ms:.0f}ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""JSON(스냅샷 + 저널) / SQLite 저장소 성능 비교
+
+사용법: python bench_storage.py [건수 ...]   (기본: 10000 100000 1000000)
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from storage import RecordStore
+from sqlite_storage import SQLiteStorage
+
+NAMES = ['Paul', 'L', 'Sammy', 'Kai', 'Jack', 'Anna', 'Jake', 'James', 'Jinie', 'Yup', 'Brown', 'Jayone']
+LOCATIONS = ['평촌', '판교', '광주본사', '광주R&D']
+STATUSES = ['완료', '완료', '완료', '진행중', '대기중']
+
+
+def make_records(count, seed=42):
+    """테스트용 기록 생성"""
+    rng = random.Random(seed)
+    start = date(2020, 1, 1)
+    records = []
+    for i in range(1, count + 1):
+        status = rng.choice(STATUSES)
+        day = start + timedelta(days=i * 2000 // count)
+        records.append({
+            'id': i,
+            'request_date': day.isoformat(),
+            'applicant': rng.choice(NAMES),
+            'transporter': rng.choice(NAMES) if status != '대기중' else '',
+            'from_location': rng.choice(LOCATIONS),
+            'to_location': rng.choice(LOCATIONS),
+            'item': '센서',
+            'applicant_amount': 5000,
+            'transporter_amount': rng.choice([5000, 10000]),
+            'accumulate_date': day.isoformat() if status == '완료' else '',
+            'deadline_date': '',
+            'status': status,
+            'created_at': f"{day.isoformat()}T{i % 24:02d}:00:00",
+            'source': 'bench',
+            'message_id': f"msg-{i}"
+        })
+    return records
+
+
+def timed(func, repeat=1):
+    """평균 실행 시간 (ms)"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) * 1000 / repeat
+
+
+def bench_backend(store, records):
+    results = {}
+    results['bulk_load'] = timed(lambda: store.replace_all(records))
+    results['all'] = timed(store.all, 3)
+    results['query_date'] = timed(lambda: store.query('', '2023-01-01', '2023-01-31'), 3)
+    results['query_search'] = timed(lambda: store.query('jin'), 3)
+    results['totals'] = timed(lambda: store.totals('', '2023-01-01', '2023-12-31'), 3)
+    results['latest_waiting'] = timed(store.latest_waiting, 3)
+    results['latest_progress'] = timed(store.latest_in_progress, 3)
+    results['next_id'] = timed(store.next_id, 3)
+    results['get'] = timed(lambda: store.get(len(records) // 2), 100)
+
+    next_id = store.next_id()
+    extra = make_records(100, seed=7)
+    for offset, record in enumerate(extra):
+        record['id'] = next_id + offset
+    results['insert'] = timed(lambda: [store.insert(r) for r in extra]) / len(extra)
+    results['update'] = timed(lambda: [store.update(r['id'], {'status': '완료'}) for r in extra]) / len(extra)
+    return results
+
+
+def latest_ids(store):
+    """웹훅 답장 처리에서 찾는 최근 요청 ID (두 백엔드가 같아야 함)"""
+    records = [store.latest_waiting(), store.latest_waiting('msg-7'), store.latest_in_progress()]
+    return [record and record['id'] for record in records]
+
+
+def main(sizes):
+    workdir = tempfile.mkdtemp(prefix='bench_storage_')
+    try:
+        for size in sizes:
+            records = make_records(size)
+            print(f"\n=== {size:,}건 ===")
+
+            json_store = RecordStore(os.path.join(workdir, f'json_{size}.json'), compact_threshold=10 ** 9)
+            json_results = bench_backend(json_store, records)
+            json_latest = latest_ids(json_store)
+            json_store.close()
+
+            sqlite_store = SQLiteStorage(os.path.join(workdir, f'sqlite_{size}.db')).records
+            sqlite_results = bench_backend(sqlite_store, records)
+            if latest_ids(sqlite_store) != json_latest:
+                print(f"실패: 최근 대기중/진행중 요청이 다름 (JSON {json_latest}, SQLite {latest_ids(sqlite_store)})")
+
+            print(f"{'작업':<16}{'JSON (ms)':>14}{'SQLite (ms)':>14}")
+            for name in json_results:
+                print(f"{name:<16}{json_results[name]:>14.3f}{sqlite_results[name]:>14.3f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000])
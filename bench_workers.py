@@ -0,0 +1,262 @@
+"""워커 수에 따른 처리량 측정 (로컬 부하 테스트)
+
+사용법: python bench_workers.py [--workers 1 2 4] [--clients 16] [--duration 10] [--backend json|sqlite]
+                                [--server builtin|gunicorn] [--records 5000]
+
+워커 수마다 임시 폴더에서 wsgi.py 로 서버를 띄우고 (잔디 알림은 jandi_stub.py 로),
+클라이언트 스레드들이 연결을 하나씩 유지한 채 다음 요청을 섞어서 보낸다:
+  - 70% GET /api/records?limit=50&sort=-id  (목록 페이지)
+  - 15% GET /api/stats?group_by=month       (현황 합계)
+  - 15% POST /webhook                       (운송 요청 생성)
+요청/초와 지연 시간(p50/p95/p99) 을 표로 출력하고, 끝나면 워커 간 상태를 확인한다:
+  - 웹훅으로 만든 기록이 빠짐없이 저장되고 ID 가 겹치지 않는지
+  - 다른 워커의 변경이 모든 워커의 순위 집계/포인트 원장에 반영됐는지 (/api/leaderboard/check, /api/points/check)
+틀리면 종료 코드 1.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlencode
+
+import bench_storage
+from storage import write_json_atomic
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class Client:
+    """연결 하나를 유지하는 HTTP 클라이언트 (관리자 로그인 쿠키 포함)"""
+
+    def __init__(self, port):
+        self.port = port
+        self.cookie = ''
+        self.conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+
+    def request(self, method, path, body=None, headers=None):
+        headers = dict(headers or {})
+        if self.cookie:
+            headers['Cookie'] = self.cookie
+        try:
+            self.conn.request(method, path, body, headers)
+            response = self.conn.getresponse()
+        except (http.client.HTTPException, OSError):
+            # 서버가 연결을 닫았으면 다시 연결 (같은 워커라는 보장은 없음)
+            self.conn.close()
+            self.conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=60)
+            self.conn.request(method, path, body, headers)
+            response = self.conn.getresponse()
+        data = response.read()
+        cookie = response.getheader('Set-Cookie')
+        if cookie:
+            self.cookie = cookie.split(';', 1)[0]
+        return response.status, data
+
+    def get_json(self, path):
+        status, data = self.request('GET', path)
+        return status, json.loads(data) if data else None
+
+    def post_json(self, path, payload):
+        status, data = self.request('POST', path, json.dumps(payload, ensure_ascii=False).encode('utf-8'),
+                                    {'Content-Type': 'application/json'})
+        return status, json.loads(data) if data else None
+
+    def login(self):
+        self.request('POST', '/admin_login', urlencode({'username': 'admin1', 'password': 'admin123'}),
+                     {'Content-Type': 'application/x-www-form-urlencoded'})
+
+    def close(self):
+        self.conn.close()
+
+
+def wait_ready(port, process, workers, timeout=60):
+    """워커 workers 개가 모두 응답할 때까지 대기 (새 연결마다 어느 워커가 받았는지 확인)"""
+    deadline = time.time() + timeout
+    seen = set()
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"서버가 시작하지 못했습니다 (코드 {process.returncode})")
+        try:
+            client = Client(port)
+            client.login()
+            status, stats = client.get_json('/api/cache_stats')
+            client.close()
+            if status == 200:
+                seen.add(stats['worker'])
+                if len(seen) >= workers:
+                    return
+        except OSError:
+            pass
+        time.sleep(0.05)
+    raise RuntimeError(f"서버 시작 시간 초과 (응답한 워커 {len(seen)}개)")
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run_load(port, clients, duration, run_id):
+    """클라이언트 스레드들이 duration 초 동안 요청 → (요청 수, 지연 목록(ms), 오류 목록, 생성한 기록 ID, 워커 pid 목록)"""
+    stop = threading.Event()
+    results = []
+    lock = threading.Lock()
+
+    def work(index):
+        rng = random.Random(index)
+        client = Client(port)
+        client.login()
+        _, stats = client.get_json('/api/cache_stats')
+        worker = stats.get('worker') if stats else None
+        latencies, errors, created = [], [], []
+        i = 0
+        while not stop.is_set():
+            roll = rng.random()
+            started = time.perf_counter()
+            if roll < 0.70:
+                status, _ = client.request('GET', '/api/records?limit=50&sort=-id')
+            elif roll < 0.85:
+                status, _ = client.request('GET', '/api/stats?group_by=month')
+            else:
+                marker = f"load-{run_id}-{index}-{i}"
+                status, body = client.post_json('/webhook', {'data': f'평촌 판교 {marker} Anna',
+                                                             'writerName': f'C{index}'})
+                if status == 200 and body.get('success'):
+                    created.append(body['record']['id'])
+                else:
+                    errors.append(f"웹훅 {status}")
+            latencies.append((time.perf_counter() - started) * 1000)
+            if status != 200:
+                errors.append(f"응답 {status}")
+            i += 1
+        with lock:
+            results.append((latencies, errors, created, worker, client))
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    started = time.perf_counter()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = [ms for result in results for ms in result[0]]
+    errors = [error for result in results for error in result[1]]
+    created = [record_id for result in results for record_id in result[2]]
+    workers = [result[3] for result in results]
+    connections = [result[4] for result in results]
+    return len(latencies) / elapsed, latencies, errors, created, workers, connections
+
+
+def check_workers(connections, created, refresh_interval):
+    """모든 워커가 같은 상태를 보는지 (연결마다 담당 워커가 다름)"""
+    errors = []
+    time.sleep(refresh_interval * 2 + 0.5)
+    _, records = connections[0].get_json('/api/records')
+    ids = [record['id'] for record in records]
+    if len(ids) != len(set(ids)):
+        errors.append(f"ID 중복 {len(ids) - len(set(ids))}건")
+    missing = set(created) - set(ids)
+    if missing:
+        errors.append(f"저장되지 않은 기록 {len(missing)}건")
+    if len(created) != len(set(created)):
+        errors.append('웹훅 응답의 기록 ID 가 겹침')
+
+    for client in connections:
+        for path in ('/api/leaderboard/check', '/api/points/check'):
+            status, body = client.get_json(path)
+            if status != 200 or not body.get('ok'):
+                errors.append(f"{path} 불일치: {json.dumps(body, ensure_ascii=False)[:200]}")
+                break
+        client.close()
+    return errors
+
+
+def bench(args, workers, stub_port):
+    workdir = tempfile.mkdtemp(prefix='bench_workers_')
+    port = free_port()
+    env = dict(os.environ, POINT_STORAGE=args.backend,
+               POINT_SQLITE_FILE=os.path.join(workdir, 'point_data.db'),
+               JANDI_WEBHOOK_URL=f'http://127.0.0.1:{stub_port}/webhook',
+               POINT_REFRESH_INTERVAL=str(args.refresh_interval))
+
+    records = bench_storage.make_records(args.records)
+    write_json_atomic(os.path.join(workdir, 'point_data.json'), records)
+    if args.backend == 'sqlite':
+        from sqlite_storage import migrate
+        migrate(os.path.join(workdir, 'point_data.json'), os.path.join(workdir, 'employee_data.json'),
+                os.path.join(workdir, 'point_data.db'))
+
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, 'wsgi.py'), '--host', '127.0.0.1', '--port', str(port),
+         '--workers', str(workers), '--threads', str(args.threads), '--server', args.server],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_ready(port, process, workers)
+        rate, latencies, errors, created, pids, connections = run_load(port, args.clients, args.duration, workers)
+        errors += check_workers(connections, created, args.refresh_interval)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{workers:>6}{rate:>12,.0f}{percentile(latencies, 0.5):>10.1f}{percentile(latencies, 0.95):>10.1f}"
+          f"{percentile(latencies, 0.99):>10.1f}{len(created):>10,}{len(set(pid for pid in pids if pid)):>10}")
+    return [f"워커 {workers}개: {error}" for error in errors[:10]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--threads', type=int, default=8, help='워커당 스레드 수 (gunicorn)')
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--backend', choices=('json', 'sqlite'), default='json')
+    parser.add_argument('--server', choices=('builtin', 'gunicorn'), default='builtin')
+    parser.add_argument('--records', type=int, default=5000, help='미리 넣어 둘 기록 수')
+    parser.add_argument('--refresh-interval', type=float, default=1.0)
+    args = parser.parse_args()
+
+    stub_port = free_port()
+    stub = subprocess.Popen([sys.executable, os.path.join(ROOT, 'jandi_stub.py'), '--port', str(stub_port)],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    print(f"{args.server} / {args.backend}, 클라이언트 {args.clients}개, {args.duration:g}초, CPU {os.cpu_count()}개")
+    print(f"{'워커':>6}{'요청/초':>12}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'생성':>10}{'응답 워커':>10}")
+    errors = []
+    try:
+        for workers in args.workers:
+            errors += bench(args, workers, stub_port)
+    finally:
+        stub.terminate()
+        stub.wait()
+
+    for error in errors:
+        print(f"실패: {error}")
+    print('\n통과' if not errors else '\n실패')
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,70 @@
+import os
+import threading
+from collections import OrderedDict
+
+
+class ChangeFeed:
+    """기록 변경 피드 (기록 저장소 변경을 받아 리비전을 매김)
+
+    리비전 토큰은 '<epoch>.<번호>' 형식이다. 번호는 변경마다 1씩 늘고,
+    저장소 전체가 다시 로드되면 epoch 가 바뀌어서 클라이언트가 처음부터 다시 받게 된다.
+    기록마다 마지막 변경 리비전만 남기므로 같은 기록이 여러 번 바뀌어도 한 번만 전달된다.
+    """
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._start_epoch()
+
+    def _start_epoch(self):
+        self.epoch = os.urandom(4).hex()
+        self.revision = 0
+        self._floor = 0  # 이 리비전 이하의 변경은 로그에서 밀려남
+        self._changes = OrderedDict()  # id → (리비전, 삭제 여부), 오래된 변경이 앞
+
+    def reset(self, records):
+        """전체 다시 로드됨 → 새 epoch"""
+        with self._lock:
+            self._start_epoch()
+
+    def apply(self, old, new):
+        """기록 하나가 old → new 로 바뀜 (추가는 old=None, 삭제는 new=None)"""
+        record_id = (new or old).get('id')
+        with self._lock:
+            self.revision += 1
+            self._changes[record_id] = (self.revision, new is None)
+            self._changes.move_to_end(record_id)
+            while len(self._changes) > self.max_entries:
+                _, (revision, _) = self._changes.popitem(last=False)
+                self._floor = revision
+
+    def token(self):
+        """현재 리비전 토큰"""
+        with self._lock:
+            return f"{self.epoch}.{self.revision}"
+
+    def since(self, token):
+        """token 이후 변경 (현재 토큰, 바뀐 id 목록, 삭제된 id 목록)
+
+        token 이 다른 epoch 이거나 로그에서 밀려난 시점이면 바뀐 id 목록 대신 None
+        (클라이언트가 전체를 다시 받아야 함).
+        """
+        epoch, _, number = (token or '').partition('.')
+        with self._lock:
+            current = f"{self.epoch}.{self.revision}"
+            try:
+                since = int(number)
+            except ValueError:
+                return current, None, None
+            if epoch != self.epoch or since < self._floor or since > self.revision:
+                return current, None, None
+
+            changed = []
+            deleted = []
+            for record_id, (revision, is_deleted) in reversed(self._changes.items()):
+                if revision <= since:
+                    break
+                (deleted if is_deleted else changed).append(record_id)
+        changed.reverse()
+        deleted.reverse()
+        return current, changed, deleted
@@ -0,0 +1,314 @@
+import codecs
+import hashlib
+import json
+import os
+import re
+import time
+from datetime import datetime
+
+from chat_parser import calculate_points, parse_chat_message
+from storage import write_json_atomic
+
+# 채팅 내보내기의 날짜 줄: 2025년 9월 20일
+DATE_PATTERN = re.compile(r'(\d{4})년\s*(\d{1,2})월\s*(\d{1,2})일')
+
+REQUEST_KEYWORDS = ('이동하시는 분', '이송 부탁', '전달 부탁', '전달 요청')
+TRANSPORT_KEYWORDS = ('전달드리겠습니다', '제가 전달', '전달하겠습니다')
+COMPLETE_KEYWORDS = ('받았습니다', '수령했습니다', '잘 받았습니다')
+ITEM_PATTERNS = ('센서', '박스', '노트북', 'ML-U', 'SL-U', '보드')
+
+# 가져오기 ID (체크포인트 파일 이름으로 쓰임)
+IMPORT_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+class ImportConflict(Exception):
+    """같은 가져오기를 이어서 할 수 없음 (reason: 'done' 이미 완료, 'mismatch' 다른 파일)"""
+
+    def __init__(self, message, reason):
+        super().__init__(message)
+        self.reason = reason
+
+
+def iter_lines(stream, chunk_size=64 * 1024, on_read=None):
+    """바이너리 스트림을 조금씩 읽어서 줄 단위로 내보냄 (전체를 메모리에 올리지 않음)"""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')(errors='replace')
+    pending = ''
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        if on_read:
+            on_read(len(chunk))
+        pending += decoder.decode(chunk)
+        lines = pending.split('\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line.rstrip('\r')
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending.rstrip('\r')
+
+
+def extract_item(line):
+    """줄에서 물품 이름 찾기"""
+    lowered = line.lower()
+    for pattern in ITEM_PATTERNS:
+        if pattern.lower() in lowered:
+            return pattern
+    return '물품'
+
+
+class ChatImporter:
+    """채팅 로그 → 운송 기록 가져오기
+
+    줄을 하나씩 받아 처리하고, batch_size 건 또는 checkpoint_lines 줄마다
+    ID 를 한 번에 발급받아 저장한 뒤 체크포인트를 남긴다.
+    import_id 를 주면 체크포인트가 <checkpoint_dir>/<import_id>.json 에 기록되고,
+    중간에 끊기면 같은 파일을 같은 import_id 로 다시 보내서 이어서 가져올 수 있다.
+    """
+
+    def __init__(self, store, import_id=None, checkpoint_dir='import_checkpoints',
+                 batch_size=500, checkpoint_lines=5000, collect=False, bytes_total=None):
+        self.store = store
+        self.import_id = import_id
+        self.checkpoint_path = os.path.join(checkpoint_dir, f"{import_id}.json") if import_id else None
+        self.batch_size = batch_size
+        self.checkpoint_lines = checkpoint_lines
+        self.records = [] if collect else None
+
+        self.current_date = None
+        self.pending_requests = {}  # 요청자 → 대기중인 기록
+        self.line_no = 0
+        self.added = 0
+        self.batches = 0
+        self.bytes_read = 0
+        self.bytes_total = bytes_total
+        self.status = 'running'
+        self.error = None
+        self.resumed_from = 0
+        self.started_at = time.time()
+
+        self._digest = hashlib.sha256()  # 처리한 줄 내용 (이어받기 시 같은 파일인지 확인)
+        self._checkpoint = None
+        self._reuse_ids = []
+
+        if self.checkpoint_path:
+            os.makedirs(checkpoint_dir, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # 실행
+    # ------------------------------------------------------------------
+    def count_bytes(self, size):
+        self.bytes_read += size
+
+    def run(self, lines):
+        """줄 목록(제너레이터 가능)을 끝까지 가져오기"""
+        lines = iter(lines)
+        try:
+            self._resume(lines)
+            self._checkpoint = self._state()
+            batch = []
+            for line in lines:
+                self.line_no += 1
+                self._digest.update(line.encode('utf-8') + b'\n')
+                record = self._process(line)
+                if record:
+                    batch.append(record)
+                if len(batch) >= self.batch_size or self.line_no - self._checkpoint['line_no'] >= self.checkpoint_lines:
+                    self._commit(batch)
+                    batch = []
+            self._commit(batch)
+        except ImportConflict as e:
+            self.status = 'rejected'
+            self.error = str(e)
+            raise
+        except Exception as e:
+            # 체크포인트는 남겨둠 (같은 import_id 로 다시 보내면 이어서 진행)
+            self.status = 'failed'
+            self.error = str(e)
+            raise
+
+        self.status = 'done'
+        self._write_checkpoint(self._state())
+        return self
+
+    def _process(self, line):
+        """줄 하나 처리, 새 기록이 생기면 반환"""
+        date_match = DATE_PATTERN.search(line)
+        if date_match:
+            year, month, day = date_match.groups()
+            self.current_date = f"{year}-{month.zfill(2)}-{day.zfill(2)}"
+            return None
+
+        # 운송 요청
+        if any(keyword in line for keyword in REQUEST_KEYWORDS):
+            parsed = parse_chat_message(line)
+            if not (parsed['from_location'] and parsed['to_location']):
+                return None
+            applicant_points, transporter_points = calculate_points(
+                parsed['from_location'],
+                parsed['to_location']
+            )
+            record = {
+                'id': None,  # 저장할 때 묶어서 발급
+                'request_date': self.current_date or datetime.now().strftime('%Y-%m-%d'),
+                'applicant': parsed['requester'] or '미지정',
+                'transporter': '',
+                'from_location': parsed['from_location'],
+                'to_location': parsed['to_location'],
+                'item': extract_item(line),
+                'applicant_amount': applicant_points,
+                'transporter_amount': transporter_points,
+                'accumulate_date': '',
+                'deadline_date': '',
+                'status': '진행중',
+                'created_at': datetime.now().isoformat(),
+                'source': 'chat_import'
+            }
+            if self.import_id:
+                record['import_id'] = self.import_id
+
+            # 요청자를 키로 저장
+            if parsed['requester']:
+                self.pending_requests[parsed['requester']] = record
+            return record
+
+        # 전달 응답: 전달자가 없는 가장 오래된 대기 요청에 배정
+        if any(keyword in line for keyword in TRANSPORT_KEYWORDS):
+            parsed = parse_chat_message(line)
+            for request in self.pending_requests.values():
+                if request['status'] == '진행중' and not request['transporter']:
+                    self._modify(request, {'transporter': parsed['requester'] or parsed['transporter'] or '미지정'})
+                    break
+
+        # 완료: 가장 오래된 대기 요청 완료 처리
+        elif any(keyword in line for keyword in COMPLETE_KEYWORDS):
+            for requester, request in list(self.pending_requests.items()):
+                if request['status'] == '진행중':
+                    self._modify(request, {
+                        'status': '완료',
+                        'accumulate_date': self.current_date or datetime.now().strftime('%Y-%m-%d')
+                    })
+                    del self.pending_requests[requester]
+                    break
+        return None
+
+    def _modify(self, record, fields):
+        """대기 요청 수정 (이미 저장된 기록이면 저장소에도 반영)"""
+        record.update(fields)
+        if record['id'] is not None:
+            self.store.update(record['id'], fields)
+
+    # ------------------------------------------------------------------
+    # 저장/체크포인트
+    # ------------------------------------------------------------------
+    def _allocate(self, count):
+        """ID 발급 (이어받기 중이면 끊기기 전에 이 가져오기가 저장한 ID 를 그대로 사용)"""
+        ids = []
+        while self._reuse_ids and len(ids) < count:
+            record_id = self._reuse_ids.pop(0)
+            existing = self.store.get(record_id)
+            if existing and existing.get('import_id') == self.import_id:
+                ids.append(record_id)
+        if len(ids) < count:
+            ids += self.store.allocate_ids(count - len(ids))
+        return ids
+
+    def _commit(self, batch):
+        if batch:
+            ids = self._allocate(len(batch))
+            # 저장 도중 끊겨도 같은 ID 로 덮어쓰도록 발급한 ID 를 먼저 기록
+            self._write_checkpoint(dict(self._checkpoint, in_flight=ids))
+            for record, record_id in zip(batch, ids):
+                record['id'] = record_id
+            self.store.insert_many(batch)
+            self.added += len(batch)
+            self.batches += 1
+            if self.records is not None:
+                self.records.extend(batch)
+
+        self._checkpoint = self._state()
+        self._write_checkpoint(self._checkpoint)
+
+    def _state(self):
+        return {
+            'import_id': self.import_id,
+            'status': self.status,
+            'line_no': self.line_no,
+            'digest': self._digest.hexdigest(),
+            'current_date': self.current_date,
+            'pending': {requester: record['id'] for requester, record in self.pending_requests.items()},
+            'added': self.added,
+            'batches': self.batches,
+            'in_flight': None,
+            'updated_at': datetime.now().isoformat()
+        }
+
+    def _write_checkpoint(self, state):
+        if self.checkpoint_path:
+            write_json_atomic(self.checkpoint_path, state)
+
+    def _resume(self, lines):
+        """체크포인트가 있으면 처리한 줄을 건너뛰고 상태 복원"""
+        checkpoint = read_checkpoint(self.checkpoint_path) if self.checkpoint_path else None
+        if not checkpoint:
+            return
+        if checkpoint['status'] == 'done':
+            raise ImportConflict('이미 완료된 가져오기입니다.', 'done')
+
+        for _ in range(checkpoint['line_no']):
+            line = next(lines, None)
+            if line is None:
+                break
+            self._digest.update(line.encode('utf-8') + b'\n')
+            self.line_no += 1
+        if self.line_no != checkpoint['line_no'] or self._digest.hexdigest() != checkpoint['digest']:
+            raise ImportConflict('체크포인트와 다른 파일입니다.', 'mismatch')
+
+        self.current_date = checkpoint['current_date']
+        self.pending_requests = {}
+        for requester, record_id in checkpoint['pending'].items():
+            record = self.store.get(record_id)
+            if record:
+                self.pending_requests[requester] = dict(record)
+        self.added = checkpoint['added']
+        self.batches = checkpoint['batches']
+        self._reuse_ids = list(checkpoint.get('in_flight') or [])
+        self.resumed_from = self.line_no
+
+    # ------------------------------------------------------------------
+    # 상태
+    # ------------------------------------------------------------------
+    def progress(self):
+        return {
+            'import_id': self.import_id,
+            'status': self.status,
+            'error': self.error,
+            'lines': self.line_no,
+            'added': self.added,
+            'batches': self.batches,
+            'bytes_read': self.bytes_read,
+            'bytes_total': self.bytes_total,
+            'resumed_from': self.resumed_from,
+            'elapsed': round(time.time() - self.started_at, 3)
+        }
+
+
+def parse_lines(lines):
+    """저장하지 않고 줄 목록만 해석해서 새 기록 목록 반환 (ID 는 None)"""
+    importer = ChatImporter(None)
+    records = []
+    for line in lines:
+        record = importer._process(line)
+        if record:
+            records.append(record)
+    return records
+
+
+def read_checkpoint(path):
+    """체크포인트 파일 읽기 (없으면 None)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,175 @@
+import re
+from functools import lru_cache
+
+# ----------------------------------------------------------------------
+# 문법 정의 (모듈을 불러올 때 한 번만 컴파일)
+# ----------------------------------------------------------------------
+COMMAND_PREFIX = '/싣고받고'
+
+# 위치별 별칭 (여러 위치에 걸리면 뒤에 있는 위치가 우선, 예: '광주R&D' → 광주R&D)
+LOCATION_ALIASES = (
+    ('평촌', ('평촌', '제조혁신센터')),
+    ('판교', ('판교', '판교R&D', '판교rnd', '1센터', '2센터')),
+    ('광주본사', ('광주본사', '광주', '본사')),
+    ('광주R&D', ('광주R&D', '광주rnd', 'R&D', 'rnd'))
+)
+
+# /싣고받고 [명령] [번호]
+ID_COMMANDS = {
+    '접수': 'accept_id',
+    '완료': 'complete_id'
+}
+
+# 위치를 못 찾았을 때 메시지 전체에서 시도하는 방향 표현 (순서대로 먼저 맞는 것 사용)
+FALLBACK_PATTERNS = (
+    r'(평촌|판교|광주)[\s]*[→>-]+[\s]*(평촌|판교|광주)',
+    r'(평촌|판교|광주)[\s]*--+>[\s]*(평촌|판교|광주)',
+    r'(평촌|판교|광주)[\s]*에서[\s]*(평촌|판교|광주)[\s]*로',
+    r'(평촌|판교|광주).*to.*(평촌|판교|광주)'
+)
+
+# 메시지 종류별 키워드
+REQUEST_KEYWORDS = ('이송 부탁', '전달 부탁', '전달 요청', '이동하시는 분', '운송 요청')
+ACCEPT_KEYWORDS = ('접수', '신청')
+COMPLETE_KEYWORDS = ('받았습니다', '수령했습니다', '잘 받았습니다', '완료')
+
+# 태그된 이름: @Paul(윤희선)
+NAME_PATTERN = r'@?([A-Za-z]+)\([가-힣]+\)'
+
+
+def _alternation(words):
+    return re.compile('|'.join(re.escape(word) for word in words))
+
+
+# 뒤에 있는 위치부터 검사해서 처음 맞는 위치를 사용
+_LOCATION_MATCHERS = tuple((key, _alternation(aliases)) for key, aliases in reversed(LOCATION_ALIASES))
+_FALLBACK_REGEXES = tuple(re.compile(pattern, re.IGNORECASE) for pattern in FALLBACK_PATTERNS)
+_FALLBACK_WORD = re.compile('평촌|판교|광주')
+_REQUEST_REGEX = _alternation(REQUEST_KEYWORDS)
+_ACCEPT_REGEX = _alternation(ACCEPT_KEYWORDS)
+_COMPLETE_REGEX = _alternation(COMPLETE_KEYWORDS)
+_NAME_REGEX = re.compile(NAME_PATTERN)
+
+
+@lru_cache(maxsize=1024)
+def normalize_location(text):
+    """위치 표현 → 위치 이름 (없으면 None)"""
+    for key, matcher in _LOCATION_MATCHERS:
+        if matcher.search(text):
+            return key
+    return None
+
+
+def calculate_points(from_location, to_location):
+    """경로에 따른 포인트 계산"""
+    # 지역 그룹 정의
+    수도권 = ['평촌', '판교']
+    광주권 = ['광주본사', '광주R&D']
+
+    # 출발지와 도착지의 지역 확인
+    from_region = None
+    to_region = None
+
+    if from_location in 수도권:
+        from_region = '수도권'
+    elif from_location in 광주권:
+        from_region = '광주권'
+
+    if to_location in 수도권:
+        to_region = '수도권'
+    elif to_location in 광주권:
+        to_region = '광주권'
+
+    # 포인트 계산: 요청자는 항상 5000P, 전달자는 지역에 따라
+    applicant_points = 5000
+
+    if from_region == to_region:
+        transporter_points = 5000  # 같은 지역 내
+    else:
+        transporter_points = 10000  # 다른 지역으로
+
+    return applicant_points, transporter_points
+
+
+def _id_command(message_type, request_id):
+    return {
+        'message_type': message_type,
+        'request_id': request_id,
+        'from_location': None,
+        'to_location': None,
+        'requester': None,
+        'transporter': None
+    }
+
+
+def _fallback_locations(message):
+    """방향 표현 패턴으로 출발지/도착지 찾기"""
+    # 모든 패턴이 위치 단어를 두 번 이상 필요로 하므로 먼저 걸러냄
+    words = _FALLBACK_WORD.finditer(message)
+    if next(words, None) is None or next(words, None) is None:
+        return None
+    for regex in _FALLBACK_REGEXES:
+        match = regex.search(message)
+        if match:
+            return normalize_location(match.group(1)), normalize_location(match.group(2))
+    return None
+
+
+def parse_chat_message(message):
+    """채팅 메시지에서 운송 정보 추출"""
+    stripped = message.strip()
+    parts = stripped.split()
+    is_command = stripped.startswith(COMMAND_PREFIX)
+
+    from_text = None
+    to_text = None
+    if is_command:
+        if len(parts) >= 3 and parts[1] in ID_COMMANDS:
+            # /싣고받고 접수 [번호], /싣고받고 완료 [번호]
+            try:
+                return _id_command(ID_COMMANDS[parts[1]], int(parts[2]))
+            except ValueError:
+                pass
+        elif len(parts) >= 5:
+            # /싣고받고 물품명 수령자 출발지 도착지
+            from_text, to_text = parts[3], parts[4]
+        elif len(parts) >= 3:
+            # 기존 방식 호환: /싣고받고 출발지 도착지
+            from_text, to_text = parts[1], parts[2]
+    elif len(parts) >= 2:
+        # 잔디 웹훅 data 필드: 출발지 도착지 [물품명] [수령자]
+        from_text, to_text = parts[0], parts[1]
+
+    from_loc = None
+    to_loc = None
+    if from_text and to_text:
+        from_loc = normalize_location(from_text)
+        to_loc = normalize_location(to_text)
+
+    # 위에서 찾지 못했다면 방향 표현 패턴 시도 (하위 호환성)
+    if not from_loc or not to_loc:
+        found = _fallback_locations(message)
+        if found:
+            from_loc, to_loc = found
+
+    # 메시지 타입 분류
+    if from_loc and to_loc:
+        message_type = 'request'
+    elif _REQUEST_REGEX.search(message):
+        message_type = 'request'
+    elif not is_command and _ACCEPT_REGEX.search(message):
+        message_type = 'accept'
+    elif _COMPLETE_REGEX.search(message):
+        message_type = 'complete'
+    else:
+        message_type = 'unknown'
+
+    return {
+        'from_location': from_loc,
+        'to_location': to_loc,
+        'message_type': message_type,
+        'names': _NAME_REGEX.findall(message),
+        'requester': None,
+        'transporter': None,
+        'recipient': None
+    }
@@ -0,0 +1,95 @@
+import threading
+from bisect import bisect_left, bisect_right, insort
+
+
+def date_key(record):
+    """기록의 적립일 ('' 이면 아직 적립되지 않은 요청)"""
+    return record.get('accumulate_date') or ''
+
+
+def date_range(keys, date_from='', date_to=''):
+    """(적립일, 값) 정렬 목록에서 date_from <= 적립일 <= date_to 인 항목의 [시작, 끝) 위치
+
+    목록에는 적립일이 있는 항목만 들어 있어야 한다 (적립일 없는 요청은 범위 조건에 해당하지 않음).
+    """
+    start = bisect_left(keys, date_from, key=lambda item: item[0]) if date_from else 0
+    end = bisect_right(keys, date_to, key=lambda item: item[0]) if date_to else len(keys)
+    return start, max(start, end)
+
+
+class DateIndex:
+    """적립일(accumulate_date) 범위 조회 색인 (기록 저장소 변경을 받아 증분 갱신)
+
+    적립일이 있는 기록은 (적립일, ID) 정렬 목록에 두고 bisect 로 범위를 찾으므로
+    date_from/date_to 조회가 O(log n + k) 이다.
+    적립일이 비어 있는 기록 (대기중/진행중 요청) 은 pending 에 따로 두며, 날짜 범위 조회에는 나오지 않는다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys = []
+        self._pending = set()
+        self._positions = {}
+        self._next_position = 0
+
+    def reset(self, records):
+        """전체 기록으로 다시 만들기"""
+        with self._lock:
+            self._keys = []
+            self._pending = set()
+            self._positions = {}
+            self._next_position = 0
+            for record in records:
+                self._position(record['id'])
+                date = date_key(record)
+                if date:
+                    self._keys.append((date, record['id']))
+                else:
+                    self._pending.add(record['id'])
+            self._keys.sort()
+
+    def apply(self, old, new):
+        """기록 하나가 old → new 로 바뀜 (추가는 old=None, 삭제는 new=None)"""
+        with self._lock:
+            if old:
+                self._remove(old)
+                if new is None:
+                    self._positions.pop(old['id'], None)
+            if new:
+                self._position(new['id'])
+                date = date_key(new)
+                if date:
+                    insort(self._keys, (date, new['id']))
+                else:
+                    self._pending.add(new['id'])
+
+    def _position(self, record_id):
+        # 저장소의 dict 순서와 같게: 수정은 자리 유지, 새로 추가되면 맨 뒤
+        if record_id not in self._positions:
+            self._positions[record_id] = self._next_position
+            self._next_position += 1
+
+    def _remove(self, record):
+        date = date_key(record)
+        if not date:
+            self._pending.discard(record['id'])
+            return
+        i = bisect_left(self._keys, (date, record['id']))
+        if i < len(self._keys) and self._keys[i] == (date, record['id']):
+            del self._keys[i]
+
+    def between(self, date_from='', date_to=''):
+        """date_from <= 적립일 <= date_to 인 기록 ID 목록 (저장소 순서, 적립일 없는 기록 제외)"""
+        with self._lock:
+            start, end = date_range(self._keys, date_from, date_to)
+            return sorted((record_id for _, record_id in self._keys[start:end]),
+                          key=self._positions.__getitem__)
+
+    def pending(self):
+        """적립일이 없는 기록 ID 목록 (저장소 순서)"""
+        with self._lock:
+            return sorted(self._pending, key=self._positions.__getitem__)
+
+    def stats(self):
+        with self._lock:
+            return {'dated': len(self._keys), 'pending': len(self._pending)}
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import threading
+
+from spreadsheet_io import is_csv, iter_csv, load_pandas, read_excel, write_xlsx
+
+# 직원 엑셀/CSV 컬럼
+REQUIRED_COLUMNS = ('ID', '이름', '부서')
+POINTS_COLUMN = '포인트'
+
+# 직원 등록 템플릿 (컬럼이 바뀌면 템플릿 파일과 ETag 도 바뀐다)
+TEMPLATE_COLUMNS = REQUIRED_COLUMNS + (POINTS_COLUMN,)
+TEMPLATE_ROWS = (
+    ('예시1', '홍길동', '평촌', 0),
+    ('예시2', '김철수', '판교', 0),
+    ('예시3', '이영희', '광주', 0)
+)
+
+# 오류 메시지에 보여줄 잘못된 행 번호 수
+MAX_BAD_ROWS = 5
+
+
+def check_columns(columns):
+    for col in REQUIRED_COLUMNS:
+        if col not in columns:
+            raise ValueError(f'필수 컬럼 {col}이(가) 없습니다.')
+
+
+def bad_points_error(rows):
+    return ValueError(f'포인트가 숫자가 아닌 행이 있습니다: {rows}')
+
+
+def read_csv_employees(path):
+    """CSV → ({ID: 직원}, 건너뛴 행 수), pandas 없이 한 줄씩 읽음 (같은 ID 는 마지막 행 우선)"""
+    header, rows = iter_csv(path)
+    columns = {name.strip(): index for index, name in enumerate(header)}
+    check_columns(columns)
+    id_at, name_at, department_at = (columns[col] for col in REQUIRED_COLUMNS)
+    points_at = columns.get(POINTS_COLUMN)
+    width = max(columns.values()) + 1
+
+    employees = {}
+    skipped = 0
+    bad_rows = []
+    for row_no, row in enumerate(rows, 2):
+        if not row:
+            continue  # 빈 줄
+        if len(row) < width:
+            row = row + [''] * (width - len(row))
+
+        emp_id = row[id_at].strip()
+        if not emp_id:
+            skipped += 1
+            continue
+
+        points = 0
+        raw_points = row[points_at].strip() if points_at is not None else ''
+        if raw_points:
+            try:
+                points = int(float(raw_points))
+            except (ValueError, OverflowError):
+                bad_rows.append(row_no)
+                if len(bad_rows) >= MAX_BAD_ROWS:
+                    break
+                continue
+
+        employees[emp_id] = {
+            'name': row[name_at].strip(),
+            'department': row[department_at].strip(),
+            'total_points': points
+        }
+
+    if bad_rows:
+        raise bad_points_error(bad_rows)
+    return employees, skipped
+
+
+def normalize_frame(df, first_row=2):
+    """컬럼 확인 + 형 변환 → ID/이름/부서/포인트 DataFrame
+
+    ID 가 빈 행은 버리고, 포인트가 숫자가 아니면 ValueError (엑셀 행 번호 포함).
+    first_row 는 df 첫 행의 엑셀 행 번호 (머리글 다음 줄이 2).
+    """
+    pd = load_pandas()
+    df.columns = [str(column).strip() for column in df.columns]
+    check_columns(df.columns)
+
+    ids = df['ID'].astype('string').str.strip()
+    valid = ids.notna() & (ids != '')
+
+    if POINTS_COLUMN in df.columns:
+        raw_points = df[POINTS_COLUMN]
+        points = pd.to_numeric(raw_points, errors='coerce')
+        bad = valid & points.isna() & raw_points.notna()
+        if bad.any():
+            raise bad_points_error((bad.to_numpy().nonzero()[0][:MAX_BAD_ROWS] + first_row).tolist())
+        points = points.fillna(0).astype('int64')
+    else:
+        points = pd.Series(0, index=df.index, dtype='int64')
+
+    result = pd.DataFrame({
+        'ID': ids,
+        'name': df['이름'].astype('string').fillna('').str.strip(),
+        'department': df['부서'].astype('string').fillna('').str.strip(),
+        'total_points': points
+    })
+    return result[valid], int((~valid).sum())
+
+
+def read_excel_employees(path):
+    """엑셀 → ({ID: 직원}, 건너뛴 행 수), 컬럼 단위로 변환 (같은 ID 는 마지막 행 우선)"""
+    # ID 는 처음부터 문자열로 읽어서 1001 → '1001.0' 같은 변환을 막는다
+    df, skipped = normalize_frame(read_excel(path, dtype={'ID': str}))
+    employees = {
+        emp_id: {'name': name, 'department': department, 'total_points': int(points)}
+        for emp_id, name, department, points in zip(
+            df['ID'].tolist(),
+            df['name'].tolist(),
+            df['department'].tolist(),
+            df['total_points'].tolist()
+        )
+    }
+    return employees, skipped
+
+
+def read_employees(path):
+    """직원 파일 → ({ID: 직원}, 건너뛴 행 수)"""
+    if is_csv(path):
+        return read_csv_employees(path)
+    return read_excel_employees(path)
+
+
+def ingest_employees(path, employee_store):
+    """직원 파일을 읽어서 저장소에 한 번에 반영, {'added', 'updated', 'skipped'} 반환"""
+    employees, skipped = read_employees(path)
+
+    existing = set(employee_store.load()) if employee_store.exists() else set()
+    updated = len(existing.intersection(employees))
+    employee_store.upsert(employees)
+
+    return {
+        'added': len(employees) - updated,
+        'updated': updated,
+        'skipped': skipped
+    }
+
+
+_template_lock = threading.Lock()
+_template_cache = {}  # 스키마 해시 → xlsx 바이트
+
+
+def template_key(columns=TEMPLATE_COLUMNS, rows=TEMPLATE_ROWS):
+    """템플릿 스키마 해시 (ETag 로도 사용, 워커 프로세스마다 같은 값)"""
+    schema = json.dumps([list(columns), [list(row) for row in rows]], ensure_ascii=False)
+    return hashlib.sha256(schema.encode('utf-8')).hexdigest()[:16]
+
+
+def employee_template():
+    """(스키마 해시, xlsx 바이트) - 스키마별로 한 번만 만들고 메모리에 보관"""
+    key = template_key()
+    data = _template_cache.get(key)
+    if data is None:
+        with _template_lock:
+            data = _template_cache.get(key)
+            if data is None:
+                data = write_xlsx(TEMPLATE_COLUMNS, TEMPLATE_ROWS)
+                _template_cache.clear()
+                _template_cache[key] = data
+    return key, data
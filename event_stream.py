@@ -0,0 +1,162 @@
+import json
+import os
+import queue
+import threading
+from collections import deque
+
+
+def classify(old, new):
+    """기록 변경 → 이벤트 종류"""
+    if old is None:
+        return 'record-created'
+    if new is None:
+        return 'record-deleted'
+    if old.get('status') != new.get('status'):
+        if new.get('status') == '진행중':
+            return 'record-assigned'
+        if new.get('status') == '완료':
+            return 'record-completed'
+    return 'record-edited'
+
+
+def format_event(event_id, event_type, data):
+    """SSE 메시지 형식"""
+    return f"id: {event_id}\nevent: {event_type}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class EventBroker:
+    """기록 변경 이벤트를 SSE 구독자에게 전달 (기록 저장소 변경을 받아 발행)
+
+    구독자마다 크기가 정해진 큐를 두고, 느린 구독자의 큐가 넘치면 그 연결만 끊는다
+    (브라우저가 Last-Event-ID 로 다시 붙어서 놓친 이벤트를 받아감).
+    최근 이벤트는 history 개까지 보관해서 재접속 시 이어서 보내고,
+    그보다 오래됐거나 서버가 다시 시작됐으면 reset 이벤트로 전체 재조회를 요청한다.
+    스트림 하나가 연결 동안 요청 스레드 하나를 차지하므로 구독자는 max_subscribers 명까지만 받는다
+    (넘으면 stream() 이 None, 화면은 변경 피드 폴링으로 대신함).
+    """
+
+    def __init__(self, revision=None, history=1000, buffer_size=100, heartbeat=15.0, max_subscribers=None):
+        self.revision = revision  # 이벤트에 같이 실어 보낼 변경 피드 리비전
+        self.buffer_size = buffer_size
+        self.heartbeat = heartbeat
+        self.max_subscribers = max_subscribers
+        self.epoch = os.urandom(4).hex()
+        self._seq = 0
+        self._total = 0  # 전체 기록 수 (이벤트에 같이 보내서 화면 건수를 맞춤)
+        self._history = deque(maxlen=history)  # (번호, SSE 메시지)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._counters = {'published': 0, 'overflows': 0, 'resumed': 0, 'resets': 0, 'rejected': 0}
+
+    # ------------------------------------------------------------------
+    # 저장소 리스너
+    # ------------------------------------------------------------------
+    def reset(self, records):
+        """전체 다시 로드됨 → 구독자에게 전체 재조회 요청"""
+        with self._lock:
+            self._total = len(records)
+            if self._seq == 0 and not self._subscribers:
+                return
+        self.publish('reset', {})
+
+    def apply(self, old, new):
+        event_type = classify(old, new)
+        with self._lock:
+            self._total += (old is None) - (new is None)
+            total = self._total
+        if event_type == 'record-deleted':
+            self.publish(event_type, {'id': old.get('id'), 'total': total})
+        else:
+            self.publish(event_type, {'record': new, 'total': total})
+
+    # ------------------------------------------------------------------
+    # 발행/구독
+    # ------------------------------------------------------------------
+    def publish(self, event_type, data):
+        if self.revision:
+            data = dict(data, revision=self.revision())
+        with self._lock:
+            self._seq += 1
+            message = format_event(f"{self.epoch}.{self._seq}", event_type, data)
+            self._history.append((self._seq, message))
+            self._counters['published'] += 1
+            subscribers = list(self._subscribers)
+
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(message)
+            except queue.Full:
+                # 버퍼가 넘친 구독자는 연결을 끊고 재접속하게 함
+                self._close(subscriber)
+
+    def _close(self, subscriber):
+        with self._lock:
+            if subscriber not in self._subscribers:
+                return
+            self._subscribers.discard(subscriber)
+            self._counters['overflows'] += 1
+            # 쌓인 메시지는 보내지 않음 (재접속 시 마지막으로 받은 이벤트 다음부터 이어 보냄)
+            subscriber.closed = True
+        try:
+            subscriber.put_nowait(None)  # 대기 중인 스트림 깨우기
+        except queue.Full:
+            pass
+
+    def _backlog(self, last_event_id):
+        """Last-Event-ID 이후 보관된 이벤트 (이어 보낼 수 없으면 None)"""
+        epoch, _, number = last_event_id.partition('.')
+        try:
+            since = int(number)
+        except ValueError:
+            return None
+        if epoch != self.epoch or since > self._seq:
+            return None
+        if since < self._seq and (not self._history or self._history[0][0] > since + 1):
+            return None
+        return [message for seq, message in self._history if seq > since]
+
+    def stream(self, last_event_id=''):
+        """구독자 하나의 SSE 메시지 제너레이터 (구독자가 이미 max_subscribers 명이면 None)"""
+        subscriber = queue.Queue(maxsize=self.buffer_size)
+        subscriber.closed = False
+        with self._lock:
+            if self.max_subscribers is not None and len(self._subscribers) >= self.max_subscribers:
+                self._counters['rejected'] += 1
+                return None
+            backlog = self._backlog(last_event_id) if last_event_id else []
+            self._subscribers.add(subscriber)
+            if last_event_id:
+                self._counters['resumed' if backlog is not None else 'resets'] += 1
+        return self._messages(subscriber, backlog)
+
+    def _messages(self, subscriber, backlog):
+        try:
+            # 연결 직후 재접속 간격 안내 (밀리초)
+            yield 'retry: 3000\n\n'
+            if backlog is None:
+                yield format_event(f"{self.epoch}.{self._seq}", 'reset', {})
+            else:
+                for message in backlog:
+                    yield message
+
+            while True:
+                try:
+                    message = subscriber.get(timeout=self.heartbeat)
+                except queue.Empty:
+                    # 하트비트 (프록시 연결 유지, 끊긴 클라이언트 감지)
+                    yield ': heartbeat\n\n'
+                    continue
+                if message is None or subscriber.closed:
+                    return
+                yield message
+        finally:
+            with self._lock:
+                self._subscribers.discard(subscriber)
+
+    def metrics(self):
+        with self._lock:
+            result = dict(self._counters)
+            result['subscribers'] = len(self._subscribers)
+            result['max_subscribers'] = self.max_subscribers
+            result['last_event_id'] = f"{self.epoch}.{self._seq}"
+        return result
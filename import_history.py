@@ -0,0 +1,165 @@
+"""잔디 채팅 내보내기 파일 여러 개를 한 번에 가져오기 (과거 기록 일괄 등록)
+
+사용법: python import_history.py 내보내기1.txt 내보내기2.txt ... [--workers 4] [--dry-run]
+
+파일을 'YYYY년 M월 D일' 날짜 줄 단위(하루치)로 나눠서 프로세스 풀에서 동시에 해석하고,
+결과는 (날짜, 파일 순서, 파일 안 순서) 로 정렬해서 ID 를 차례대로 발급한 뒤 묶어서 저장한다.
+입력이 같으면 어느 워커가 먼저 끝나든 같은 순서/ID 로 등록된다.
+
+- 여러 내보내기 파일에 같은 날이 똑같이 들어 있으면 한 번만 가져온다 (--keep-duplicates 로 끄기)
+- 기록마다 하루치 내용의 해시(import_id) 와 하루치 안의 순서(import_row) / 하루치 건수(import_rows) 를 남겨서,
+  다시 실행하면 끝까지 저장된 날은 건너뛰고, 중간에 끊긴 날은 빠진 줄만 가져온다
+- 하루치는 여러 저장 묶음에 나뉘지 않는다 (하루치 단위로 한 트랜잭션)
+- ID 발급/저장은 파일 락(JSON) 또는 트랜잭션(SQLite) 으로 보호되므로 서버 실행 중에도 가능
+"""
+import argparse
+import hashlib
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from chat_import import DATE_PATTERN, iter_lines, parse_lines
+from storage import open_storage
+
+DATA_FILE = 'point_data.json'
+EMPLOYEE_FILE = 'employee_data.json'
+
+
+def split_days(path):
+    """파일을 날짜 줄 기준으로 나누기 [(날짜, 줄 목록), ...] (첫 날짜 줄 이전은 날짜 None)"""
+    shards = []
+    date = None
+    lines = []
+    with open(path, 'rb') as f:
+        for line in iter_lines(f):
+            match = DATE_PATTERN.search(line)
+            if match:
+                if lines:
+                    shards.append((date, lines))
+                year, month, day = match.groups()
+                date = f"{year}-{month.zfill(2)}-{day.zfill(2)}"
+                lines = []
+            lines.append(line)
+    if lines:
+        shards.append((date, lines))
+    return shards
+
+
+def shard_key(lines):
+    """하루치 내용 해시 (중복 판단, 기록의 import_id)"""
+    digest = hashlib.sha256()
+    for line in lines:
+        digest.update(line.encode('utf-8') + b'\n')
+    return f"history-{digest.hexdigest()[:16]}"
+
+
+def parse_shard(shard):
+    """워커: 하루치 줄 → 새 기록 목록"""
+    order, key, lines = shard
+    records = parse_lines(lines)
+    for row, record in enumerate(records):
+        record['import_id'] = key
+        record['import_row'] = row
+        record['import_rows'] = len(records)
+    return order, records
+
+
+def imported_rows(store):
+    """이전 실행에서 저장된 줄 → (끝까지 저장된 날의 해시 집합, {해시: 저장된 import_row 집합})"""
+    rows = {}
+    expected = {}
+    for record in store.all():
+        key = record.get('import_id')
+        if record.get('source') == 'chat_import' and key:
+            rows.setdefault(key, set()).add(record.get('import_row'))
+            expected[key] = record.get('import_rows')
+    # import_rows 가 없는 기록 (이전 버전으로 가져온 날) 은 끝까지 저장된 것으로 본다
+    complete = {key for key, saved in rows.items() if expected[key] is None or len(saved) >= expected[key]}
+    return complete, rows
+
+
+def collect_shards(paths, keep_duplicates=False, skip_keys=()):
+    """모든 파일을 나눠서 (정렬 키, 내용 해시, 줄 목록) 목록으로, 중복/이미 가져온 날 제외"""
+    shards = []
+    seen = set(skip_keys)
+    skipped = 0
+    for file_index, path in enumerate(paths):
+        for shard_index, (date, lines) in enumerate(split_days(path)):
+            key = shard_key(lines)
+            if key in seen and (not keep_duplicates or key in skip_keys):
+                skipped += 1
+                continue
+            seen.add(key)
+            shards.append(((date or '', file_index, shard_index), key, lines))
+    shards.sort(key=lambda shard: shard[0])
+    return shards, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description='잔디 채팅 내보내기 일괄 가져오기')
+    parser.add_argument('files', nargs='+', help='채팅 내보내기 파일 (.txt)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='해석 프로세스 수')
+    parser.add_argument('--batch-size', type=int, default=1000, help='한 번에 저장할 기록 수')
+    parser.add_argument('--keep-duplicates', action='store_true', help='파일 간 같은 날 내용도 모두 가져오기')
+    parser.add_argument('--dry-run', action='store_true', help='해석만 하고 저장하지 않음')
+    args = parser.parse_args()
+
+    store, _ = open_storage(os.environ.get('POINT_STORAGE', 'json'), DATA_FILE, EMPLOYEE_FILE,
+                           os.environ.get('POINT_SQLITE_FILE', 'point_data.db'))
+
+    # 이전 실행에서 끝까지 가져온 날 / 중간에 끊긴 날의 저장된 줄
+    complete, saved_rows = imported_rows(store)
+
+    started = time.perf_counter()
+    shards, skipped = collect_shards(args.files, args.keep_duplicates, complete)
+    split_time = time.perf_counter() - started
+    print(f"{len(args.files)}개 파일 → {len(shards)}일치 (중복/이미 가져온 날 {skipped}일 건너뜀)")
+
+    # 하루치씩 워커에 나눠 해석 (map 은 입력 순서대로 결과를 돌려준다)
+    started = time.perf_counter()
+    if args.workers > 1 and len(shards) > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            chunksize = max(1, len(shards) // (args.workers * 4))
+            parsed = [shard_records for _, shard_records in pool.map(parse_shard, shards, chunksize=chunksize)]
+    else:
+        parsed = [parse_shard(shard)[1] for shard in shards]
+    # 중간에 끊긴 날은 이미 저장된 줄 제외
+    days = []
+    resumed = 0
+    for shard_records in parsed:
+        if shard_records and shard_records[0]['import_id'] in saved_rows:
+            saved = saved_rows[shard_records[0]['import_id']]
+            resumed += 1
+            shard_records = [record for record in shard_records if record['import_row'] not in saved]
+        if shard_records:
+            days.append(shard_records)
+    records = [record for day in days for record in day]
+    parse_time = time.perf_counter() - started
+    print(f"해석: {len(records):,}건, {parse_time:.2f}초 (워커 {args.workers}개, 분할 {split_time:.2f}초"
+          f"{f', 이어서 가져온 날 {resumed}일' if resumed else ''})")
+
+    if args.dry_run or not records:
+        store.close()
+        return
+
+    # 정렬된 순서대로 ID 발급 후 하루치 단위로 묶어서 저장 (하루치가 두 묶음에 걸치지 않음)
+    started = time.perf_counter()
+    ids = store.allocate_ids(len(records))
+    for record, record_id in zip(records, ids):
+        record['id'] = record_id
+    batch = []
+    for day in days:
+        if batch and len(batch) + len(day) > args.batch_size:
+            store.insert_many(batch)
+            batch = []
+        batch.extend(day)
+    if batch:
+        store.insert_many(batch)
+    store.flush()
+    store.close()
+    print(f"저장: ID {ids[0]}~{ids[-1]}, {time.perf_counter() - started:.2f}초")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,4 +1,5 @@
 import json
+import os
 from datetime import datetime
 
 # 초기 데이터 생성
@@ -121,6 +122,11 @@ initial_data = [
 with open('point_data.json', 'w', encoding='utf-8') as f:
     json.dump(initial_data, f, ensure_ascii=False, indent=2)
 
+# 서버 저장소의 저널은 초기화된 데이터와 맞지 않으므로 삭제
+for journal in ('point_data.json.wal', 'point_data.json.wal.old'):
+    if os.path.exists(journal):
+        os.remove(journal)
+
 print("초기 데이터가 생성되었습니다.")
 print(f"총 {len(initial_data)}개의 레코드가 저장되었습니다.")
 
@@ -0,0 +1,106 @@
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# 잔디 웹훅 URL (로컬 테스트 시 jandi_stub.py 주소로 바꿀 수 있음)
+JANDI_WEBHOOK_URL = os.environ.get(
+    'JANDI_WEBHOOK_URL',
+    'https://wh.jandi.com/connect-api/webhook/14611962/0c004aecab37f46a168402c71d4cbaa7'
+)
+
+
+def build_payload(title, message, color="#00d4ff"):
+    """잔디 웹훅 메시지 형식"""
+    return {
+        "body": message,
+        "connectColor": color,
+        "connectInfo": [{
+            "title": title,
+            "description": message
+        }]
+    }
+
+
+def merge_payloads(payloads):
+    """같은 웹훅으로 가는 여러 메시지를 하나로 합치기"""
+    if len(payloads) == 1:
+        return payloads[0]
+
+    connect_info = []
+    for payload in payloads:
+        connect_info.extend(payload.get('connectInfo', []))
+    return {
+        "body": "\n\n".join(payload.get('body', '') for payload in payloads),
+        "connectColor": payloads[-1].get('connectColor', "#00d4ff"),
+        "connectInfo": connect_info
+    }
+
+
+class RateLimiter:
+    """토큰 버킷 (초당 rate 개, 최대 burst 개까지 몰아서 허용)"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """토큰이 생길 때까지 대기"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class JandiClient:
+    """잔디 웹훅 공용 클라이언트
+
+    연결 풀(keep-alive)을 재사용해서 메시지마다 TCP/TLS 연결을 새로 맺지 않고,
+    웹훅 URL 별로 전송 속도를 제한한다.
+    """
+
+    def __init__(self, pool_size=4, timeout=5, rate=2.0, burst=5):
+        self.timeout = timeout
+        self.rate = rate
+        self.burst = burst
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._limiters = {}
+        self._lock = threading.Lock()
+
+    def _limiter(self, url):
+        with self._lock:
+            if url not in self._limiters:
+                self._limiters[url] = RateLimiter(self.rate, self.burst)
+            return self._limiters[url]
+
+    def post(self, url, payload):
+        """메시지 하나 전송 (속도 제한 적용), 성공 여부 반환"""
+        self._limiter(url).acquire()
+        response = self.session.post(url, json=payload, timeout=self.timeout)
+        return response.status_code == 200
+
+    def send_batch(self, url, payloads):
+        """여러 메시지를 하나로 합쳐서 전송"""
+        return self.post(url, merge_payloads(payloads))
+
+    def send(self, title, message, color="#00d4ff", url=None):
+        """제목/내용으로 바로 전송"""
+        return self.post(url or JANDI_WEBHOOK_URL, build_payload(title, message, color))
+
+
+# 프로세스 전체에서 공유하는 클라이언트
+default_client = JandiClient()
@@ -1,28 +1,13 @@
-import requests
-import json
-
-# 잔디 웹훅 URL
-JANDI_WEBHOOK_URL = 'https://wh.jandi.com/connect-api/webhook/14611962/0c004aecab37f46a168402c71d4cbaa7'
+from jandi_client import JANDI_WEBHOOK_URL, default_client
 
 def send_jandi_notification(title, message, color="#00d4ff"):
-    """잔디로 알림 메시지 전송"""
+    """잔디로 알림 메시지 전송 (공용 클라이언트의 연결 풀 사용)"""
     try:
-        data = {
-            "body": message,
-            "connectColor": color,
-            "connectInfo": [{
-                "title": title,
-                "description": message
-            }]
-        }
-
-        response = requests.post(JANDI_WEBHOOK_URL, json=data, timeout=10)
-
-        if response.status_code == 200:
+        if default_client.send(title, message, color, url=JANDI_WEBHOOK_URL):
             print(f"잔디 알림 전송 성공: {title}")
             return True
         else:
-            print(f"잔디 알림 전송 실패: {response.status_code}")
+            print(f"잔디 알림 전송 실패: {title}")
             return False
 
     except Exception as e:
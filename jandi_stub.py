@@ -0,0 +1,73 @@
+"""로컬 테스트용 잔디 웹훅 스텁 서버
+
+사용법: python jandi_stub.py [--port 8765] [--delay 0.5] [--fail-rate 0.3]
+서버 실행 시 JANDI_WEBHOOK_URL=http://localhost:8765/webhook 로 지정하면
+실제 잔디 대신 이 스텁으로 알림이 전송된다.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class JandiStubHandler(BaseHTTPRequestHandler):
+    """받은 알림을 출력하고, 설정에 따라 지연/실패를 흉내낸다"""
+
+    delay = 0.0
+    fail_rate = 0.0
+    received = []
+    lock = threading.Lock()
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+
+        if self.delay:
+            time.sleep(self.delay)
+
+        if random.random() < self.fail_rate:
+            self.send_response(500)
+            self.end_headers()
+            return
+
+        try:
+            payload = json.loads(body.decode('utf-8'))
+        except ValueError:
+            payload = None
+        with self.lock:
+            self.received.append(payload)
+
+        title = payload['connectInfo'][0]['title'] if payload and payload.get('connectInfo') else ''
+        print(f"[STUB] 알림 수신 #{len(self.received)}: {title}")
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(b'{}')
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub(port=0, delay=0.0, fail_rate=0.0):
+    """백그라운드 스레드로 스텁 서버 시작, (서버, URL) 반환"""
+    JandiStubHandler.delay = delay
+    JandiStubHandler.fail_rate = fail_rate
+    server = ThreadingHTTPServer(('127.0.0.1', port), JandiStubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/webhook"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='잔디 웹훅 스텁 서버')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--delay', type=float, default=0.0, help='응답 지연 (초)')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='500 응답 비율 (0~1)')
+    args = parser.parse_args()
+
+    JandiStubHandler.delay = args.delay
+    JandiStubHandler.fail_rate = args.fail_rate
+    print(f"잔디 스텁 서버: http://localhost:{args.port}/webhook")
+    ThreadingHTTPServer(('0.0.0.0', args.port), JandiStubHandler).serve_forever()
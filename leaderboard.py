@@ -0,0 +1,132 @@
+import threading
+from bisect import bisect_left, insort
+
+
+def rank_entries(sorted_list):
+    """동순위를 고려한 순위 계산 (count 기준으로 정렬된 (이름, 통계) 목록)"""
+    result = []
+    current_rank = 1
+    prev_count = None
+
+    for i, (name, stats) in enumerate(sorted_list):
+        if prev_count is not None and stats['count'] != prev_count:
+            current_rank = i + 1
+
+        result.append({
+            'name': name,
+            'stats': stats,
+            'rank': current_rank,
+            'display_rank': current_rank if stats['count'] != prev_count or i == 0 else None
+        })
+        prev_count = stats['count']
+
+    return result
+
+
+class RankedCounter:
+    """사람별 완료 건수/포인트와 건수 순 정렬 목록
+
+    정렬 키는 (-건수, 이름) 이라서 동점자는 이름 순으로 고정된다.
+    """
+
+    def __init__(self):
+        self.stats = {}
+        self._order = []
+
+    def add(self, name, count, points):
+        if not name:
+            return
+        current = self.stats.get(name)
+        if current:
+            self._order.pop(bisect_left(self._order, (-current['count'], name)))
+            count += current['count']
+            points += current['points']
+
+        if count > 0:
+            self.stats[name] = {'count': count, 'points': points}
+            insort(self._order, (-count, name))
+        else:
+            self.stats.pop(name, None)
+
+    def top(self, n):
+        """건수 상위 n명 [(이름, {'count', 'points'}), ...]"""
+        return [(name, dict(self.stats[name])) for _, name in self._order[:n]]
+
+    def get(self, name):
+        return self.stats.get(name, {'count': 0, 'points': 0})
+
+
+class Leaderboard:
+    """완료 기록 기준 요청자/전달자 집계 (기록 저장소 변경을 받아 증분 갱신)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requesters = RankedCounter()
+        self.transporters = RankedCounter()
+
+    def reset(self, records):
+        """전체 기록으로 다시 계산"""
+        requesters = RankedCounter()
+        transporters = RankedCounter()
+        for record in records:
+            self._count(requesters, transporters, record, 1)
+        with self._lock:
+            self.requesters = requesters
+            self.transporters = transporters
+
+    def apply(self, old, new):
+        """기록 하나가 old → new 로 바뀜 (추가는 old=None, 삭제는 new=None)"""
+        with self._lock:
+            if old:
+                self._count(self.requesters, self.transporters, old, -1)
+            if new:
+                self._count(self.requesters, self.transporters, new, 1)
+
+    @staticmethod
+    def _count(requesters, transporters, record, sign):
+        if record.get('status') != '완료':
+            return
+        requesters.add(record.get('applicant', ''), sign, sign * record.get('applicant_amount', 0))
+        transporters.add(record.get('transporter', ''), sign, sign * record.get('transporter_amount', 0))
+
+    def top_requesters(self, n=10):
+        """요청 건수 상위 n명 (순위 포함)"""
+        with self._lock:
+            return rank_entries(self.requesters.top(n))
+
+    def top_transporters(self, n=10):
+        """전달 건수 상위 n명 (순위 포함)"""
+        with self._lock:
+            return rank_entries(self.transporters.top(n))
+
+    def employee_stats(self, emp_id):
+        """관리자 페이지용 직원별 통계"""
+        with self._lock:
+            requested = self.requesters.get(emp_id)
+            transported = self.transporters.get(emp_id)
+        return {
+            'request_count': requested['count'],
+            'transport_count': transported['count'],
+            'earned_points': requested['points'] + transported['points']
+        }
+
+    def verify(self, records):
+        """전체 재계산 결과와 비교, 어긋난 항목 목록 반환 (비어 있으면 정상)"""
+        expected = Leaderboard()
+        expected.reset(records)
+
+        mismatches = []
+        with self._lock:
+            for role, actual, fresh in (('requester', self.requesters, expected.requesters),
+                                        ('transporter', self.transporters, expected.transporters)):
+                for name in set(actual.stats) | set(fresh.stats):
+                    if actual.stats.get(name) != fresh.stats.get(name):
+                        mismatches.append({
+                            'role': role,
+                            'name': name,
+                            'incremental': actual.stats.get(name),
+                            'recomputed': fresh.stats.get(name)
+                        })
+                if actual._order != fresh._order:
+                    mismatches.append({'role': role, 'name': None, 'error': '순위 목록 불일치'})
+        return mismatches
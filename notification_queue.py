@@ -0,0 +1,267 @@
+import itertools
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+from collections import deque
+
+from storage import FileLock
+
+
+class NotificationQueue:
+    """잔디 알림 비동기 발송 큐
+
+    요청 스레드는 enqueue() 로 스풀 파일을 남기고 큐에 넣기만 한다.
+    워커 스레드들이 실제 전송을 맡고, 실패하면 지수 백오프로 재시도한다.
+    coalesce_window 동안 같은 웹훅으로 몰린 알림은 sender(url, payloads) 한 번으로 묶어 보낸다.
+    전송에 성공해야 스풀 파일이 지워지므로 서버가 재시작돼도 남은 알림은 다시 보낸다
+    (최소 1회 전송).
+
+    워커 프로세스마다 자기 스풀 폴더 (<spool_dir>/<pid>-<난수>/) 를 쓰고, 살아 있는 동안
+    <spool_dir>/<폴더 이름>.lock 을 잡고 있다. 시작할 때는 락을 잡을 수 있는 (주인 프로세스가
+    끝난) 폴더의 알림만 가져오므로 다른 워커가 보내는 중인 알림을 중복 발송하지 않는다.
+    """
+
+    def __init__(self, sender, spool_dir='notification_spool', maxsize=1000, workers=2,
+                 max_retries=5, backoff_base=1.0, backoff_max=60.0,
+                 coalesce_window=0.5, max_batch=10):
+        self.sender = sender
+        self.coalesce_window = coalesce_window
+        self.max_batch = max_batch
+        self.spool_dir = spool_dir
+        self.failed_dir = os.path.join(spool_dir, 'failed')
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._stop = threading.Event()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=1000)
+        self._counters = {'enqueued': 0, 'sent': 0, 'batches': 0, 'retried': 0, 'failed': 0, 'dropped': 0}
+        self._in_flight = 0
+
+        os.makedirs(self.failed_dir, exist_ok=True)
+        self.owner = f"{os.getpid()}-{os.urandom(4).hex()}"
+        self.owner_dir = os.path.join(spool_dir, self.owner)
+        os.makedirs(self.owner_dir)
+        # 프로세스가 끝나면 (죽어도) 락이 풀려서 다른 워커가 남은 알림을 가져갈 수 있다
+        self._owner_lock = FileLock(f"{self.owner_dir}.lock")
+        self._owner_lock.acquire()
+        self._recover_spool()
+
+        self._workers = []
+        for i in range(workers):
+            worker = threading.Thread(target=self._worker_loop, name=f'jandi-notify-{i}', daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    # ------------------------------------------------------------------
+    # 적재
+    # ------------------------------------------------------------------
+    def enqueue(self, url, payload):
+        """알림 적재, 큐가 가득 차면 False"""
+        item = {
+            'url': url,
+            'payload': payload,
+            'enqueued_at': time.time()
+        }
+        item['spool_path'] = self._spool(item)
+
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self._remove(item['spool_path'])
+            self._count('dropped')
+            print("잔디 알림 큐가 가득 차서 알림을 버립니다")
+            return False
+
+        self._count('enqueued')
+        return True
+
+    def _spool_name(self):
+        return f"{time.time_ns()}-{os.getpid()}-{next(self._seq)}.json"
+
+    def _spool(self, item):
+        """스풀 파일 기록 (임시 파일 + rename)"""
+        path = os.path.join(self.owner_dir, self._spool_name())
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({k: item[k] for k in ('url', 'payload', 'enqueued_at')}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return path
+
+    def _recover_spool(self):
+        """끝난 프로세스가 못 보낸 알림을 이 프로세스 스풀로 옮겨서 다시 큐에 넣기"""
+        for name in sorted(os.listdir(self.spool_dir)):
+            path = os.path.join(self.spool_dir, name)
+            if name.endswith('.json'):
+                # 프로세스별 폴더를 쓰기 전의 스풀 (rename 은 한 쪽만 성공)
+                if not self._claim(path):
+                    return
+                continue
+            if name in ('failed', self.owner) or not os.path.isdir(path):
+                continue
+
+            lock = FileLock(f"{path}.lock")
+            if not lock.acquire(blocking=False):
+                continue  # 주인 프로세스가 살아 있음
+            try:
+                try:
+                    names = sorted(os.listdir(path))
+                except OSError:
+                    names = []  # 다른 워커가 먼저 정리함
+                for spool_name in names:
+                    if spool_name.endswith('.json') and not self._claim(os.path.join(path, spool_name)):
+                        return  # 큐가 가득 참: 나머지는 다음 시작 때 다시 시도
+                shutil.rmtree(path, ignore_errors=True)
+                self._remove(f"{path}.lock")
+            finally:
+                lock.release()
+                lock.close()
+
+    def _claim(self, path):
+        """스풀 파일을 이 프로세스 폴더로 옮기고 큐에 넣기 (큐가 가득 차 있으면 False)"""
+        if self._queue.full():
+            return False
+        new_path = os.path.join(self.owner_dir, self._spool_name())
+        try:
+            os.rename(path, new_path)
+            with open(new_path, 'r', encoding='utf-8') as f:
+                item = json.load(f)
+        except (OSError, ValueError):
+            return True
+
+        item['spool_path'] = new_path
+        self._queue.put_nowait(item)
+        self._count('enqueued')
+        return True
+
+    # ------------------------------------------------------------------
+    # 전송
+    # ------------------------------------------------------------------
+    def _worker_loop(self):
+        while not self._stop.is_set():
+            try:
+                item = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            items = [item] + self._collect_burst()
+            with self._lock:
+                self._in_flight += len(items)
+            try:
+                # 웹훅 URL 별로 묶어서 전송
+                batches = {}
+                for item in items:
+                    batches.setdefault(item['url'], []).append(item)
+                for url, batch in batches.items():
+                    for start in range(0, len(batch), self.max_batch):
+                        self._deliver(url, batch[start:start + self.max_batch])
+            finally:
+                with self._lock:
+                    self._in_flight -= len(items)
+                for _ in items:
+                    self._queue.task_done()
+
+    def _collect_burst(self):
+        """coalesce_window 동안 이어서 들어온 알림 모으기"""
+        items = []
+        deadline = time.monotonic() + self.coalesce_window
+        while len(items) < self.max_batch - 1:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                items.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return items
+
+    def _deliver(self, url, items):
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                ok = self.sender(url, [item['payload'] for item in items])
+            except Exception as e:
+                print(f"잔디 알림 전송 중 오류: {str(e)}")
+                ok = False
+
+            if ok:
+                now = time.time()
+                with self._lock:
+                    self._counters['sent'] += len(items)
+                    self._counters['batches'] += 1
+                    for item in items:
+                        self._latencies.append(now - item['enqueued_at'])
+                for item in items:
+                    self._remove(item['spool_path'])
+                return
+
+            if attempts > self.max_retries:
+                for item in items:
+                    self._move_to_failed(item['spool_path'])
+                with self._lock:
+                    self._counters['failed'] += len(items)
+                print(f"잔디 알림 전송 포기 ({attempts}회 시도, {len(items)}건)")
+                return
+
+            # 지수 백오프 (종료 요청이 오면 바로 빠져나감, 스풀은 남겨둠)
+            self._count('retried')
+            delay = min(self.backoff_base * (2 ** (attempts - 1)), self.backoff_max)
+            if self._stop.wait(delay):
+                return
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _move_to_failed(self, path):
+        try:
+            os.replace(path, os.path.join(self.failed_dir, os.path.basename(path)))
+        except OSError:
+            pass
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    # ------------------------------------------------------------------
+    # 상태
+    # ------------------------------------------------------------------
+    def metrics(self):
+        """큐 길이, 처리 건수, 지연 시간(초)"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            result = dict(self._counters)
+            result['depth'] = self._queue.qsize()
+            result['in_flight'] = self._in_flight
+
+        if latencies:
+            result['latency_avg'] = sum(latencies) / len(latencies)
+            result['latency_p95'] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            result['latency_max'] = latencies[-1]
+        else:
+            result['latency_avg'] = result['latency_p95'] = result['latency_max'] = 0.0
+        return result
+
+    def join(self, timeout=None):
+        """큐가 빌 때까지 대기 (테스트/종료용), 모두 처리됐으면 True"""
+        deadline = None if timeout is None else time.time() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.time() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stop(self, timeout=5.0):
+        """워커 종료 (보내지 못한 알림은 스풀에 남아서 다음 시작 때 발송)"""
+        self._stop.set()
+        for worker in self._workers:
+            worker.join(timeout)
@@ -5,6 +5,8 @@ import os
 from datetime import datetime
 from typing import List, Dict, Optional
 
+from date_index import date_key, date_range
+
 class PointManager:
     def __init__(self):
         self.root = tk.Tk()
@@ -24,6 +26,8 @@ class PointManager:
         self.is_admin = False
         self.point_records = []
         self.filtered_records = []
+        # (적립일, 위치) 정렬 목록, 기록이 바뀌면 None 으로 비우고 검색할 때 다시 만듦
+        self.date_keys = None
         
         # 데이터 로드
         self.load_data()
@@ -432,21 +436,23 @@ class PointManager:
         date_from = self.date_from.get()
         date_to = self.date_to.get()
         
+        # 날짜 필터: 적립일 정렬 목록에서 범위만 잘라냄 (적립일 없는 기록은 제외)
+        if date_from or date_to:
+            if self.date_keys is None:
+                self.date_keys = sorted((date_key(r), i) for i, r in enumerate(self.point_records) if date_key(r))
+            start, end = date_range(self.date_keys, date_from, date_to)
+            candidates = [self.point_records[i] for i in sorted(i for _, i in self.date_keys[start:end])]
+        else:
+            candidates = self.point_records
+        
         filtered = []
-        for record in self.point_records:
+        for record in candidates:
             # 텍스트 검색
             text_match = (not search_term or 
                          search_term in record['applicant'].lower() or
                          search_term in record['transporter'].lower())
-            
-            # 날짜 필터
-            date_match = True
-            if date_from and record['accumulate_date'] < date_from:
-                date_match = False
-            if date_to and record['accumulate_date'] > date_to:
-                date_match = False
                 
-            if text_match and date_match:
+            if text_match:
                 filtered.append(record)
                 
         self.filtered_records = filtered
@@ -505,6 +511,7 @@ class PointManager:
         
     def load_data(self):
         """데이터 로드"""
+        self.date_keys = None
         if os.path.exists(self.data_file):
             try:
                 with open(self.data_file, 'r', encoding='utf-8') as f:
@@ -517,6 +524,7 @@ class PointManager:
             
     def save_data(self):
         """데이터 저장"""
+        self.date_keys = None
         with open(self.data_file, 'w', encoding='utf-8') as f:
             json.dump(self.point_records, f, ensure_ascii=False, indent=2)
             
@@ -0,0 +1,417 @@
+import atexit
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from storage import FileLock, write_json_atomic
+
+# 포인트 이벤트 종류: 기초 포인트(직원 파일) / 운송 완료 적립 / 적립 취소 / 관리자 조정
+EVENT_TYPES = ('opening', 'earned', 'reversal', 'adjustment')
+
+# 예전 포인트 조정 API 가 남긴 가짜 완료 기록 (적립이 아니라 조정 내역이므로 제외)
+ADJUSTMENT_SOURCE = 'admin_adjustment'
+
+
+def record_credits(record):
+    """기록 → {직원: 적립 포인트} (완료된 운송만, 요청자/전달자 각각)"""
+    if not record or record.get('status') != '완료' or record.get('source') == ADJUSTMENT_SOURCE:
+        return {}
+    credits = {}
+    for field, amount_field in (('applicant', 'applicant_amount'), ('transporter', 'transporter_amount')):
+        emp_id = record.get(field)
+        amount = record.get(amount_field) or 0
+        if emp_id and amount:
+            credits[emp_id] = credits.get(emp_id, 0) + amount
+    return credits
+
+
+def opening_points(info):
+    """직원 파일의 total_points (기초 포인트)"""
+    try:
+        return int((info or {}).get('total_points') or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class LedgerState:
+    """이벤트를 차례로 적용한 결과 (직원별 잔액, 기록별 적립 내역, 직원별 기초 포인트)"""
+
+    def __init__(self):
+        self.seq = 0
+        self.balances = {}
+        self.credited = {}
+        self.opening = {}
+
+    def apply(self, event):
+        emp_id = event['emp_id']
+        amount = event['amount']
+        self.seq = event['seq']
+        self.balances[emp_id] = self.balances.get(emp_id, 0) + amount
+        if event['type'] in ('earned', 'reversal'):
+            credits = self.credited.setdefault(event['record_id'], {})
+            credits[emp_id] = credits.get(emp_id, 0) + amount
+            if not credits[emp_id]:
+                del credits[emp_id]
+                if not credits:
+                    del self.credited[event['record_id']]
+        elif event['type'] == 'opening':
+            self.opening[emp_id] = self.opening.get(emp_id, 0) + amount
+
+    def to_json(self):
+        return {
+            'seq': self.seq,
+            'balances': self.balances,
+            'credited': {str(record_id): credits for record_id, credits in self.credited.items()},
+            'opening': self.opening
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        state = cls()
+        state.seq = data['seq']
+        state.balances = data['balances']
+        state.credited = {int(record_id): credits for record_id, credits in data['credited'].items()}
+        state.opening = data['opening']
+        return state
+
+
+class PointsLedger:
+    """추가 전용 포인트 원장 (<path>, 한 줄에 이벤트 하나)
+
+    직원 잔액은 이벤트(기초 포인트/완료 적립/적립 취소/관리자 조정)의 합이다.
+    잔액은 메모리에 들고 있어서 balance() 는 O(1) 이고, checkpoint_every 건마다
+    <path>.checkpoint 에 (파일 위치, 상태) 를 저장해서 시작할 때는 그 뒤만 다시 읽는다.
+
+    기록 저장소 리스너로 등록하면 기록이 완료/수정/삭제될 때 기록이 뜻하는 적립과
+    원장에 이미 적립된 내용의 차이만 earned/reversal 로 남긴다. 리스너는 바뀐 기록 ID 만
+    모아 두고 (기록 저장소의 트랜잭션 안에서 원장을 쓰지 않음), 기록 스레드가 flush_delay 초
+    동안 모인 변경을 한 번에 써서 fsync 는 묶음마다 한 번이다. 잔액 조회 전에는 밀린 변경을 먼저 쓴다.
+    원장에 쓰기 전에는 <path>.lock 파일 락을 잡고 다른 프로세스가 덧붙인 이벤트를 먼저 읽고,
+    source 가 있으면 저장소의 최신 기록으로 적립을 다시 계산하므로, 여러 워커가 같은 변경을
+    받아도 (순서가 뒤바뀌어도) 한 번만 적립된다.
+    """
+
+    def __init__(self, path, checkpoint_every=1000, flush_delay=0.05):
+        self.path = path
+        self.checkpoint_path = f"{path}.checkpoint"
+        self.checkpoint_every = checkpoint_every
+        self.flush_delay = flush_delay
+        # 기록 ID → 현재 기록 (기록 저장소의 get), 없으면 리스너가 받은 기록 기준
+        self.source = None
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(f"{path}.lock")
+        self._state = LedgerState()
+        self._offset = 0
+        self._since_checkpoint = 0
+        self._fsyncs = 0
+        # 아직 원장에 쓰지 않은 변경 (기록 ID → 리스너가 받은 적립) / 리스너가 마지막으로 본 적립
+        self._pending_cond = threading.Condition(threading.Lock())
+        self._pending = {}
+        self._seen = None
+        self._closed = False
+
+        with self._lock, self._file_lock:
+            self._load_checkpoint()
+            self._catch_up()
+        self._writer = threading.Thread(target=self._flush_loop, name='ledger-writer', daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    # ------------------------------------------------------------------
+    # 읽기 / 복원
+    # ------------------------------------------------------------------
+    def _load_checkpoint(self):
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            return
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if checkpoint.get('offset', 0) <= size:
+            self._state = LedgerState.from_json(checkpoint['state'])
+            self._offset = checkpoint['offset']
+
+    def _catch_up(self):
+        """다른 프로세스가 덧붙인 이벤트 반영 (끝의 쓰다 만 줄은 건너뜀)"""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        if size < self._offset:
+            # 원장 파일이 바뀌었음 (복원 등): 처음부터 다시 읽음
+            self._state = LedgerState()
+            self._offset = 0
+        if size == self._offset:
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            data = f.read(size - self._offset)
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].splitlines():
+            if line.strip():
+                self._state.apply(json.loads(line))
+                self._since_checkpoint += 1
+        self._offset += end
+
+    def refresh(self):
+        """다른 프로세스의 이벤트 반영 (파일 크기만 확인)"""
+        with self._lock:
+            self._catch_up()
+
+    # ------------------------------------------------------------------
+    # 쓰기
+    # ------------------------------------------------------------------
+    def _append(self, events):
+        """락을 잡고 최신 상태를 확인한 뒤 이벤트 기록 (events 는 최신 상태를 받아 이벤트 목록을 돌려주는 함수)"""
+        with self._lock, self._file_lock:
+            self._catch_up()
+            pending = events(self._state)
+            if not pending:
+                return []
+            now = datetime.now().isoformat()
+            lines = []
+            for seq, event in enumerate(pending, self._state.seq + 1):
+                event.update({'seq': seq, 'at': now})
+                lines.append(json.dumps(event, ensure_ascii=False) + '\n')
+            with open(self.path, 'ab') as f:
+                # 다른 프로세스가 쓰다 죽은 줄이 끝에 남아 있으면 잘라냄
+                if f.tell() > self._offset:
+                    f.truncate(self._offset)
+                f.write(''.join(lines).encode('utf-8'))
+                f.flush()
+                os.fsync(f.fileno())
+                self._offset = f.tell()
+            self._fsyncs += 1
+            for event in pending:
+                self._state.apply(event)
+            self._since_checkpoint += len(pending)
+            if self._since_checkpoint >= self.checkpoint_every:
+                self._write_checkpoint()
+            return pending
+
+    def _write_checkpoint(self):
+        write_json_atomic(self.checkpoint_path, {'offset': self._offset, 'state': self._state.to_json()})
+        self._since_checkpoint = 0
+
+    def flush(self):
+        """리스너가 모아 둔 변경을 원장에 기록 (fsync 한 번) → 추가한 이벤트 목록"""
+        with self._lock:
+            with self._pending_cond:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return []
+
+            def events(state):
+                result = []
+                for record_id in sorted(pending):
+                    # 그 사이 다른 워커가 기록을 또 바꿨을 수 있으므로 저장소의 최신 기록 기준
+                    desired = record_credits(self.source(record_id)) if self.source else pending[record_id]
+                    result += self._credit_events(state, record_id, desired)
+                return result
+
+            try:
+                return self._append(events)
+            except Exception:
+                # 쓰지 못한 변경은 다음 기록 때 다시 (그 사이 새로 받은 변경이 우선)
+                with self._pending_cond:
+                    for record_id, desired in pending.items():
+                        self._pending.setdefault(record_id, desired)
+                raise
+
+    def _flush_loop(self):
+        """기록 스레드: 리스너가 받은 변경을 flush_delay 초 동안 모아서 한 번에 기록"""
+        while True:
+            with self._pending_cond:
+                while not self._closed and not self._pending:
+                    self._pending_cond.wait()
+                if self._closed:
+                    return
+            time.sleep(self.flush_delay)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"포인트 원장 기록 오류: {e}")
+
+    def checkpoint(self):
+        """현재 상태를 체크포인트로 저장"""
+        self.flush()
+        with self._lock, self._file_lock:
+            self._catch_up()
+            self._write_checkpoint()
+
+    def adjust(self, emp_id, amount, reason=''):
+        """관리자 포인트 조정 → 조정 후 잔액"""
+        self.flush()
+        self._append(lambda state: [{'type': 'adjustment', 'emp_id': emp_id, 'amount': amount, 'reason': reason}])
+        return self.balance(emp_id)
+
+    def set_balance(self, emp_id, points, reason=''):
+        """잔액을 points 로 맞춤 (차이만큼 조정 이벤트) → 조정 후 잔액"""
+        def events(state):
+            amount = points - state.balances.get(emp_id, 0)
+            return [{'type': 'adjustment', 'emp_id': emp_id, 'amount': amount, 'reason': reason}] if amount else []
+
+        self.flush()
+        self._append(events)
+        return self.balance(emp_id)
+
+    @staticmethod
+    def _credit_events(state, record_id, desired):
+        """기록이 뜻하는 적립과 원장에 적립된 내용의 차이 → earned/reversal 이벤트"""
+        credited = state.credited.get(record_id, {})
+        events = []
+        for emp_id in sorted(set(credited) | set(desired)):
+            amount = desired.get(emp_id, 0) - credited.get(emp_id, 0)
+            if amount:
+                events.append({'type': 'earned' if amount > 0 else 'reversal', 'emp_id': emp_id,
+                               'amount': amount, 'record_id': record_id})
+        return events
+
+    def sync_records(self, records):
+        """전체 기록과 원장의 적립 내역 맞추기 (없어진 기록의 적립은 취소)"""
+        desired = {record['id']: record_credits(record) for record in records}
+
+        def events(state):
+            pending = []
+            for record_id in sorted(set(desired) | set(state.credited)):
+                pending += self._credit_events(state, record_id, desired.get(record_id, {}))
+            return pending
+
+        return self._append(events)
+
+    def sync_opening(self, employees):
+        """직원 파일의 total_points 를 기초 포인트로 반영 (바뀐 만큼만 opening 이벤트)"""
+        def events(state):
+            pending = []
+            for emp_id, info in employees.items():
+                amount = opening_points(info) - state.opening.get(emp_id, 0)
+                if amount:
+                    pending.append({'type': 'opening', 'emp_id': emp_id, 'amount': amount})
+            return pending
+
+        return self._append(events)
+
+    # 기록 저장소 리스너 (바뀐 기록만 모아 두고 기록 스레드가 씀)
+    def reset(self, records):
+        desired = {}
+        for record in records:
+            credits = record_credits(record)
+            if credits:
+                desired[record['id']] = credits
+        with self._pending_cond:
+            seen, self._seen = self._seen, desired
+            if seen is not None:
+                # 다시 읽기 (다른 워커의 변경/압축): 마지막으로 본 것과 적립이 달라진 기록만
+                for record_id in set(seen) | set(desired):
+                    if seen.get(record_id) != desired.get(record_id):
+                        self._pending[record_id] = desired.get(record_id, {})
+                if self._pending:
+                    self._pending_cond.notify()
+                return
+        # 처음 등록할 때만 전체 기록과 원장을 맞춤 (빠진 적립/취소 채우기)
+        self.sync_records(records)
+
+    def apply(self, old, new):
+        record_id = (new or old)['id']
+        desired = record_credits(new)
+        with self._pending_cond:
+            self._pending[record_id] = desired
+            if self._seen is not None:
+                if desired:
+                    self._seen[record_id] = desired
+                else:
+                    self._seen.pop(record_id, None)
+            self._pending_cond.notify()
+
+    # ------------------------------------------------------------------
+    # 조회 / 점검
+    # ------------------------------------------------------------------
+    def balance(self, emp_id):
+        """직원 잔액 (O(1), 밀린 변경을 먼저 쓰고 다른 프로세스가 덧붙였으면 그 부분만 읽음)"""
+        self.flush()
+        with self._lock:
+            self._catch_up()
+            return self._state.balances.get(emp_id, 0)
+
+    def balances(self):
+        """전체 직원 잔액 {직원: 잔액}"""
+        self.flush()
+        with self._lock:
+            self._catch_up()
+            return dict(self._state.balances)
+
+    def history(self, emp_id, limit=100):
+        """직원의 최근 이벤트 (최신순)"""
+        self.flush()
+        events = []
+        if os.path.exists(self.path):
+            with open(self.path, 'rb') as f:
+                for line in f:
+                    if line.endswith(b'\n') and line.strip():
+                        event = json.loads(line)
+                        if event['emp_id'] == emp_id:
+                            events.append(event)
+        return events[::-1][:limit]
+
+    def verify(self, records, employees):
+        """원장을 처음부터 다시 읽은 잔액 / 기록 / 직원 파일과 비교, 어긋난 항목 목록 (비어 있으면 정상)"""
+        self.flush()
+        with self._lock:
+            self._catch_up()
+            state = self._state
+            replayed = LedgerState()
+            if os.path.exists(self.path):
+                with open(self.path, 'rb') as f:
+                    data = f.read(self._offset)
+                for line in data.splitlines():
+                    if line.strip():
+                        replayed.apply(json.loads(line))
+
+        mismatches = []
+        for emp_id in sorted(set(state.balances) | set(replayed.balances)):
+            cached, actual = state.balances.get(emp_id, 0), replayed.balances.get(emp_id, 0)
+            if cached != actual:
+                mismatches.append({'kind': 'balance', 'emp_id': emp_id, 'cached': cached, 'ledger': actual})
+
+        desired = {record['id']: record_credits(record) for record in records}
+        for record_id in sorted(set(desired) | set(replayed.credited)):
+            expected, credited = desired.get(record_id, {}), replayed.credited.get(record_id, {})
+            if expected != credited:
+                mismatches.append({'kind': 'record', 'record_id': record_id,
+                                   'expected': expected, 'ledger': credited})
+
+        for emp_id, info in sorted(employees.items()):
+            if opening_points(info) != replayed.opening.get(emp_id, 0):
+                mismatches.append({'kind': 'opening', 'emp_id': emp_id, 'expected': opening_points(info),
+                                   'ledger': replayed.opening.get(emp_id, 0)})
+        return mismatches
+
+    def reconcile(self, records, employees):
+        """기록/직원 파일에 맞춰 원장에 보정 이벤트 추가 → 추가한 이벤트 목록"""
+        self.flush()
+        return self.sync_records(records) + self.sync_opening(employees)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'events': self._state.seq,
+                'employees': len(self._state.balances),
+                'credited_records': len(self._state.credited),
+                'since_checkpoint': self._since_checkpoint,
+                'fsyncs': self._fsyncs,
+                'pending': len(self._pending)
+            }
+
+    def close(self):
+        self.flush()
+        with self._pending_cond:
+            self._closed = True
+            self._pending_cond.notify_all()
+        self._writer.join()
+        with self._lock:
+            if self._since_checkpoint:
+                self.checkpoint()
+            self._file_lock.close()
+        atexit.unregister(self.close)
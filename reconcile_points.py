@@ -0,0 +1,56 @@
+"""포인트 원장 점검 / 보정
+
+사용법: python reconcile_points.py [--fix] [--ledger points_ledger.jsonl]
+
+원장을 처음부터 다시 읽어서
+1. 메모리(체크포인트 + 꼬리) 잔액과 다시 합산한 잔액이 같은지
+2. 완료된 기록이 뜻하는 적립과 원장의 적립/취소 내역이 같은지 (기록마다)
+3. 직원 파일의 total_points (기초 포인트) 와 원장의 기초 포인트가 같은지
+한 번에 확인한다. --fix 를 주면 2, 3 의 차이만큼 보정 이벤트(earned/reversal/opening)를 추가하고
+체크포인트를 새로 쓴다. 서버 실행 중에도 가능 (원장 파일 락 사용). 어긋난 것이 남으면 종료 코드 1.
+저장소 백엔드는 서버와 같이 POINT_STORAGE / POINT_SQLITE_FILE 환경 변수를 따른다.
+"""
+import argparse
+import os
+import sys
+
+from points_ledger import PointsLedger
+from storage import open_storage
+
+DATA_FILE = 'point_data.json'
+EMPLOYEE_FILE = 'employee_data.json'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='포인트 원장 점검 / 보정')
+    parser.add_argument('--fix', action='store_true', help='차이만큼 보정 이벤트 추가')
+    parser.add_argument('--ledger', default=os.environ.get('POINT_LEDGER_FILE', 'points_ledger.jsonl'))
+    args = parser.parse_args()
+
+    store, employee_store = open_storage(os.environ.get('POINT_STORAGE', 'json'), DATA_FILE, EMPLOYEE_FILE,
+                                         os.environ.get('POINT_SQLITE_FILE', 'point_data.db'))
+    records = store.all()
+    employees = employee_store.load() if employee_store.exists() else {}
+    ledger = PointsLedger(args.ledger)
+    print(f"기록 {len(records):,}건, 직원 {len(employees)}명, 원장 {ledger.stats()}")
+
+    mismatches = ledger.verify(records, employees)
+    for mismatch in mismatches[:50]:
+        print(f"  불일치: {mismatch}")
+    if len(mismatches) > 50:
+        print(f"  ... 외 {len(mismatches) - 50}건")
+    print(f"불일치 {len(mismatches)}건")
+
+    if args.fix and mismatches:
+        fixed = ledger.reconcile(records, employees)
+        ledger.checkpoint()
+        mismatches = ledger.verify(records, employees)
+        print(f"보정 이벤트 {len(fixed)}건 추가, 남은 불일치 {len(mismatches)}건")
+
+    ledger.close()
+    store.close()
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
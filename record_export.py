@@ -0,0 +1,61 @@
+import json
+
+from spreadsheet_io import iter_csv_bytes, iter_xlsx_bytes
+
+# 내보내기 컬럼 (기록 필드, 머리글)
+EXPORT_COLUMNS = (
+    ('id', 'ID'),
+    ('request_date', '요청일'),
+    ('applicant', '요청자'),
+    ('transporter', '전달자'),
+    ('from_location', '출발지'),
+    ('to_location', '도착지'),
+    ('item', '물품'),
+    ('recipient', '수령자'),
+    ('applicant_amount', '요청자P'),
+    ('transporter_amount', '전달자P'),
+    ('status', '상태'),
+    ('accumulate_date', '완료일'),
+    ('deadline_date', '마감일'),
+    ('created_at', '등록일시')
+)
+
+# 형식 → (Content-Type, 확장자)
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+    'jsonl': ('application/x-ndjson; charset=utf-8', 'jsonl')
+}
+
+
+def export_row(record):
+    """기록 → 내보내기 행 (없는 값은 빈 칸)"""
+    values = []
+    for field, _ in EXPORT_COLUMNS:
+        value = record.get(field)
+        values.append('' if value is None else value)
+    return values
+
+
+def iter_jsonl_bytes(records, rows_per_chunk=1000):
+    """기록 → JSON Lines 바이트 조각 (기록 전체를 그대로)"""
+    lines = []
+    for record in records:
+        lines.append(json.dumps(record, ensure_ascii=False))
+        if len(lines) >= rows_per_chunk:
+            yield ('\n'.join(lines) + '\n').encode('utf-8')
+            lines = []
+    if lines:
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def export_records(records, fmt):
+    """기록 이터레이터 → 바이트 조각 제너레이터 (fmt 는 EXPORT_FORMATS 중 하나)"""
+    if fmt == 'jsonl':
+        return iter_jsonl_bytes(records)
+
+    headers = [header for _, header in EXPORT_COLUMNS]
+    rows = (export_row(record) for record in records)
+    if fmt == 'xlsx':
+        return iter_xlsx_bytes(headers, rows, sheet_name='운송기록')
+    return iter_csv_bytes(headers, rows)
@@ -0,0 +1,235 @@
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, timedelta
+from functools import lru_cache
+
+from date_index import date_key
+
+# /api/stats?group_by= 에 쓸 수 있는 값 (기간 / 사람 / 경로)
+PERIODS = ('day', 'week', 'month')
+DIMENSIONS = ('applicant', 'transporter', 'route')
+GROUP_BY = PERIODS + DIMENSIONS
+
+
+@lru_cache(maxsize=4096)
+def period_bounds(day, period):
+    """적립일이 속한 기간 (키, 첫날, 마지막 날), YYYY-MM-DD 가 아니면 None
+
+    주는 ISO 주 ('2025-W03', 월~일), 달은 '2025-01'.
+    """
+    if len(day) != 10:
+        return None
+    try:
+        d = date.fromisoformat(day)
+    except ValueError:
+        return None
+    if period == 'month':
+        first = d.replace(day=1)
+        last = (first + timedelta(days=31)).replace(day=1) - timedelta(days=1)
+        return day[:7], first.isoformat(), last.isoformat()
+    if period == 'week':
+        first = d - timedelta(days=d.weekday())
+        year, week, _ = d.isocalendar()
+        return f"{year}-W{week:02d}", first.isoformat(), (first + timedelta(days=6)).isoformat()
+    return day, day, day
+
+
+def period_key(day, period):
+    """적립일 → 기간 키 (적립일이 없으면 '', 형식이 다르면 적립일 그대로)"""
+    bounds = period_bounds(day, period) if day else None
+    return bounds[0] if bounds else day
+
+
+def route_key(from_location, to_location):
+    """경로 키 '평촌→판교'"""
+    return f"{from_location or ''}→{to_location or ''}"
+
+
+def group_key(record, group_by):
+    """기록 → group_by 기준 그룹 키"""
+    if group_by in PERIODS:
+        return period_key(date_key(record), group_by)
+    if group_by == 'route':
+        return route_key(record.get('from_location'), record.get('to_location'))
+    return record.get(group_by) or ''
+
+
+def amounts(record):
+    return record.get('applicant_amount') or 0, record.get('transporter_amount') or 0
+
+
+def total_entry(key, bucket):
+    """[요청자P, 전달자P, 건수] → /api/stats 합계 형식"""
+    entry = {} if key is None else {'key': key}
+    entry.update({
+        'total_applicant_amount': bucket[0],
+        'total_transporter_amount': bucket[1],
+        'total_records': bucket[2]
+    })
+    return entry
+
+
+def group_records(records, group_by):
+    """기록 목록을 직접 그룹별로 합산 (검색어가 있어서 집계표를 쓸 수 없을 때)"""
+    groups = {}
+    for record in records:
+        applicant_amount, transporter_amount = amounts(record)
+        bucket = groups.setdefault(group_key(record, group_by), [0, 0, 0])
+        bucket[0] += applicant_amount
+        bucket[1] += transporter_amount
+        bucket[2] += 1
+    return [total_entry(key, groups[key]) for key in sorted(groups)]
+
+
+class Rollups:
+    """적립일 기준 일/주/월 집계표 (기록 저장소 변경을 받아 증분 갱신)
+
+    전체 / 요청자별 / 전달자별 / 경로별로 기간마다 [요청자P, 전달자P, 건수] 를 들고 있다.
+    날짜 범위 합계는 범위에 통째로 들어가는 달(또는 주)은 월/주 집계를 쓰고 양 끝의 날만 일 집계를 더하므로,
+    기록 수가 아니라 범위에 걸친 기간 수에 비례한다.
+    적립일이 없는 기록 (대기중/진행중 요청) 은 pending 에 따로 모으고, 날짜 범위가 없을 때만 합계에 들어간다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        # (차원, 기간) → {기간 키 → {그룹 키 → [요청자P, 전달자P, 건수]}}, 차원 '' 은 전체 합계
+        self._tables = {(dimension, period): {} for dimension in ('',) + DIMENSIONS for period in PERIODS}
+        self._pending = {dimension: {} for dimension in ('',) + DIMENSIONS}
+        # 기록이 있는 적립일 (정렬) / 적립일별 기록 수 / YYYY-MM-DD 형식이 아닌 적립일
+        self._days = []
+        self._day_counts = {}
+        self._odd_days = set()
+
+    def reset(self, records):
+        """전체 기록으로 다시 만들기"""
+        with self._lock:
+            self._clear()
+            for record in records:
+                self._count(record, 1)
+
+    def apply(self, old, new):
+        """기록 하나가 old → new 로 바뀜 (추가는 old=None, 삭제는 new=None)"""
+        with self._lock:
+            if old:
+                self._count(old, -1)
+            if new:
+                self._count(new, 1)
+
+    def _count(self, record, sign):
+        applicant_amount, transporter_amount = amounts(record)
+        delta = (sign * applicant_amount, sign * transporter_amount, sign)
+        groups = [('', '')] + [(dimension, group_key(record, dimension)) for dimension in DIMENSIONS]
+        day = date_key(record)
+        if not day:
+            for dimension, group in groups:
+                self._bump(self._pending[dimension], group, delta)
+            return
+
+        self._count_day(day, sign)
+        for period in PERIODS:
+            key = period_key(day, period)
+            for dimension, group in groups:
+                table = self._tables[(dimension, period)]
+                buckets = table.setdefault(key, {})
+                self._bump(buckets, group, delta)
+                if not buckets:
+                    del table[key]
+
+    def _count_day(self, day, sign):
+        count = self._day_counts.get(day, 0) + sign
+        if count > 0:
+            if day not in self._day_counts:
+                insort(self._days, day)
+                if period_bounds(day, 'day') is None:
+                    self._odd_days.add(day)
+            self._day_counts[day] = count
+        else:
+            del self._day_counts[day]
+            del self._days[bisect_left(self._days, day)]
+            self._odd_days.discard(day)
+
+    @staticmethod
+    def _bump(buckets, group, delta):
+        bucket = buckets.get(group)
+        if bucket is None:
+            bucket = buckets[group] = [0, 0, 0]
+        bucket[0] += delta[0]
+        bucket[1] += delta[1]
+        bucket[2] += delta[2]
+        if bucket[2] == 0:
+            del buckets[group]
+
+    def _walk(self, date_from, date_to, coarse):
+        """범위를 덮는 (기간, 기간 키) 목록: coarse 기간이 통째로 들어가면 그 기간, 아니면 날짜 하나씩"""
+        days = self._days
+        i = bisect_left(days, date_from) if date_from else 0
+        end = bisect_right(days, date_to) if date_to else len(days)
+        # 이미 더한 마지막 날 (달과 주는 겹칠 수 있으므로 그 뒤에서 시작하는 기간만 통째로 씀)
+        done = ''
+        while i < end:
+            day = days[i]
+            for period in coarse:
+                bounds = period_bounds(day, period)
+                if (bounds and bounds[1] > done and (not date_from or date_from <= bounds[1]) and
+                        (not date_to or bounds[2] <= date_to)):
+                    yield period, bounds[0]
+                    j = bisect_right(days, bounds[2], i)
+                    if self._odd_days:
+                        # 형식이 다른 적립일은 기간 집계에 없으므로 따로
+                        yield from (('day', odd) for odd in days[i:j] if odd in self._odd_days)
+                    i = j
+                    done = bounds[2]
+                    break
+            else:
+                yield 'day', day
+                i += 1
+                done = day
+
+    def _combine(self, dimension, date_from, date_to, period=None):
+        """그룹 키 → [요청자P, 전달자P, 건수] (period 가 있으면 기간별로 합침)"""
+        result = {}
+
+        def add(key, bucket):
+            total = result.setdefault(key, [0, 0, 0])
+            total[0] += bucket[0]
+            total[1] += bucket[1]
+            total[2] += bucket[2]
+
+        if not date_from and not date_to:
+            for group, bucket in self._pending[dimension].items():
+                add('' if period else group, bucket)
+
+        coarse = ('month', 'week') if period is None else (period,) if period != 'day' else ()
+        for bucket_period, key in self._walk(date_from, date_to, coarse):
+            for group, bucket in self._tables[(dimension, bucket_period)].get(key, {}).items():
+                if period is None:
+                    add(group, bucket)
+                else:
+                    add(key if bucket_period == period else period_key(key, period), bucket)
+        return result
+
+    def totals(self, date_from='', date_to=''):
+        """적립일 범위 합계 (/api/stats 형식)"""
+        with self._lock:
+            bucket = self._combine('', date_from, date_to).get('', [0, 0, 0])
+        return total_entry(None, bucket)
+
+    def grouped(self, group_by, date_from='', date_to=''):
+        """group_by 기준 그룹별 합계 목록 (키 순)"""
+        with self._lock:
+            if group_by in PERIODS:
+                groups = self._combine('', date_from, date_to, period=group_by)
+            else:
+                groups = self._combine(group_by, date_from, date_to)
+        return [total_entry(key, groups[key]) for key in sorted(groups)]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'days': len(self._days),
+                'weeks': len(self._tables[('', 'week')]),
+                'months': len(self._tables[('', 'month')])
+            }
@@ -11,6 +11,8 @@ const users = {
 let pointRecords = JSON.parse(localStorage.getItem('pointRecords')) || [];
 let currentUser = null;
 let editingId = null;
+// 적립일 정렬 색인 ([적립일, 위치] 목록, 기록이 바뀌면 null 로 비우고 검색할 때 다시 만듦)
+let dateIndex = null;
 
 // DOM 요소들
 const loginScreen = document.getElementById('loginScreen');
@@ -236,21 +238,49 @@ function loadPointRecords(filteredRecords = null) {
     });
 }
 
+// 적립일이 value 이상(upper 면 초과)인 첫 위치 (이진 탐색)
+function bisectDate(keys, value, upper) {
+    let lo = 0;
+    let hi = keys.length;
+    while (lo < hi) {
+        const mid = (lo + hi) >> 1;
+        if (upper ? keys[mid][0] <= value : keys[mid][0] < value) {
+            lo = mid + 1;
+        } else {
+            hi = mid;
+        }
+    }
+    return lo;
+}
+
+// 적립일 범위에 드는 기록 (원래 순서, 적립일이 없는 기록은 제외)
+function recordsInDateRange(dateFrom, dateTo) {
+    if (!dateIndex) {
+        dateIndex = [];
+        pointRecords.forEach((record, i) => {
+            if (record.accumulateDate) dateIndex.push([record.accumulateDate, i]);
+        });
+        dateIndex.sort((a, b) => (a[0] < b[0] ? -1 : a[0] > b[0] ? 1 : a[1] - b[1]));
+    }
+    const start = dateFrom ? bisectDate(dateIndex, dateFrom, false) : 0;
+    const end = dateTo ? bisectDate(dateIndex, dateTo, true) : dateIndex.length;
+    return dateIndex.slice(start, Math.max(start, end))
+        .map(key => key[1])
+        .sort((a, b) => a - b)
+        .map(i => pointRecords[i]);
+}
+
 // 검색 수행
 function performSearch() {
     const searchTerm = document.getElementById('searchInput').value.toLowerCase();
     const dateFrom = document.getElementById('dateFrom').value;
     const dateTo = document.getElementById('dateTo').value;
     
-    let filtered = pointRecords.filter(record => {
-        const matchText = !searchTerm || 
+    const candidates = dateFrom || dateTo ? recordsInDateRange(dateFrom, dateTo) : pointRecords;
+    let filtered = candidates.filter(record => {
+        return !searchTerm || 
             record.applicant.toLowerCase().includes(searchTerm) ||
             record.transporter.toLowerCase().includes(searchTerm);
-        
-        const matchDateFrom = !dateFrom || record.accumulateDate >= dateFrom;
-        const matchDateTo = !dateTo || record.accumulateDate <= dateTo;
-        
-        return matchText && matchDateFrom && matchDateTo;
     });
     
     loadPointRecords(filtered);
@@ -277,6 +307,7 @@ function updateStatistics() {
 
 // 로컬 스토리지에 저장
 function saveToStorage() {
+    dateIndex = null;
     localStorage.setItem('pointRecords', JSON.stringify(pointRecords));
 }
 
@@ -0,0 +1,161 @@
+import sys
+import threading
+import unicodedata
+
+# 검색 대상 필드 (요청자/전달자는 직원 표시 이름으로도 찾는다)
+SEARCH_FIELDS = ('applicant', 'transporter', 'item', 'recipient')
+PERSON_FIELDS = ('applicant', 'transporter')
+
+
+def normalize_text(value):
+    """검색용 정규화: 유니코드 NFKC (자모가 분리된 한글 등) + 소문자"""
+    if not value:
+        return ''
+    return unicodedata.normalize('NFKC', str(value)).lower()
+
+
+def bigrams(text):
+    """'윤희선' → {'윤희', '희선'}"""
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class SearchIndex:
+    """요청자/전달자/물품/수령자 부분 문자열 검색 색인 (기록 저장소 변경을 받아 증분 갱신)
+
+    필드 값은 정규화해서 값 → 기록 ID 목록으로 모으고, 2-gram → 값 목록(posting)을 따로 둔다.
+    사람 이름/물품/수령자는 같은 값이 반복되므로 posting 크기는 기록 수가 아니라 서로 다른 값 수에 비례한다.
+    검색어의 2-gram posting 들을 작은 것부터 교집합한 뒤 후보 값만 실제 부분 문자열로 확인하므로,
+    결과는 전체를 훑는 것과 같다. 한 글자 검색어는 서로 다른 값만 훑는다.
+    직원 표시 이름(예: 'Paul(윤희선)')으로 검색하면 그 직원이 요청자/전달자인 기록도 찾는다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}
+        self._grams = {}
+        self._record_values = {}
+        self._people = {}
+        self._positions = {}
+        self._next_position = 0
+        # 직원 표시 이름 (직원 dict 가 바뀌었을 때만 다시 정규화)
+        self._names_source = None
+        self._names = {}
+
+    def reset(self, records):
+        """전체 기록으로 다시 만들기"""
+        with self._lock:
+            self._values = {}
+            self._grams = {}
+            self._record_values = {}
+            self._people = {}
+            self._positions = {}
+            self._next_position = 0
+            for record in records:
+                self._add(record)
+
+    def apply(self, old, new):
+        """기록 하나가 old → new 로 바뀜 (추가는 old=None, 삭제는 new=None)"""
+        with self._lock:
+            if old:
+                self._remove(old, keep_position=new is not None)
+            if new:
+                self._add(new)
+
+    def _add(self, record):
+        record_id = record['id']
+        if record_id not in self._positions:
+            # 저장소의 dict 순서와 같게: 수정은 자리 유지, 새로 추가되면 맨 뒤
+            self._positions[record_id] = self._next_position
+            self._next_position += 1
+        # 같은 값은 문자열 하나를 같이 쓰도록 intern (기록마다 복사본을 들지 않음)
+        values = set()
+        for field in SEARCH_FIELDS:
+            value = normalize_text(record.get(field))
+            if value:
+                values.add(sys.intern(value))
+        self._record_values[record_id] = values = tuple(values)
+        for value in values:
+            ids = self._values.get(value)
+            if ids is None:
+                ids = self._values[value] = set()
+                for gram in bigrams(value):
+                    self._grams.setdefault(gram, set()).add(value)
+            ids.add(record_id)
+        for field in PERSON_FIELDS:
+            person = record.get(field)
+            if person:
+                self._people.setdefault(person, set()).add(record_id)
+
+    def _remove(self, record, keep_position=False):
+        record_id = record['id']
+        values = self._record_values.pop(record_id, None)
+        if values is None:
+            return
+        if not keep_position:
+            self._positions.pop(record_id, None)
+        for value in values:
+            ids = self._values[value]
+            ids.discard(record_id)
+            if not ids:
+                del self._values[value]
+                for gram in bigrams(value):
+                    grams = self._grams[gram]
+                    grams.discard(value)
+                    if not grams:
+                        del self._grams[gram]
+        for field in PERSON_FIELDS:
+            person = record.get(field)
+            ids = self._people.get(person)
+            if ids is not None:
+                ids.discard(record_id)
+                if not ids:
+                    del self._people[person]
+
+    def _set_names(self, employees):
+        if employees is self._names_source:
+            return
+        self._names_source = employees
+        self._names = {emp_id: normalize_text(info.get('name') if isinstance(info, dict) else info)
+                       for emp_id, info in (employees or {}).items()}
+
+    def _matching_values(self, query):
+        grams = bigrams(query)
+        if not grams:
+            return [value for value in self._values if query in value]
+
+        postings = []
+        for gram in grams:
+            values = self._grams.get(gram)
+            if not values:
+                return []
+            postings.append(values)
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for values in postings[1:]:
+            candidates &= values
+            if not candidates:
+                return []
+        return [value for value in candidates if query in value]
+
+    def search(self, query, employees=None):
+        """검색어가 들어간 기록 ID 목록 (저장소 순서), employees 는 직원 dict (표시 이름 검색용)"""
+        query = normalize_text(query)
+        with self._lock:
+            if employees is not None:
+                self._set_names(employees)
+            matched = set()
+            for value in self._matching_values(query):
+                matched |= self._values[value]
+            for emp_id, name in self._names.items():
+                if query in name:
+                    matched |= self._people.get(emp_id, set())
+            return sorted(matched, key=self._positions.__getitem__)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'records': len(self._record_values),
+                'values': len(self._values),
+                'grams': len(self._grams),
+                'people': len(self._people)
+            }
@@ -1,13 +1,24 @@
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
-import json
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, Response, stream_with_context
+import io
 import os
 from datetime import datetime
 import socket
-import re
-from collections import defaultdict
-import pandas as pd
+import threading
+import time
+import uuid
 from werkzeug.utils import secure_filename
-import requests
+from storage import open_storage, parse_sort, encode_cursor, decode_cursor, project, VersionConflict
+from leaderboard import Leaderboard
+from employee_import import ingest_employees, employee_template
+from record_export import EXPORT_FORMATS, export_records
+from chat_parser import parse_chat_message, calculate_points
+from chat_import import ChatImporter, ImportConflict, IMPORT_ID_PATTERN, iter_lines, read_checkpoint
+from change_feed import ChangeFeed
+from rollups import GROUP_BY
+from points_ledger import PointsLedger
+from event_stream import EventBroker
+from notification_queue import NotificationQueue
+from jandi_client import JANDI_WEBHOOK_URL, build_payload, default_client as jandi_client
 
 app = Flask(__name__)
 app.secret_key = 'point_manager_secret_key_2024'
@@ -16,11 +27,30 @@ app.secret_key = 'point_manager_secret_key_2024'
 DATA_FILE = 'point_data.json'
 EMPLOYEE_FILE = 'employee_data.json'
 
-# 잔디 웹훅 URL
-JANDI_WEBHOOK_URL = 'https://wh.jandi.com/connect-api/webhook/14611962/0c004aecab37f46a168402c71d4cbaa7'
+# 저장소 백엔드: 'json' (스냅샷 + 저널, 기본값) 또는 'sqlite'
+STORAGE_BACKEND = os.environ.get('POINT_STORAGE', 'json')
+SQLITE_FILE = os.environ.get('POINT_SQLITE_FILE', 'point_data.db')
+
+# 포인트 원장 (완료 적립/적립 취소/관리자 조정 이벤트, 두 백엔드 공통)
+LEDGER_FILE = os.environ.get('POINT_LEDGER_FILE', 'points_ledger.jsonl')
+
+# 다른 워커 프로세스의 기록 변경을 리스너(순위/변경 피드/SSE/원장)에 반영하는 주기 (초, 0 이면 요청 때만)
+REFRESH_INTERVAL = float(os.environ.get('POINT_REFRESH_INTERVAL', '1.0'))
+
+# 워커 프로세스 하나가 동시에 여는 SSE 스트림 수 (스트림은 연결 동안 요청 스레드를 하나씩 차지하므로
+# 스레드 수보다 적게, 넘으면 503 → 화면은 변경 피드 폴링으로 전환. wsgi.py 가 스레드 수에 맞춰 지정)
+SSE_MAX_STREAMS = int(os.environ.get('SSE_MAX_STREAMS', '4'))
+
+# 잔디 알림 스풀 폴더 (재시작 후에도 못 보낸 알림을 다시 전송)
+NOTIFICATION_SPOOL = 'notification_spool'
+
+# 기록 목록 페이지 크기 (limit 최대값)
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
 
  # 업로드 설정
 UPLOAD_FOLDER = 'uploads'
+IMPORT_CHECKPOINT_FOLDER = 'import_checkpoints'
 ALLOWED_EXTENSIONS = {'xlsx', 'xls', 'csv'}
 
 if not os.path.exists(UPLOAD_FOLDER):
@@ -34,23 +64,52 @@ ADMINS = {
     'admin2': 'admin123'
 }
 
+# 기록/직원 저장소 (JSON 은 파일이 바뀔 때만 다시 파싱)
+store, employee_store = open_storage(STORAGE_BACKEND, DATA_FILE, EMPLOYEE_FILE, SQLITE_FILE)
+
+# 요청자/전달자 순위 집계 (기록 변경 시 증분 갱신)
+leaderboard = Leaderboard()
+store.subscribe(leaderboard)
+
+# 기록 변경 피드 (/api/records/changes)
+change_feed = ChangeFeed()
+store.subscribe(change_feed)
+
+# 기록 변경 실시간 알림 (/api/stream, 변경 피드 다음에 등록해야 리비전이 맞음)
+events = EventBroker(revision=change_feed.token, max_subscribers=SSE_MAX_STREAMS)
+store.subscribe(events)
+
+# 직원 포인트 원장: 직원 파일의 total_points 는 기초 포인트, 잔액은 원장에서
+# (등록하면서 지금 기록과 맞춰서 빠진 적립/취소를 채움, 이후 적립은 기록 스레드가 묶어서 씀)
+ledger = PointsLedger(LEDGER_FILE)
+ledger.source = store.get
+if employee_store.exists():
+    ledger.sync_opening(employee_store.load())
+store.subscribe(ledger)
+
+def refresh_store_loop():
+    """다른 워커가 바꾼 기록을 주기적으로 반영 (요청이 없어도 SSE 구독자에게 전달되도록)"""
+    while True:
+        time.sleep(REFRESH_INTERVAL)
+        try:
+            store.refresh()
+        except Exception as e:
+            print(f"기록 저장소 갱신 오류: {e}")
+
+if REFRESH_INTERVAL > 0:
+    threading.Thread(target=refresh_store_loop, name='store-refresh', daemon=True).start()
+
+# 진행 중/최근 채팅 가져오기 (import_id → ChatImporter)
+import_jobs = {}
+import_jobs_lock = threading.Lock()
+
 def load_data():
     """데이터 로드"""
-    if os.path.exists(DATA_FILE):
-        try:
-            with open(DATA_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except:
-            return get_sample_data()
-    else:
-        data = get_sample_data()
-        save_data(data)
-        return data
+    return store.all()
 
 def save_data(data):
-    """데이터 저장"""
-    with open(DATA_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    """데이터 전체 저장 (일괄 교체)"""
+    store.replace_all(data)
 
 def get_sample_data():
     """샘플 데이터"""
@@ -58,12 +117,13 @@ def get_sample_data():
 
 def load_employees():
     """직원 데이터 로드"""
-    if os.path.exists(EMPLOYEE_FILE):
+    if employee_store.exists():
         try:
-            with open(EMPLOYEE_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            employees = employee_store.load()
         except:
             return {}
+        # 호출하는 쪽에서 수정해도 캐시가 바뀌지 않도록 직원별로 복사
+        return {emp_id: dict(info) for emp_id, info in employees.items()}
     else:
         # 초기 직원 데이터
         employees = {
@@ -84,279 +144,44 @@ def load_employees():
         return employees
 
 def save_employees(employees):
-    """직원 데이터 저장"""
-    with open(EMPLOYEE_FILE, 'w', encoding='utf-8') as f:
-        json.dump(employees, f, ensure_ascii=False, indent=2)
+    """직원 데이터 저장 (total_points 는 기초 포인트로 원장에 반영)"""
+    # 저장 후 호출하는 쪽에서 수정해도 캐시가 바뀌지 않도록 복사본을 보관
+    employee_store.save({emp_id: dict(info) for emp_id, info in employees.items()})
+    ledger.sync_opening(employees)
+
+def with_balances(employees):
+    """직원 목록에 원장 잔액(balance) 을 붙여서 반환 (total_points 는 기초 포인트 그대로)"""
+    for emp_id, info in employees.items():
+        info['balance'] = ledger.balance(emp_id)
+    return employees
 
 def allowed_file(filename):
     """허용된 파일 확장자 확인"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def send_jandi_notification(title, message, color="#00d4ff"):
-    """잔디로 알림 메시지 전송"""
-    try:
-        data = {
-            "body": message,
-            "connectColor": color,
-            "connectInfo": [{
-                "title": title,
-                "description": message
-            }]
-        }
+# 잔디 알림 큐 (요청 스레드는 적재만 하고, 워커가 공용 클라이언트로 묶어서 전송)
+notifications = NotificationQueue(jandi_client.send_batch, spool_dir=NOTIFICATION_SPOOL)
 
-        response = requests.post(JANDI_WEBHOOK_URL, json=data, timeout=5)
-        return response.status_code == 200
-
-    except Exception as e:
-        print(f"잔디 알림 전송 중 오류: {str(e)}")
-        return False
-
-def calculate_points(from_location, to_location):
-    """경로에 따른 포인트 계산"""
-    # 지역 그룹 정의
-    수도권 = ['평촌', '판교']
-    광주권 = ['광주본사', '광주R&D']
-
-    # 출발지와 도착지의 지역 확인
-    from_region = None
-    to_region = None
-
-    if from_location in 수도권:
-        from_region = '수도권'
-    elif from_location in 광주권:
-        from_region = '광주권'
-
-    if to_location in 수도권:
-        to_region = '수도권'
-    elif to_location in 광주권:
-        to_region = '광주권'
-
-    # 포인트 계산: 요청자는 항상 5000P, 전달자는 지역에 따라
-    applicant_points = 5000
-
-    if from_region == to_region:
-        transporter_points = 5000  # 같은 지역 내
-    else:
-        transporter_points = 10000  # 다른 지역으로
-
-    return applicant_points, transporter_points
-
-def parse_chat_message(message):
-    """채팅 메시지에서 운송 정보 추출"""
-    print(f"[DEBUG] parse_chat_message 시작: '{message}'")
-
-    # 위치 패턴 (정확한 사무실 명칭)
-    locations = {
-        '평촌': ['평촌', '제조혁신센터'],
-        '판교': ['판교', '판교R&D', '판교rnd', '1센터', '2센터'],
-        '광주본사': ['광주본사', '광주', '본사'],
-        '광주R&D': ['광주R&D', '광주rnd', 'R&D', 'rnd']
-    }
-
-    from_loc = None
-    to_loc = None
-    from_text = None
-    to_text = None
-
-    # /싣고받고 명령어 처리
-    if message.strip().startswith('/싣고받고'):
-        parts = message.strip().split()
-
-        # /싣고받고 접수 [번호] 패턴 확인
-        if len(parts) >= 3 and parts[1] == '접수':
-            try:
-                request_id = int(parts[2])
-                message_type = 'accept_id'
-                return {
-                    'message_type': message_type,
-                    'request_id': request_id,
-                    'from_location': None,
-                    'to_location': None,
-                    'requester': None,
-                    'transporter': None
-                }
-            except ValueError:
-                pass
-
-        # /싣고받고 완료 [번호] 패턴 확인
-        elif len(parts) >= 3 and parts[1] == '완료':
-            try:
-                request_id = int(parts[2])
-                message_type = 'complete_id'
-                return {
-                    'message_type': message_type,
-                    'request_id': request_id,
-                    'from_location': None,
-                    'to_location': None,
-                    'requester': None,
-                    'transporter': None
-                }
-            except ValueError:
-                pass
-
-        # 운송 요청 패턴: /싣고받고 물품명 수령자 출발지 도착지
-        elif len(parts) >= 5:  # /싣고받고 물품명 수령자 출발지 도착지
-            from_text = parts[3]  # 출발지
-            to_text = parts[4]    # 도착지
-            recipient = parts[2]  # 수령자
-        elif len(parts) >= 3:  # 기존 방식 호환: /싣고받고 출발지 도착지
-            from_text = parts[1]
-            to_text = parts[2]
-            recipient = None
-    else:
-        # 잔디 웹훅에서 data 필드로 오는 경우: 순서대로 인식 (첫번째 두번째는 출발지 도착지)
-        parts = message.strip().split()
-        if len(parts) >= 2:  # 최소 출발지 도착지는 있어야 함
-            from_text = parts[0]  # 출발지
-            to_text = parts[1]    # 도착지
-            # 세번째가 있으면 물품명, 네번째가 있으면 수령자
-            recipient = parts[3] if len(parts) >= 4 else None
-
-    # 위치 정규화
-    if from_text and to_text:
-        print(f"[DEBUG] from_text: '{from_text}', to_text: '{to_text}'")
-        for key, values in locations.items():
-            if any(v in from_text for v in values):
-                from_loc = key
-                print(f"[DEBUG] from_loc 찾음: {key}")
-            if any(v in to_text for v in values):
-                to_loc = key
-                print(f"[DEBUG] to_loc 찾음: {key}")
-    else:
-        print(f"[DEBUG] from_text 또는 to_text가 없음: from_text='{from_text}', to_text='{to_text}'")
-
-    # 위에서 찾지 못했다면 기존 복잡한 패턴들 시도 (하위 호환성)
-    if not from_loc or not to_loc:
-        patterns = [
-            r'(평촌|판교|광주)[\s]*[→>-]+[\s]*(평촌|판교|광주)',
-            r'(평촌|판교|광주)[\s]*--+>[\s]*(평촌|판교|광주)',
-            r'(평촌|판교|광주)[\s]*에서[\s]*(평촌|판교|광주)[\s]*로',
-            r'(평촌|판교|광주).*to.*(평촌|판교|광주)'
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, message, re.IGNORECASE)
-            if match:
-                from_text = match.group(1)
-                to_text = match.group(2)
-
-                # 정규화
-                for key, values in locations.items():
-                    if any(v in from_text for v in values):
-                        from_loc = key
-                    if any(v in to_text for v in values):
-                        to_loc = key
-
-                if from_loc and to_loc:
-                    break
-
-    # 메시지 타입 분류
-    message_type = 'unknown'
-    requester = None
-    transporter = None
-
-    # 1. 운송 요청 메시지
-    if message.strip().startswith('/싣고받고') and from_loc and to_loc:
-        message_type = 'request'
-        # 요청자는 메시지 작성자 (웹훅에서 sender로 전달됨)
-    elif from_loc and to_loc:
-        # 잔디 웹훅에서 data 필드로 "평촌 판교 센서" 형태로 오는 경우
-        message_type = 'request'
-        print(f"[DEBUG] 잔디 웹훅 요청으로 인식: from_loc={from_loc}, to_loc={to_loc}")
-        # 요청자는 메시지 작성자 (웹훅에서 sender로 전달됨)
-    elif any(keyword in message for keyword in ['이송 부탁', '전달 부탁', '전달 요청', '이동하시는 분', '운송 요청']):
-        message_type = 'request'
-        # 요청자는 메시지 작성자 (웹훅에서 sender로 전달됨)
-
-    # 2. 전달 수락 메시지 (ID 기반이 아닌 경우만)
-    elif any(keyword in message for keyword in ['접수', '신청']) and not message.strip().startswith('/싣고받고'):
-        message_type = 'accept'
-        # 전달자는 메시지 작성자
-
-    # 3. 완료 메시지
-    elif any(keyword in message for keyword in ['받았습니다', '수령했습니다', '잘 받았습니다', '완료']):
-        message_type = 'complete'
-
-    # 이름 패턴 추출 (태그된 사람들)
-    name_pattern = r'@?([A-Za-z]+)\([가-힣]+\)'
-    names = re.findall(name_pattern, message)
-
-    # 수령자 정보 추출 (메시지 전체에서, @ 없이)
-    recipient = None
-    # /싣고받고 형식이 아닌 경우에만 전체 메시지에서 추출
-    if not message.strip().startswith('/싣고받고'):
-        # 기존 방식에서는 수령자 정보 추출하지 않음
-        pass
-
-    return {
-        'from_location': from_loc,
-        'to_location': to_loc,
-        'message_type': message_type,
-        'names': names,
-        'requester': requester,
-        'transporter': transporter,
-        'recipient': recipient
-    }
-
-def get_next_id(data):
-    """다음 ID 생성"""
-    if not data:
-        return 1
-    return max(item['id'] for item in data) + 1
+def send_jandi_notification(title, message, color="#00d4ff"):
+    """잔디로 알림 메시지 전송 (큐에 적재만 하고 바로 반환)"""
+    return notifications.enqueue(JANDI_WEBHOOK_URL, build_payload(title, message, color))
 
 @app.route('/')
 def index():
     """메인 페이지 - 바로 현황 조회로"""
-    data = load_data()
-
-    # 통계 계산
-    requester_stats = defaultdict(lambda: {'count': 0, 'points': 0})
-    transporter_stats = defaultdict(lambda: {'count': 0, 'points': 0})
-
-    for record in data:
-        if record.get('status') == '완료':
-            requester = record.get('applicant', '')
-            transporter = record.get('transporter', '')
-
-            if requester:
-                requester_stats[requester]['count'] += 1
-                requester_stats[requester]['points'] += record.get('applicant_amount', 0)
-
-            if transporter:
-                transporter_stats[transporter]['count'] += 1
-                transporter_stats[transporter]['points'] += record.get('transporter_amount', 0)
-
-    # 상위 10명 추출 (동순위 고려)
-    top_requesters = sorted(requester_stats.items(), key=lambda x: x[1]['count'], reverse=True)[:10]
-    top_transporters = sorted(transporter_stats.items(), key=lambda x: x[1]['count'], reverse=True)[:10]
-
-    # 동순위 처리를 위한 순위 계산
-    def calculate_rank(sorted_list):
-        result = []
-        current_rank = 1
-        prev_count = None
-
-        for i, (name, stats) in enumerate(sorted_list):
-            if prev_count is not None and stats['count'] != prev_count:
-                current_rank = i + 1
-
-            result.append({
-                'name': name,
-                'stats': stats,
-                'rank': current_rank,
-                'display_rank': current_rank if stats['count'] != prev_count or i == 0 else None
-            })
-            prev_count = stats['count']
-
-        return result
-
-    top_requesters_ranked = calculate_rank(top_requesters)
-    top_transporters_ranked = calculate_rank(top_transporters)
+    # 첫 페이지만 렌더링 (나머지는 /api/records 로 페이지 단위 조회)
+    store.refresh()
+    revision = change_feed.token()
+    records, total = store.page(sort_keys=parse_sort('-id'), limit=PAGE_SIZE)
 
+    # 상위 10명 (동순위 고려) - 증분 집계에서 바로 꺼냄
     return render_template('dashboard.html',
-                         records=data,
-                         top_requesters=top_requesters_ranked,
-                         top_transporters=top_transporters_ranked)
+                         records=records,
+                         total=total,
+                         revision=revision,
+                         page_size=PAGE_SIZE,
+                         top_requesters=leaderboard.top_requesters(10),
+                         top_transporters=leaderboard.top_transporters(10))
 
 @app.route('/admin')
 def admin():
@@ -364,27 +189,12 @@ def admin():
     if session.get('user_type') != 'admin':
         return redirect(url_for('admin_login'))
 
-    employees = load_employees()
-    data = load_data()
+    employees = with_balances(load_employees())
+    store.refresh()
 
-    # 직원별 통계 계산
+    # 직원별 통계 (증분 집계)
     for emp_id in employees:
-        employees[emp_id]['request_count'] = 0
-        employees[emp_id]['transport_count'] = 0
-        employees[emp_id]['earned_points'] = 0
-
-    for record in data:
-        if record.get('status') == '완료':
-            requester = record.get('applicant')
-            transporter = record.get('transporter')
-
-            if requester in employees:
-                employees[requester]['request_count'] += 1
-                employees[requester]['earned_points'] += record.get('applicant_amount', 0)
-
-            if transporter and transporter in employees:
-                employees[transporter]['transport_count'] += 1
-                employees[transporter]['earned_points'] += record.get('transporter_amount', 0)
+        employees[emp_id].update(leaderboard.employee_stats(emp_id))
 
     return render_template('admin.html',
                          username=session.get('username'),
@@ -415,9 +225,18 @@ def webhook():
         print(f"[DEBUG] Raw data: {request.get_data()}")
 
         webhook_data = request.json
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    body, status = process_webhook(webhook_data)
+    return jsonify(body), status
+
+def process_webhook(webhook_data):
+    """잔디 웹훅 JSON 하나 처리 → (응답 JSON, HTTP 상태) (/webhook 과 비동기 수신 경로(asgi.py) 공용)"""
+    try:
         if not webhook_data:
             print("[ERROR] JSON 데이터가 없습니다")
-            return jsonify({'success': False, 'error': 'JSON 데이터가 필요합니다'})
+            return {'success': False, 'error': 'JSON 데이터가 필요합니다'}, 200
 
         print(f"[DEBUG] 파싱된 JSON: {webhook_data}")
 
@@ -435,7 +254,6 @@ def webhook():
 
         # 메시지 파싱
         parsed = parse_chat_message(message)
-        data = load_data()
 
         # 1. 운송 요청 메시지
         if parsed['message_type'] == 'request':
@@ -446,7 +264,7 @@ def webhook():
                     f"**정확한 사무실 명칭을 사용해주세요!**\n\n📍 **사용 가능한 사무실:**\n• **평촌** (제조혁신센터)\n• **판교** (R&D센터)\n• **광주본사**\n• **광주R&D**\n\n📝 **예시:**\n`/싣고받고 평촌 판교 센서`\n`/싣고받고 광주본사 광주R&D 노트북`",
                     "#e74c3c"
                 )
-                return jsonify({'success': False, 'error': '위치 정보가 누락되었습니다.'})
+                return {'success': False, 'error': '위치 정보가 누락되었습니다.'}, 200
 
             # 정상적인 요청 처리
             # 포인트 계산
@@ -482,7 +300,7 @@ def webhook():
 
             # 새 운송 요청 레코드 생성
             new_record = {
-                'id': get_next_id(data),
+                'id': store.allocate_id(),
                 'request_date': timestamp[:10] if len(timestamp) >= 10 else datetime.now().strftime('%Y-%m-%d'),
                 'applicant': sender,
                 'transporter': '',  # 아직 정해지지 않음
@@ -501,8 +319,7 @@ def webhook():
                 'message_id': thread_id
             }
 
-            data.append(new_record)
-            save_data(data)
+            new_record = store.insert(new_record)
 
             # 잔디 알림 전송 (상세 포인트 정보)
             recipient_info = f" → {parsed.get('recipient', '수령자')}" if parsed.get('recipient') else ""
@@ -512,33 +329,23 @@ def webhook():
                 "#27ae60"
             )
 
-            return jsonify({'success': True, 'action': 'request_created', 'record': new_record})
+            return {'success': True, 'action': 'request_created', 'record': new_record}, 200
 
         # 2. 전달 수락 메시지
         elif parsed['message_type'] == 'accept':
-            # 댓글인 경우 특정 요청에 대한 수락, 아니면 가장 최근 요청
-            target_requests = []
-
-            if reply_to:
-                # 특정 메시지에 대한 댓글인 경우
-                target_requests = [r for r in data if r.get('message_id') == reply_to and r.get('status') == '대기중']
-            else:
-                # 일반 메시지인 경우 가장 최근 대기중인 요청
-                target_requests = [r for r in data if r.get('status') == '대기중' and not r.get('transporter')]
-
-            if target_requests:
-                # 가장 최근 요청에 전달자 배정
-                latest_request = max(target_requests, key=lambda x: x['created_at'])
-
-                for i, record in enumerate(data):
-                    if record['id'] == latest_request['id']:
-                        data[i]['transporter'] = sender
-                        data[i]['status'] = '진행중'
-                        data[i]['updated_at'] = datetime.now().isoformat()
-                        break
-
-                save_data(data)
-
+            # 댓글인 경우 특정 요청에 대한 수락, 아니면 가장 최근 대기중인 요청
+            # (찾기~배정을 한 트랜잭션으로 묶어서 두 사람이 같은 요청을 동시에 받지 않도록 함)
+            with store.transaction():
+                latest_request = store.latest_waiting(reply_to)
+                if latest_request:
+                    # 가장 최근 요청에 전달자 배정
+                    updated = store.update(latest_request['id'], {
+                        'transporter': sender,
+                        'status': '진행중',
+                        'updated_at': datetime.now().isoformat()
+                    })
+
+            if latest_request:
                 # 잔디 알림 전송
                 send_jandi_notification(
                     "✅ 접수완료!",
@@ -546,62 +353,52 @@ def webhook():
                     "#27ae60"
                 )
 
-                return jsonify({'success': True, 'action': 'transporter_assigned', 'record': data[i]})
+                return {'success': True, 'action': 'transporter_assigned', 'record': updated}, 200
             else:
-                return jsonify({'success': False, 'error': '대기중인 운송 요청이 없습니다.'})
+                return {'success': False, 'error': '대기중인 운송 요청이 없습니다.'}, 200
 
         # 3. 완료 메시지
         elif parsed['message_type'] == 'complete':
             # 가장 최근의 진행중인 요청 찾기
-            in_progress = [r for r in data if r.get('status') == '진행중']
-
-            if in_progress:
-                # 가장 최근 요청을 완료로 변경
-                latest_request = max(in_progress, key=lambda x: x.get('updated_at', x['created_at']))
-
-                for i, record in enumerate(data):
-                    if record['id'] == latest_request['id']:
-                        data[i]['status'] = '완료'
-                        data[i]['accumulate_date'] = datetime.now().strftime('%Y-%m-%d')
-                        data[i]['completed_at'] = datetime.now().isoformat()
-                        break
-
-                save_data(data)
-
+            with store.transaction():
+                latest_request = store.latest_in_progress()
+                if latest_request:
+                    # 가장 최근 요청을 완료로 변경
+                    completed_record = store.update(latest_request['id'], {
+                        'status': '완료',
+                        'accumulate_date': datetime.now().strftime('%Y-%m-%d'),
+                        'completed_at': datetime.now().isoformat()
+                    })
+
+            if latest_request:
                 # 잔디 알림 전송
-                completed_record = data[i]
                 send_jandi_notification(
                     "🎉 배송완료!",
                     f"✅ 운송이 완료되었습니다!\n\n요청자: {completed_record['applicant']} (+{completed_record['applicant_amount']:,}P)\n전달자: {completed_record['transporter']} (+{completed_record['transporter_amount']:,}P)\n경로: {completed_record['from_location']} → {completed_record['to_location']}\n물품: {completed_record['item']}\n\n포인트 적립 예정! 감사합니다! 🙏",
                     "#27ae60"
                 )
 
-                return jsonify({'success': True, 'action': 'completed', 'record': data[i]})
+                return {'success': True, 'action': 'completed', 'record': completed_record}, 200
             else:
-                return jsonify({'success': False, 'error': '진행중인 운송 요청이 없습니다.'})
+                return {'success': False, 'error': '진행중인 운송 요청이 없습니다.'}, 200
 
         # 4. ID 기반 접수 메시지: /싣고받고 접수 [번호]
         elif parsed['message_type'] == 'accept_id':
             request_id = parsed['request_id']
 
             # 해당 ID의 대기중 요청 찾기
-            target_request = None
-            for record in data:
-                if record['id'] == request_id and record.get('status') == '대기중':
-                    target_request = record
-                    break
-
-            if target_request:
-                # 전달자 배정
-                for i, record in enumerate(data):
-                    if record['id'] == request_id:
-                        data[i]['transporter'] = sender
-                        data[i]['status'] = '진행중'
-                        data[i]['updated_at'] = datetime.now().isoformat()
-                        break
-
-                save_data(data)
-
+            with store.transaction():
+                target_request = store.get(request_id)
+                accepted = bool(target_request and target_request.get('status') == '대기중')
+                if accepted:
+                    # 전달자 배정
+                    updated = store.update(request_id, {
+                        'transporter': sender,
+                        'status': '진행중',
+                        'updated_at': datetime.now().isoformat()
+                    })
+
+            if accepted:
                 # 알림 전송
                 recipient_info = f" → {target_request.get('recipient', '수령자')}" if target_request.get('recipient') else ""
                 send_jandi_notification(
@@ -610,37 +407,32 @@ def webhook():
                     "#27ae60"
                 )
 
-                return jsonify({'success': True, 'action': 'accepted_by_id', 'record': data[i]})
+                return {'success': True, 'action': 'accepted_by_id', 'record': updated}, 200
             else:
                 send_jandi_notification(
                     "❌ 접수 실패",
                     f"#{request_id}번 요청을 찾을 수 없거나 이미 처리되었습니다.",
                     "#e74c3c"
                 )
-                return jsonify({'success': False, 'error': f'{request_id}번 요청을 찾을 수 없습니다.'})
+                return {'success': False, 'error': f'{request_id}번 요청을 찾을 수 없습니다.'}, 200
 
         # 5. ID 기반 완료 메시지: /싣고받고 완료 [번호]
         elif parsed['message_type'] == 'complete_id':
             request_id = parsed['request_id']
 
             # 해당 ID의 진행중 요청 찾기
-            target_request = None
-            for record in data:
-                if record['id'] == request_id and record.get('status') == '진행중':
-                    target_request = record
-                    break
-
-            if target_request:
-                # 완료 처리
-                for i, record in enumerate(data):
-                    if record['id'] == request_id:
-                        data[i]['status'] = '완료'
-                        data[i]['accumulate_date'] = datetime.now().strftime('%Y-%m-%d')
-                        data[i]['updated_at'] = datetime.now().isoformat()
-                        break
-
-                save_data(data)
-
+            with store.transaction():
+                target_request = store.get(request_id)
+                completed = bool(target_request and target_request.get('status') == '진행중')
+                if completed:
+                    # 완료 처리
+                    updated = store.update(request_id, {
+                        'status': '완료',
+                        'accumulate_date': datetime.now().strftime('%Y-%m-%d'),
+                        'updated_at': datetime.now().isoformat()
+                    })
+
+            if completed:
                 # 완료 알림
                 recipient_info = f" → {target_request.get('recipient', '수령자')}" if target_request.get('recipient') else ""
                 send_jandi_notification(
@@ -649,14 +441,14 @@ def webhook():
                     "#27ae60"
                 )
 
-                return jsonify({'success': True, 'action': 'completed_by_id', 'record': data[i]})
+                return {'success': True, 'action': 'completed_by_id', 'record': updated}, 200
             else:
                 send_jandi_notification(
                     "❌ 완료 실패",
                     f"#{request_id}번 요청을 찾을 수 없거나 진행중 상태가 아닙니다.",
                     "#e74c3c"
                 )
-                return jsonify({'success': False, 'error': f'{request_id}번 요청을 찾을 수 없습니다.'})
+                return {'success': False, 'error': f'{request_id}번 요청을 찾을 수 없습니다.'}, 200
 
         else:
             # 양식 안내 메시지 전송
@@ -666,100 +458,91 @@ def webhook():
                     "**올바른 양식을 사용하세요!**\n\n🚚 **운송 요청 양식**: `[출발지] [도착지] [물품명] [수령자]`\n\n📝 **예시:**\n• `평촌 판교 컴퓨터 mIKE` - 평촌에서 판교로 컴퓨터를 mIKE에게\n• `광주 평촌 센서 Anna` - 광주에서 평촌으로 센서를 Anna에게\n\n✅ **전달 수락**: `/싣고받고 접수 번호`\n✅ **완료 확인**: `/싣고받고 완료 번호`",
                     "#f39c12"
                 )
-                return jsonify({'success': False, 'error': '양식 안내를 전송했습니다.'})
+                return {'success': False, 'error': '양식 안내를 전송했습니다.'}, 200
             else:
-                return jsonify({'success': False, 'error': '인식할 수 없는 메시지 형식입니다.'})
+                return {'success': False, 'error': '인식할 수 없는 메시지 형식입니다.'}, 200
 
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 400
+        return {'success': False, 'error': str(e)}, 400
 
 @app.route('/api/parse_chat', methods=['POST'])
 def parse_chat():
-    """채팅 내용 일괄 파싱 API"""
+    """채팅 내용 일괄 파싱 API
+
+    JSON {"chat_text": ...} 은 기존처럼 등록된 기록 목록까지 돌려주고,
+    파일 업로드(file) 또는 본문 그대로(text/plain, chunked 가능) 보내면 스트리밍으로 가져온다.
+    스트리밍 가져오기는 import_id 별로 체크포인트를 남기므로, 끊기면 같은 파일을
+    같은 import_id 로 다시 보내서 이어서 가져올 수 있다.
+    """
     if session.get('user_type') != 'admin':
         return jsonify({'error': '권한이 없습니다.'}), 403
 
-    chat_text = request.json.get('chat_text', '')
-    lines = chat_text.split('\n')
-
-    data = load_data()
-    added_records = []
-    current_date = None
-    pending_requests = {}  # 대기중인 요청들
-
-    for line in lines:
-        # 날짜 패턴 확인
-        date_match = re.search(r'(\d{4})년\s*(\d{1,2})월\s*(\d{1,2})일', line)
-        if date_match:
-            year = date_match.group(1)
-            month = date_match.group(2).zfill(2)
-            day = date_match.group(3).zfill(2)
-            current_date = f"{year}-{month}-{day}"
-            continue
-
-        # 운송 요청 패턴
-        if any(keyword in line for keyword in ['이동하시는 분', '이송 부탁', '전달 부탁', '전달 요청']):
-            parsed = parse_chat_message(line)
-            if parsed['from_location'] and parsed['to_location']:
-                applicant_points, transporter_points = calculate_points(
-                    parsed['from_location'],
-                    parsed['to_location']
-                )
+    if request.is_json:
+        chat_text = request.json.get('chat_text', '')
+        importer = ChatImporter(store, collect=True)
+        importer.run(chat_text.split('\n'))
+        return jsonify({'success': True, 'added': importer.added, 'records': importer.records})
+
+    import_id = request.args.get('import_id') or uuid.uuid4().hex[:16]
+    if not IMPORT_ID_PATTERN.match(import_id):
+        return jsonify({'success': False, 'error': '잘못된 import_id 입니다.'}), 400
+
+    upload = request.files.get('file')
+    stream = upload.stream if upload else request.stream
+    importer = ChatImporter(store, import_id=import_id,
+                            checkpoint_dir=IMPORT_CHECKPOINT_FOLDER,
+                            bytes_total=request.content_length)
+
+    with import_jobs_lock:
+        previous = import_jobs.get(import_id)
+        if previous and previous.status == 'running':
+            return jsonify({'success': False, 'error': '같은 가져오기가 진행 중입니다.', 'reason': 'running',
+                            'import_id': import_id}), 409
+        import_jobs[import_id] = importer
 
-                # 물품 추출
-                item = '물품'
-                item_patterns = ['센서', '박스', '노트북', 'ML-U', 'SL-U', '보드']
-                for pattern in item_patterns:
-                    if pattern.lower() in line.lower():
-                        item = pattern
-                        break
-
-                new_record = {
-                    'id': get_next_id(data),
-                    'request_date': current_date or datetime.now().strftime('%Y-%m-%d'),
-                    'applicant': parsed['requester'] or '미지정',
-                    'transporter': '',
-                    'from_location': parsed['from_location'],
-                    'to_location': parsed['to_location'],
-                    'item': item,
-                    'applicant_amount': applicant_points,
-                    'transporter_amount': transporter_points,
-                    'accumulate_date': '',
-                    'deadline_date': '',
-                    'status': '진행중',
-                    'created_at': datetime.now().isoformat(),
-                    'source': 'chat_import'
-                }
-
-                # 요청자를 키로 저장
-                if parsed['requester']:
-                    pending_requests[parsed['requester']] = new_record
-
-                data.append(new_record)
-                added_records.append(new_record)
-
-        # 전달 응답 패턴
-        elif any(keyword in line for keyword in ['전달드리겠습니다', '제가 전달', '전달하겠습니다']):
-            parsed = parse_chat_message(line)
-            # 가장 최근의 관련 요청 찾기
-            for requester, request in pending_requests.items():
-                if request['status'] == '진행중' and not request['transporter']:
-                    request['transporter'] = parsed['requester'] or parsed['transporter'] or '미지정'
-                    break
-
-        # 완료 패턴
-        elif any(keyword in line for keyword in ['받았습니다', '수령했습니다', '잘 받았습니다']):
-            parsed = parse_chat_message(line)
-            # 관련 요청 찾아서 완료 처리
-            for requester, request in list(pending_requests.items()):
-                if request['status'] == '진행중':
-                    request['status'] = '완료'
-                    request['accumulate_date'] = current_date or datetime.now().strftime('%Y-%m-%d')
-                    del pending_requests[requester]
-                    break
-
-    save_data(data)
-    return jsonify({'success': True, 'added': len(added_records), 'records': added_records})
+    try:
+        importer.run(iter_lines(stream, on_read=importer.count_bytes))
+    except ImportConflict as e:
+        # 거절된 요청이 기존 진행 상황을 가리지 않도록 되돌림
+        with import_jobs_lock:
+            if previous:
+                import_jobs[import_id] = previous
+            else:
+                import_jobs.pop(import_id, None)
+        return jsonify({'success': False, 'error': str(e), 'reason': e.reason, 'import_id': import_id}), 409
+    except Exception as e:
+        print(f"채팅 가져오기 중단 ({import_id}): {str(e)}")
+        return jsonify({'success': False, 'error': str(e), 'import_id': import_id,
+                        'progress': importer.progress()}), 500
+
+    return jsonify({'success': True, 'added': importer.added, 'import_id': import_id,
+                    'progress': importer.progress()})
+
+@app.route('/api/parse_chat/<import_id>', methods=['GET'])
+def parse_chat_progress(import_id):
+    """스트리밍 가져오기 진행 상황 API"""
+    if session.get('user_type') != 'admin':
+        return jsonify({'error': '권한이 없습니다.'}), 403
+    if not IMPORT_ID_PATTERN.match(import_id):
+        return jsonify({'error': '잘못된 import_id 입니다.'}), 400
+
+    with import_jobs_lock:
+        importer = import_jobs.get(import_id)
+    if importer:
+        return jsonify(importer.progress())
+
+    # 서버 재시작 등으로 메모리에 없으면 체크포인트 기준으로 응답
+    checkpoint = read_checkpoint(os.path.join(IMPORT_CHECKPOINT_FOLDER, f"{import_id}.json"))
+    if not checkpoint:
+        return jsonify({'error': '가져오기를 찾을 수 없습니다.'}), 404
+    return jsonify({
+        'import_id': import_id,
+        'status': 'done' if checkpoint['status'] == 'done' else 'interrupted',
+        'lines': checkpoint['line_no'],
+        'added': checkpoint['added'],
+        'batches': checkpoint['batches'],
+        'updated_at': checkpoint['updated_at']
+    })
 
 @app.route('/logout')
 def logout():
@@ -770,31 +553,108 @@ def logout():
 @app.route('/api/records', methods=['GET'])
 def get_records():
     """기록 조회 API"""
-    data = load_data()
-    
     # 검색 필터
     search = request.args.get('search', '').lower()
     date_from = request.args.get('date_from', '')
     date_to = request.args.get('date_to', '')
-    
-    filtered_data = []
-    for record in data:
-        # 텍스트 검색
-        text_match = (not search or 
-                     search in record['applicant'].lower() or
-                     search in record['transporter'].lower())
-        
-        # 날짜 필터
-        date_match = True
-        if date_from and record['accumulate_date'] < date_from:
-            date_match = False
-        if date_to and record['accumulate_date'] > date_to:
-            date_match = False
-            
-        if text_match and date_match:
-            filtered_data.append(record)
-    
-    return jsonify(filtered_data)
+
+    # 정렬/필드 선택/페이지 (limit 또는 cursor 가 있으면 페이지 정보와 함께 응답)
+    fields = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()]
+    paged = 'limit' in request.args or 'cursor' in request.args
+    try:
+        sort_keys = parse_sort(request.args.get('sort', ''))
+        limit = min(int(request.args.get('limit', PAGE_SIZE)), MAX_PAGE_SIZE) if paged else None
+        offset = max(int(request.args.get('offset', 0)), 0)
+        cursor = request.args.get('cursor', '')
+        after = decode_cursor(cursor, sort_keys) if cursor else None
+    except ValueError as e:
+        return jsonify({'error': f'잘못된 조회 조건: {str(e)}'}), 400
+    if limit is not None and limit < 1:
+        return jsonify({'error': 'limit 은 1 이상이어야 합니다.'}), 400
+
+    if not paged and 'sort' not in request.args:
+        records = store.query(search, date_from, date_to)
+        return jsonify([project(r, fields) for r in records])
+
+    # 리비전을 먼저 읽어서 이후 변경은 다음 /api/records/changes 에서 받도록 함
+    store.refresh()
+    revision = change_feed.token()
+    records, total = store.page(search, date_from, date_to, sort_keys, limit, offset, after)
+    if not paged:
+        return jsonify([project(r, fields) for r in records])
+
+    return jsonify({
+        'records': [project(r, fields) for r in records],
+        'total': total,
+        'offset': None if after is not None else offset,
+        'limit': limit,
+        'next_cursor': encode_cursor(records[-1], sort_keys) if len(records) == limit else None,
+        'revision': revision
+    })
+
+@app.route('/api/records/export', methods=['GET'])
+def export_records_file():
+    """기록 내보내기 API (format=csv|xlsx|jsonl, /api/records 와 같은 검색 필터)"""
+    fmt = request.args.get('format', 'csv').lower()
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f'지원하지 않는 형식입니다: {fmt}'}), 400
+    try:
+        sort_keys = parse_sort(request.args.get('sort', 'id'))
+    except ValueError as e:
+        return jsonify({'error': f'잘못된 조회 조건: {str(e)}'}), 400
+
+    records = store.iter_query(
+        request.args.get('search', '').lower(),
+        request.args.get('date_from', ''),
+        request.args.get('date_to', ''),
+        sort_keys
+    )
+    mimetype, extension = EXPORT_FORMATS[fmt]
+    filename = f"point_records_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+
+    # 행을 만드는 대로 내보냄 (기록 수와 관계없이 응답을 메모리에 모으지 않음)
+    response = Response(stream_with_context(export_records(records, fmt)), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+@app.route('/api/records/changes', methods=['GET'])
+def get_record_changes():
+    """since 리비전 이후 추가/수정/삭제된 기록만 조회 API"""
+    store.refresh()
+    revision, changed, deleted = change_feed.since(request.args.get('since', ''))
+
+    etag = f'"{revision}"'
+    if request.headers.get('If-None-Match') == etag:
+        return '', 304, {'ETag': etag}
+
+    if changed is None:
+        # 다른 epoch 이거나 너무 오래된 리비전 → 전체를 다시 받아야 함
+        body = {'revision': revision, 'reset': True, 'changes': [], 'deleted': []}
+    else:
+        fields = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()]
+        changes = []
+        for record_id in changed:
+            record = store.get(record_id)
+            if record:
+                changes.append(project(record, fields))
+            else:
+                deleted.append(record_id)
+        body = {'revision': revision, 'reset': False, 'changes': changes, 'deleted': deleted,
+                'total': store.count()}
+
+    response = jsonify(body)
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/api/records/<int:record_id>', methods=['GET'])
+def get_record(record_id):
+    """기록 하나 조회 API"""
+    record = store.get(record_id)
+    if not record:
+        return jsonify({'error': '기록을 찾을 수 없습니다.'}), 404
+    return jsonify(record)
 
 @app.route('/api/records', methods=['POST'])
 def add_record():
@@ -802,17 +662,15 @@ def add_record():
     if session.get('user_type') != 'admin':
         return jsonify({'error': '권한이 없습니다.'}), 403
     
-    data = load_data()
     new_record = request.json
-    new_record['id'] = get_next_id(data)
+    new_record['id'] = store.allocate_id()
     new_record['created_at'] = datetime.now().isoformat()
     
     # deadline_date 필드가 없으면 빈 문자열로 설정
     if 'deadline_date' not in new_record:
         new_record['deadline_date'] = ''
     
-    data.append(new_record)
-    save_data(data)
+    new_record = store.insert(new_record)
     
     return jsonify({'success': True, 'record': new_record})
 
@@ -822,20 +680,31 @@ def update_record(record_id):
     if session.get('user_type') != 'admin':
         return jsonify({'error': '권한이 없습니다.'}), 403
     
-    data = load_data()
-    updated_data = request.json
-    
-    for i, record in enumerate(data):
-        if record['id'] == record_id:
-            # deadline_date 필드가 없으면 빈 문자열로 설정
-            if 'deadline_date' not in updated_data:
-                updated_data['deadline_date'] = ''
-            data[i].update(updated_data)
-            data[i]['updated_at'] = datetime.now().isoformat()
-            save_data(data)
-            return jsonify({'success': True, 'record': data[i]})
-    
-    return jsonify({'error': '기록을 찾을 수 없습니다.'}), 404
+    updated_data = dict(request.json)
+
+    # 편집을 시작할 때 받은 버전 (본문 version 또는 If-Match 헤더), 없으면 검사하지 않음
+    expected_version = updated_data.pop('version', None)
+    if expected_version is None and request.headers.get('If-Match'):
+        expected_version = request.headers['If-Match'].strip('"')
+    try:
+        expected_version = int(expected_version) if expected_version is not None else None
+    except ValueError:
+        return jsonify({'error': '잘못된 버전입니다.'}), 400
+
+    # deadline_date 필드가 없으면 빈 문자열로 설정
+    if 'deadline_date' not in updated_data:
+        updated_data['deadline_date'] = ''
+    updated_data['updated_at'] = datetime.now().isoformat()
+
+    try:
+        record = store.update(record_id, updated_data, expected_version)
+    except VersionConflict as e:
+        return jsonify({'error': '다른 사용자가 먼저 수정했습니다. 새로고침 후 다시 시도해주세요.',
+                        'record': e.record}), 409
+    if record is None:
+        return jsonify({'error': '기록을 찾을 수 없습니다.'}), 404
+
+    return jsonify({'success': True, 'record': record})
 
 @app.route('/api/records/<int:record_id>', methods=['DELETE'])
 def delete_record(record_id):
@@ -843,16 +712,14 @@ def delete_record(record_id):
     if session.get('user_type') != 'admin':
         return jsonify({'error': '권한이 없습니다.'}), 403
     
-    data = load_data()
-    data = [record for record in data if record['id'] != record_id]
-    save_data(data)
+    store.delete(record_id)
     
     return jsonify({'success': True})
 
 @app.route('/api/employees', methods=['GET'])
 def get_employees():
-    """직원 목록 조회 API"""
-    employees = load_employees()
+    """직원 목록 조회 API (total_points 는 기초 포인트, balance 는 원장 잔액)"""
+    employees = with_balances(load_employees())
     return jsonify(employees)
 
 @app.route('/api/employees', methods=['POST'])
@@ -862,19 +729,20 @@ def add_employee():
         return jsonify({'error': '권한이 없습니다.'}), 403
 
     employee_data = request.json
-    employees = load_employees()
-
     emp_id = employee_data['id']
-    if emp_id in employees:
-        return jsonify({'error': '이미 존재하는 ID입니다.'}), 400
-
-    employees[emp_id] = {
-        'name': employee_data['name'],
-        'department': employee_data['department'],
-        'total_points': employee_data.get('total_points', 0)
-    }
+    # 읽기-수정-저장 사이에 다른 워커가 끼어들지 않도록
+    with employee_store.transaction():
+        employees = load_employees()
+        if emp_id in employees:
+            return jsonify({'error': '이미 존재하는 ID입니다.'}), 400
+
+        employees[emp_id] = {
+            'name': employee_data['name'],
+            'department': employee_data['department'],
+            'total_points': employee_data.get('total_points', 0)
+        }
+        save_employees(employees)
 
-    save_employees(employees)
     return jsonify({'success': True})
 
 @app.route('/api/employees/<emp_id>', methods=['PUT'])
@@ -884,13 +752,23 @@ def update_employee(emp_id):
         return jsonify({'error': '권한이 없습니다.'}), 403
 
     update_data = request.json
-    employees = load_employees()
+    # total_points 는 엑셀 업로드와 같은 기초 포인트 (바뀐 만큼 원장에 반영),
+    # 잔액을 바꾸려면 /api/employees/<emp_id>/points 로 조정
+    update_data.pop('balance', None)
+    if 'total_points' in update_data:
+        try:
+            update_data['total_points'] = int(update_data['total_points'])
+        except (TypeError, ValueError):
+            return jsonify({'error': '포인트는 숫자여야 합니다.'}), 400
 
-    if emp_id not in employees:
-        return jsonify({'error': '직원을 찾을 수 없습니다.'}), 404
+    with employee_store.transaction():
+        employees = load_employees()
+        if emp_id not in employees:
+            return jsonify({'error': '직원을 찾을 수 없습니다.'}), 404
 
-    employees[emp_id].update(update_data)
-    save_employees(employees)
+        if update_data:
+            employees[emp_id].update(update_data)
+            save_employees(employees)
 
     return jsonify({'success': True})
 
@@ -900,13 +778,13 @@ def delete_employee(emp_id):
     if session.get('user_type') != 'admin':
         return jsonify({'error': '권한이 없습니다.'}), 403
 
-    employees = load_employees()
-
-    if emp_id not in employees:
-        return jsonify({'error': '직원을 찾을 수 없습니다.'}), 404
+    with employee_store.transaction():
+        employees = load_employees()
+        if emp_id not in employees:
+            return jsonify({'error': '직원을 찾을 수 없습니다.'}), 404
 
-    del employees[emp_id]
-    save_employees(employees)
+        del employees[emp_id]
+        save_employees(employees)
 
     return jsonify({'success': True})
 
@@ -929,45 +807,26 @@ def upload_employees():
         file.save(filepath)
 
         try:
-            # 엑셀 파일 읽기
-            if filename.endswith('.csv'):
-                df = pd.read_csv(filepath, encoding='utf-8-sig')
-            else:
-                df = pd.read_excel(filepath)
-
-            employees = load_employees()
-            added_count = 0
-            updated_count = 0
-
-            # 필수 컬럼 확인
-            required_cols = ['ID', '이름', '부서']
-            for col in required_cols:
-                if col not in df.columns:
-                    return jsonify({'error': f'필수 컬럼 {col}이(가) 없습니다.'}), 400
-
-            # 직원 데이터 처리
-            for _, row in df.iterrows():
-                emp_id = str(row['ID'])
-                if emp_id in employees:
-                    updated_count += 1
-                else:
-                    added_count += 1
+            # 직원 파일이 아직 없으면 초기 직원 데이터부터 만든다
+            if not employee_store.exists():
+                load_employees()
 
-                employees[emp_id] = {
-                    'name': row['이름'],
-                    'department': row['부서'],
-                    'total_points': int(row.get('포인트', 0))
-                }
-
-            save_employees(employees)
+            # 검증/변환 후 한 번에 반영 (CSV 는 pandas 없이 한 줄씩 읽음)
+            result = ingest_employees(filepath, employee_store)
+            ledger.sync_opening(employee_store.load())
             os.remove(filepath)  # 처리 후 파일 삭제
 
             return jsonify({
                 'success': True,
-                'added': added_count,
-                'updated': updated_count
+                'added': result['added'],
+                'updated': result['updated'],
+                'skipped': result['skipped']
             })
 
+        except ValueError as e:
+            if os.path.exists(filepath):
+                os.remove(filepath)
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             if os.path.exists(filepath):
                 os.remove(filepath)
@@ -981,91 +840,128 @@ def adjust_points(emp_id):
     if session.get('user_type') != 'admin':
         return jsonify({'error': '권한이 없습니다.'}), 403
 
-    adjustment = request.json.get('adjustment', 0)
+    try:
+        adjustment = int(request.json.get('adjustment', 0))
+    except (TypeError, ValueError):
+        return jsonify({'error': '조정 포인트는 숫자여야 합니다.'}), 400
     reason = request.json.get('reason', '')
 
-    employees = load_employees()
-
-    if emp_id not in employees:
+    if emp_id not in load_employees():
         return jsonify({'error': '직원을 찾을 수 없습니다.'}), 404
 
-    employees[emp_id]['total_points'] = employees[emp_id].get('total_points', 0) + adjustment
-    save_employees(employees)
-
-    # 포인트 조정 기록 추가 (옵션)
-    data = load_data()
-    adjustment_record = {
-        'id': get_next_id(data),
-        'request_date': datetime.now().strftime('%Y-%m-%d'),
-        'applicant': emp_id,
-        'transporter': 'SYSTEM',
-        'from_location': '관리자조정',
-        'to_location': '관리자조정',
-        'item': f'포인트 조정: {reason}',
-        'applicant_amount': adjustment if adjustment > 0 else 0,
-        'transporter_amount': 0,
-        'accumulate_date': datetime.now().strftime('%Y-%m-%d'),
-        'deadline_date': '',
-        'status': '완료',
-        'created_at': datetime.now().isoformat(),
-        'source': 'admin_adjustment'
-    }
-    data.append(adjustment_record)
-    save_data(data)
-
-    return jsonify({'success': True, 'new_points': employees[emp_id]['total_points']})
+    # 원장에 조정 이벤트 한 줄만 추가 (직원 파일/기록은 건드리지 않음)
+    new_points = ledger.adjust(emp_id, adjustment, reason)
+    return jsonify({'success': True, 'new_points': new_points})
+
+@app.route('/api/employees/<emp_id>/points', methods=['GET'])
+def get_point_history(emp_id):
+    """직원 포인트 잔액과 최근 원장 이벤트 API"""
+    if session.get('user_type') != 'admin':
+        return jsonify({'error': '권한이 없습니다.'}), 403
+
+    limit = min(request.args.get('limit', 100, type=int), 1000)
+    return jsonify({
+        'emp_id': emp_id,
+        'balance': ledger.balance(emp_id),
+        'events': ledger.history(emp_id, limit)
+    })
 
 @app.route('/api/download_template')
 def download_template():
     """엑셀 템플릿 다운로드"""
-    template_data = {
-        'ID': ['예시1', '예시2', '예시3'],
-        '이름': ['홍길동', '김철수', '이영희'],
-        '부서': ['평촌', '판교', '광주'],
-        '포인트': [0, 0, 0]
-    }
-
-    df = pd.DataFrame(template_data)
-    template_path = os.path.join(app.config['UPLOAD_FOLDER'], 'employee_template.xlsx')
-    df.to_excel(template_path, index=False)
+    # 스키마가 같으면 처음 만든 파일을 메모리에서 그대로 돌려준다
+    key, data = employee_template()
+    etag = f'"{key}"'
+    headers = {'ETag': etag, 'Cache-Control': 'private, max-age=3600'}
+    if request.headers.get('If-None-Match') == etag:
+        return '', 304, headers
 
     from flask import send_file
-    return send_file(template_path, as_attachment=True, download_name='직원등록_템플릿.xlsx')
+    response = send_file(io.BytesIO(data), as_attachment=True, download_name='직원등록_템플릿.xlsx',
+                         mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+    response.headers.update(headers)
+    return response
+
+@app.route('/api/cache_stats')
+def get_cache_stats():
+    """캐시 적중 통계 API"""
+    if session.get('user_type') != 'admin':
+        return jsonify({'error': '권한이 없습니다.'}), 403
+
+    return jsonify({
+        'worker': os.getpid(),
+        'records': store.stats(),
+        'employees': employee_store.stats(),
+        'ledger': ledger.stats()
+    })
+
+@app.route('/api/leaderboard/check')
+def check_leaderboard():
+    """증분 순위 집계를 전체 재계산과 비교하는 API"""
+    if session.get('user_type') != 'admin':
+        return jsonify({'error': '권한이 없습니다.'}), 403
+
+    mismatches = leaderboard.verify(load_data())
+    return jsonify({'ok': not mismatches, 'mismatches': mismatches})
+
+@app.route('/api/points/check')
+def check_points():
+    """포인트 원장을 다시 읽은 잔액 / 기록 / 직원 파일과 비교하는 API (fix=1 이면 보정 이벤트 추가)"""
+    if session.get('user_type') != 'admin':
+        return jsonify({'error': '권한이 없습니다.'}), 403
+
+    records, employees = load_data(), load_employees()
+    fixed = len(ledger.reconcile(records, employees)) if request.args.get('fix') == '1' else 0
+    mismatches = ledger.verify(records, employees)
+    return jsonify({'ok': not mismatches, 'mismatches': mismatches, 'fixed': fixed, 'stats': ledger.stats()})
+
+@app.route('/api/notification_stats')
+def get_notification_stats():
+    """잔디 알림 큐 상태 API"""
+    if session.get('user_type') != 'admin':
+        return jsonify({'error': '권한이 없습니다.'}), 403
+
+    return jsonify(notifications.metrics())
+
+@app.route('/api/stream')
+def stream_events():
+    """기록 변경 이벤트 SSE 스트림 (Last-Event-ID 로 이어 받기)"""
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id', '')
+    stream = events.stream(last_event_id)
+    if stream is None:
+        # 스트림이 워커 스레드를 다 차지하지 않도록 (화면은 변경 피드 폴링으로 전환)
+        response = jsonify({'error': '실시간 연결이 너무 많습니다.'})
+        response.status_code = 503
+        response.headers['Retry-After'] = '30'
+        return response
+    response = Response(stream_with_context(stream), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # 프록시 버퍼링 끄기
+    return response
+
+@app.route('/api/stream_stats')
+def get_stream_stats():
+    """SSE 구독자/이벤트 통계 API"""
+    if session.get('user_type') != 'admin':
+        return jsonify({'error': '권한이 없습니다.'}), 403
+
+    return jsonify(events.metrics())
 
 @app.route('/api/stats')
 def get_stats():
-    """통계 API"""
+    """통계 API (group_by=day|week|month|applicant|transporter|route 면 그룹별 합계도 함께)"""
     search = request.args.get('search', '').lower()
     date_from = request.args.get('date_from', '')
     date_to = request.args.get('date_to', '')
-    
-    data = load_data()
-    
-    # 필터링된 데이터
-    filtered_data = []
-    for record in data:
-        text_match = (not search or 
-                     search in record['applicant'].lower() or
-                     search in record['transporter'].lower())
-        
-        date_match = True
-        if date_from and record['accumulate_date'] < date_from:
-            date_match = False
-        if date_to and record['accumulate_date'] > date_to:
-            date_match = False
-            
-        if text_match and date_match:
-            filtered_data.append(record)
-    
-    total_applicant = sum(record['applicant_amount'] for record in filtered_data)
-    total_transporter = sum(record['transporter_amount'] for record in filtered_data)
-    total_records = len(filtered_data)
-    
-    return jsonify({
-        'total_applicant_amount': total_applicant,
-        'total_transporter_amount': total_transporter,
-        'total_records': total_records
-    })
+    group_by = request.args.get('group_by', '')
+    if group_by and group_by not in GROUP_BY:
+        return jsonify({'error': f"group_by 는 {', '.join(GROUP_BY)} 중 하나여야 합니다."}), 400
+
+    stats = store.totals(search, date_from, date_to)
+    if group_by:
+        stats['group_by'] = group_by
+        stats['groups'] = store.grouped_totals(group_by, search, date_from, date_to)
+    return jsonify(stats)
 
 def get_local_ip():
     """로컬 IP 주소 가져오기"""
@@ -1094,6 +990,7 @@ if __name__ == '__main__':
     print("- ID: admin2, 비밀번호: admin123")
     print("\n메인 페이지에서 바로 현황 조회 가능")
     print("관리자 페이지는 우측 상단 '관리자' 버튼으로 접속")
+    print("\n운영 서버 (워커 여러 개): python wsgi.py --workers 4")
     print("\n서버를 중지하려면 Ctrl+C를 누르세요.")
     print("=" * 50)
 
@@ -0,0 +1,123 @@
+"""엑셀/CSV 읽기/쓰기
+
+pandas/openpyxl 은 불러오는 데만 수백 ms, 수십 MB 가 들기 때문에 실제로 엑셀을 다룰 때
+처음 한 번만 불러온다. CSV 는 표준 csv 모듈만 사용한다.
+"""
+import csv
+import io
+import tempfile
+
+_pandas = None
+
+
+def load_pandas():
+    """pandas 모듈 (처음 호출할 때 불러옴)"""
+    global _pandas
+    if _pandas is None:
+        import pandas
+        _pandas = pandas
+    return _pandas
+
+
+def is_csv(path):
+    return path.lower().endswith('.csv')
+
+
+def iter_csv(path):
+    """CSV → (머리글, 행 이터레이터), 파일은 행을 다 읽으면 닫힌다"""
+    f = open(path, 'r', encoding='utf-8-sig', newline='')
+    reader = csv.reader(f)
+    header = next(reader, None)
+    if header is None:
+        f.close()
+        return [], iter(())
+
+    def rows():
+        with f:
+            yield from reader
+
+    return header, rows()
+
+
+# 엑셀이 수식으로 해석할 수 있는 첫 글자
+FORMULA_PREFIXES = ('=', '+', '-', '@')
+
+
+def safe_cell(value):
+    """CSV 용: 엑셀이 수식으로 해석하지 않도록 =, +, -, @ 로 시작하는 문자열 앞에 ' 추가"""
+    if isinstance(value, str) and value[:1] in FORMULA_PREFIXES:
+        return "'" + value
+    return value
+
+
+def xlsx_cell(sheet, value):
+    """xlsx 용: =, +, -, @ 로 시작하는 문자열은 ' 를 붙이지 않고 문자열 셀로 지정 (수식으로 저장되지 않음)"""
+    if isinstance(value, str) and value[:1] in FORMULA_PREFIXES:
+        from openpyxl.cell import WriteOnlyCell
+
+        cell = WriteOnlyCell(sheet, value=value)
+        cell.data_type = 's'
+        return cell
+    return value
+
+
+def iter_csv_bytes(columns, rows, rows_per_chunk=1000):
+    """컬럼/행 → CSV 바이트 조각 (엑셀에서 한글이 깨지지 않도록 BOM 포함)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    pending = 1
+    first = True
+    for row in rows:
+        writer.writerow([safe_cell(value) for value in row])
+        pending += 1
+        if pending >= rows_per_chunk:
+            yield buffer.getvalue().encode('utf-8-sig' if first else 'utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+            first = False
+    if pending or first:
+        yield buffer.getvalue().encode('utf-8-sig' if first else 'utf-8')
+
+
+def iter_xlsx_bytes(columns, rows, sheet_name='Sheet1', chunk_size=64 * 1024):
+    """컬럼/행 → xlsx 바이트 조각
+
+    쓰기 전용 워크북은 행을 임시 파일에 바로 기록하므로 행 수와 관계없이 메모리가 일정하다.
+    xlsx 는 zip 이라 다 쓴 뒤에야 보낼 수 있어서, 임시 파일에 저장한 다음 조금씩 읽어서 보낸다.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+    sheet.append(list(columns))
+    for row in rows:
+        sheet.append([xlsx_cell(sheet, value) for value in row])
+    with tempfile.TemporaryFile() as f:
+        workbook.save(f)
+        f.seek(0)
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def read_excel(path, dtype=None):
+    """엑셀 → DataFrame (pandas 사용)"""
+    return load_pandas().read_excel(path, dtype=dtype)
+
+
+def write_xlsx(columns, rows, sheet_name='Sheet1'):
+    """컬럼/행 → xlsx 바이트 (openpyxl 쓰기 전용 모드)"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+    sheet.append(list(columns))
+    for row in rows:
+        sheet.append(list(row))
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
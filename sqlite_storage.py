@@ -0,0 +1,550 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+
+from rollups import period_key, route_key, total_entry
+from search_index import normalize_text
+from storage import SORT_FIELDS, VersionConflict, parse_sort, record_version, write_json_atomic
+
+
+RECORD_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    status TEXT,
+    applicant TEXT,
+    transporter TEXT,
+    accumulate_date TEXT NOT NULL DEFAULT '',
+    message_id,
+    created_at TEXT,
+    updated_at TEXT,
+    applicant_amount INTEGER NOT NULL DEFAULT 0,
+    transporter_amount INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_records_status ON records(status, created_at);
+CREATE INDEX IF NOT EXISTS idx_records_applicant ON records(applicant);
+CREATE INDEX IF NOT EXISTS idx_records_transporter ON records(transporter);
+CREATE INDEX IF NOT EXISTS idx_records_accumulate_date ON records(accumulate_date);
+CREATE INDEX IF NOT EXISTS idx_records_message_id ON records(message_id);
+
+-- 삭제된 ID 를 재사용하지 않도록 다음 ID 를 따로 보관
+CREATE TABLE IF NOT EXISTS sequences (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO sequences (name, value)
+    SELECT 'records', COALESCE(MAX(id), 0) + 1 FROM records;
+
+CREATE TABLE IF NOT EXISTS employees (
+    emp_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+
+-- 다른 워커 프로세스의 리스너에 전달할 변경 로그 (old/new 는 기록 JSON, record_id 가 NULL 이면 전체 교체)
+CREATE TABLE IF NOT EXISTS record_changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    writer TEXT NOT NULL,
+    record_id INTEGER,
+    old TEXT,
+    new TEXT
+);
+"""
+
+# 변경 로그는 최근 CHANGE_LOG_SIZE 건만 남김 (그보다 뒤처진 워커는 리스너를 전체 다시 만듦)
+CHANGE_LOG_SIZE = 10000
+# 한 번에 이보다 많이 추가하면 기록마다 남기지 않고 전체 교체로 남김 (가져오기 등)
+CHANGE_LOG_BULK = 1000
+
+RECORD_COLUMNS = ('id', 'status', 'applicant', 'transporter', 'accumulate_date', 'message_id',
+                  'created_at', 'updated_at', 'applicant_amount', 'transporter_amount', 'data')
+
+# 검색 대상 (JSON 저장소 검색 색인과 같은 필드) 과 직원 표시 이름으로 찾기
+SEARCH_EXPRS = ('applicant', 'transporter', "json_extract(data, '$.item')", "json_extract(data, '$.recipient')")
+EMPLOYEE_NAME_SQL = "SELECT emp_id FROM employees WHERE instr(py_lower(json_extract(data, '$.name')), ?) > 0"
+
+# /api/stats?group_by= 그룹 키 (JSON 저장소 집계표와 같은 키)
+GROUP_EXPRS = {
+    'day': "py_period(accumulate_date, 'day')",
+    'week': "py_period(accumulate_date, 'week')",
+    'month': "py_period(accumulate_date, 'month')",
+    'applicant': "COALESCE(applicant, '')",
+    'transporter': "COALESCE(transporter, '')",
+    'route': "py_route(json_extract(data, '$.from_location'), json_extract(data, '$.to_location'))"
+}
+
+UPSERT_RECORD_SQL = (f"INSERT OR REPLACE INTO records ({', '.join(RECORD_COLUMNS)}) "
+                     f"VALUES ({', '.join('?' for _ in RECORD_COLUMNS)})")
+
+
+def _lower(value):
+    """JSON 저장소 검색 색인과 같은 정규화 (SQLite lower() 는 ASCII 만 처리)"""
+    return normalize_text(value)
+
+
+def _record_row(record):
+    return (
+        record['id'],
+        record.get('status'),
+        record.get('applicant'),
+        record.get('transporter'),
+        record.get('accumulate_date', ''),
+        record.get('message_id'),
+        record.get('created_at'),
+        record.get('updated_at'),
+        record.get('applicant_amount', 0),
+        record.get('transporter_amount', 0),
+        json.dumps(record, ensure_ascii=False)
+    )
+
+
+class SQLiteStorage:
+    """SQLite 파일 하나에 기록과 직원을 함께 저장"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self.connect() as conn:
+            conn.executescript(RECORD_SCHEMA)
+        self.records = SQLiteRecordStore(self)
+        self.employees = SQLiteEmployeeStore(self)
+
+    def connect(self):
+        """스레드별 연결 (sqlite3 연결은 스레드 간 공유하지 않는다)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.create_function('py_lower', 1, _lower, deterministic=True)
+            conn.create_function('py_period', 2, lambda day, period: period_key(day or '', period),
+                                 deterministic=True)
+            conn.create_function('py_route', 2, route_key, deterministic=True)
+            self._local.conn = conn
+        return conn
+
+
+class SQLiteRecordStore:
+    """RecordStore 와 같은 인터페이스의 SQLite 기록 저장소"""
+
+    def __init__(self, db):
+        self.db = db
+        self._listeners = []
+        # 이 저장소가 남긴 변경 로그 표시 (자기 변경은 커밋 직후 알리므로 refresh() 에서 건너뜀)
+        self.writer = f"{os.getpid()}-{os.urandom(4).hex()}"
+        self._refresh_lock = threading.Lock()
+        self._seen_seq = self._last_change()
+
+    # 변경 리스너 (다른 워커 프로세스의 변경은 refresh() 때 변경 로그에서 전달된다)
+    def subscribe(self, listener):
+        with self._refresh_lock:
+            # 먼저 등록된 리스너도 새 리스너와 같은 스냅샷 위치까지 맞춤
+            conn = self.db.connect()
+            snapshot = self._snapshot(conn)
+            self._catch_up(conn, snapshot)
+            self._listeners.append(listener)
+            listener.reset(snapshot[1])
+
+    def _notify(self, old, new):
+        # 트랜잭션 안에서 변경 로그에 남기고, 리스너에는 커밋된 뒤에 알린다
+        self._log_change((new or old)['id'], old, new)
+        self.db._local.pending.append((old, new))
+
+    def _log_change(self, record_id, old=None, new=None):
+        conn = self.db.connect()
+        seq = conn.execute(
+            'INSERT INTO record_changes (writer, record_id, old, new) VALUES (?, ?, ?, ?)',
+            (self.writer, record_id,
+             json.dumps(old, ensure_ascii=False) if old else None,
+             json.dumps(new, ensure_ascii=False) if new else None)
+        ).lastrowid
+        if seq % 1000 == 0:
+            conn.execute('DELETE FROM record_changes WHERE seq <= ?', (seq - CHANGE_LOG_SIZE,))
+
+    def _last_change(self):
+        return self.db.connect().execute('SELECT COALESCE(MAX(seq), 0) FROM record_changes').fetchone()[0]
+
+    @contextmanager
+    def transaction(self):
+        """쓰기 트랜잭션 (BEGIN IMMEDIATE, 중첩 호출은 바깥 트랜잭션에 합쳐짐)
+
+        안에서 조회 후 수정하면 그 사이 다른 연결/프로세스가 끼어들 수 없다.
+        """
+        local = self.db._local
+        conn = self.db.connect()
+        if getattr(local, 'pending', None) is not None:
+            yield self
+            return
+
+        conn.execute('BEGIN IMMEDIATE')
+        local.pending = []
+        try:
+            yield self
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            pending = local.pending
+            local.pending = None
+        for old, new in pending:
+            for listener in self._listeners:
+                listener.apply(old, new)
+
+    def _reset_listeners(self, snapshot=None):
+        """리스너를 전체 기록으로 다시 만들기 (_refresh_lock 을 잡고 호출, 변경 로그 위치도 스냅샷 위치로)"""
+        if not self._listeners:
+            return
+        last, records = snapshot or self._snapshot(self.db.connect())
+        self._seen_seq = max(self._seen_seq, last)
+        for listener in self._listeners:
+            listener.reset(records)
+
+    def refresh(self):
+        """다른 워커 프로세스의 변경을 리스너에 반영
+
+        PRAGMA data_version 은 다른 연결이 커밋했을 때만 바뀌므로, 바뀌지 않았으면 쿼리 한 번으로 끝난다.
+        """
+        if not self._listeners:
+            return
+        local = self.db._local
+        conn = self.db.connect()
+        version = conn.execute('PRAGMA data_version').fetchone()[0]
+        if getattr(local, 'data_version', None) == version:
+            return
+
+        with self._refresh_lock:
+            local.data_version = version
+            self._catch_up(conn)
+
+    def _snapshot(self, conn):
+        """(변경 로그 마지막 위치, 전체 기록) 을 같은 읽기 트랜잭션에서"""
+        conn.execute('BEGIN')
+        try:
+            return self._last_change(), self.all()
+        finally:
+            conn.commit()
+
+    def _catch_up(self, conn, snapshot=None):
+        """_seen_seq 이후 (snapshot 위치까지) 다른 저장소가 남긴 변경을 리스너에 적용 (_refresh_lock 을 잡고 호출)"""
+        sql = 'SELECT seq, writer, record_id, old, new FROM record_changes WHERE seq > ?'
+        params = (self._seen_seq,)
+        if snapshot:
+            sql += ' AND seq <= ?'
+            params += (snapshot[0],)
+        rows = conn.execute(sql + ' ORDER BY seq', params).fetchall()
+        if not rows:
+            if snapshot:
+                self._seen_seq = max(self._seen_seq, snapshot[0])
+            return
+        # 로그에서 밀려난 변경이 있거나 전체 교체가 있었으면 리스너를 다시 만듦
+        reset = rows[0][0] > self._seen_seq + 1
+        changes = []
+        for _, writer, record_id, old, new in rows:
+            if writer == self.writer:
+                continue
+            if record_id is None:
+                reset = True
+            elif not reset:
+                changes.append((json.loads(old) if old else None, json.loads(new) if new else None))
+        self._seen_seq = rows[-1][0]
+        if reset:
+            self._reset_listeners(snapshot)
+            return
+        for old, new in changes:
+            for listener in self._listeners:
+                listener.apply(old, new)
+
+    def _select(self, where='', params=(), suffix=''):
+        sql = 'SELECT data FROM records'
+        if where:
+            sql += f' WHERE {where}'
+        sql += suffix or ' ORDER BY id'
+        return [json.loads(row[0]) for row in self.db.connect().execute(sql, params)]
+
+    def _write(self, records, replace=False):
+        with self.transaction():
+            conn = self.db.connect()
+            if replace:
+                conn.execute('DELETE FROM records')
+                self._log_change(None)
+            conn.executemany(UPSERT_RECORD_SQL, [_record_row(r) for r in records])
+            if records:
+                conn.execute(
+                    "UPDATE sequences SET value = MAX(value, ?) WHERE name = 'records'",
+                    (max(r['id'] for r in records) + 1,)
+                )
+
+    # 조회
+    def all(self):
+        return self._select()
+
+    def get(self, record_id):
+        rows = self._select('id = ?', (record_id,))
+        return rows[0] if rows else None
+
+    def count(self):
+        return self.db.connect().execute('SELECT COUNT(*) FROM records').fetchone()[0]
+
+    @staticmethod
+    def _filter_sql(search='', date_from='', date_to=''):
+        clauses = []
+        params = []
+        if search:
+            search = normalize_text(search)
+            terms = [f'instr(py_lower({expr}), ?) > 0' for expr in SEARCH_EXPRS]
+            terms += [f'applicant IN ({EMPLOYEE_NAME_SQL})', f'transporter IN ({EMPLOYEE_NAME_SQL})']
+            clauses.append('(' + ' OR '.join(terms) + ')')
+            params += [search] * len(terms)
+        if date_from or date_to:
+            # 적립일이 없는 요청은 날짜 범위에 포함하지 않음 (JSON 저장소와 같게)
+            clauses.append("accumulate_date > ''")
+        if date_from:
+            clauses.append('accumulate_date >= ?')
+            params.append(date_from)
+        if date_to:
+            clauses.append('accumulate_date <= ?')
+            params.append(date_to)
+        return ' AND '.join(clauses), params
+
+    def query(self, search='', date_from='', date_to=''):
+        where, params = self._filter_sql(search, date_from, date_to)
+        return self._select(where, params)
+
+    @staticmethod
+    def _sort_expr(field):
+        default = "''" if isinstance(SORT_FIELDS[field], str) else '0'
+        if field in RECORD_COLUMNS:
+            return f'COALESCE({field}, {default})'
+        return f"COALESCE(json_extract(data, '$.{field}'), {default})"
+
+    def iter_query(self, search='', date_from='', date_to='', sort_keys=None, batch_size=1000):
+        """필터 + 정렬된 기록을 batch_size 행씩 읽어서 하나씩 (전체를 메모리에 올리지 않음)"""
+        where, params = self._filter_sql(search, date_from, date_to)
+        order = ', '.join(f"{self._sort_expr(field)} {'DESC' if desc else 'ASC'}"
+                          for field, desc in sort_keys or parse_sort(''))
+        sql = 'SELECT data FROM records' + (f' WHERE {where}' if where else '') + f' ORDER BY {order}'
+        cursor = self.db.connect().execute(sql, params)
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield json.loads(row[0])
+        finally:
+            cursor.close()
+
+    def page(self, search='', date_from='', date_to='', sort_keys=None, limit=None, offset=0, after=None):
+        sort_keys = sort_keys or parse_sort('')
+        where, params = self._filter_sql(search, date_from, date_to)
+        total_sql = 'SELECT COUNT(*) FROM records' + (f' WHERE {where}' if where else '')
+        total = self.db.connect().execute(total_sql, params).fetchone()[0]
+
+        exprs = [(self._sort_expr(field), desc) for field, desc in sort_keys]
+        clauses = [where] if where else []
+        params = list(params)
+        if after is not None:
+            # 키셋 페이지: (k1, k2, ...) 가 커서보다 뒤인 행
+            alternatives = []
+            for i, (expr, desc) in enumerate(exprs):
+                terms = [f'{e} = ?' for e, _ in exprs[:i]] + [f"{expr} {'<' if desc else '>'} ?"]
+                alternatives.append('(' + ' AND '.join(terms) + ')')
+                params += after[:i + 1]
+            clauses.append('(' + ' OR '.join(alternatives) + ')')
+            offset = 0
+
+        order = ', '.join(f"{expr} {'DESC' if desc else 'ASC'}" for expr, desc in exprs)
+        suffix = f' ORDER BY {order} LIMIT ? OFFSET ?'
+        params += [-1 if limit is None else limit, offset]
+        return self._select(' AND '.join(clauses), params, suffix), total
+
+    def totals(self, search='', date_from='', date_to=''):
+        where, params = self._filter_sql(search, date_from, date_to)
+        sql = 'SELECT COALESCE(SUM(applicant_amount), 0), COALESCE(SUM(transporter_amount), 0), COUNT(*) FROM records'
+        if where:
+            sql += f' WHERE {where}'
+        applicant, transporter, count = self.db.connect().execute(sql, params).fetchone()
+        return {
+            'total_applicant_amount': applicant,
+            'total_transporter_amount': transporter,
+            'total_records': count
+        }
+
+    def grouped_totals(self, group_by, search='', date_from='', date_to=''):
+        """group_by 기준 그룹별 금액 합계 (GROUP BY)"""
+        where, params = self._filter_sql(search, date_from, date_to)
+        sql = (f'SELECT {GROUP_EXPRS[group_by]}, COALESCE(SUM(applicant_amount), 0), '
+               f'COALESCE(SUM(transporter_amount), 0), COUNT(*) FROM records')
+        if where:
+            sql += f' WHERE {where}'
+        rows = self.db.connect().execute(sql + ' GROUP BY 1', params).fetchall()
+        return [total_entry(key, [applicant, transporter, count])
+                for key, applicant, transporter, count in sorted(rows)]
+
+    def latest_waiting(self, reply_to=None):
+        if reply_to:
+            rows = self._select("status = '대기중' AND message_id = ?", (reply_to,),
+                                ' ORDER BY created_at DESC, id LIMIT 1')
+        else:
+            rows = self._select("status = '대기중' AND COALESCE(transporter, '') = ''", (),
+                                ' ORDER BY created_at DESC, id LIMIT 1')
+        return rows[0] if rows else None
+
+    def latest_in_progress(self):
+        rows = self._select("status = '진행중'", (),
+                            ' ORDER BY COALESCE(updated_at, created_at) DESC, id LIMIT 1')
+        return rows[0] if rows else None
+
+    def next_id(self):
+        return self.db.connect().execute("SELECT value FROM sequences WHERE name = 'records'").fetchone()[0]
+
+    def allocate_id(self):
+        return self.allocate_ids(1)[0]
+
+    def allocate_ids(self, count):
+        with self.transaction():
+            conn = self.db.connect()
+            first = conn.execute("SELECT value FROM sequences WHERE name = 'records'").fetchone()[0]
+            conn.execute("UPDATE sequences SET value = value + ? WHERE name = 'records'", (count,))
+        return list(range(first, first + count))
+
+    def stats(self):
+        count = self.db.connect().execute('SELECT COUNT(*) FROM records').fetchone()[0]
+        return {'backend': 'sqlite', 'records': count, 'changes_seen': self._seen_seq}
+
+    # 변경
+    def insert(self, record):
+        return self.insert_many([record])[0]
+
+    def insert_many(self, records):
+        records = [dict(r) for r in records]
+        for record in records:
+            record.setdefault('version', 1)
+        with self.transaction():
+            if len(records) > CHANGE_LOG_BULK:
+                olds = [self.get(r['id']) for r in records] if self._listeners else [None] * len(records)
+                self._log_change(None)
+                self.db._local.pending.extend(zip(olds, records))
+            else:
+                olds = [self.get(r['id']) for r in records]
+                for old, record in zip(olds, records):
+                    self._notify(old, record)
+            self._write(records)
+        return records
+
+    def update(self, record_id, fields, expected_version=None):
+        with self.transaction():
+            row = self.db.connect().execute('SELECT data FROM records WHERE id = ?', (record_id,)).fetchone()
+            if row is None:
+                return None
+            old = json.loads(row[0])
+            if expected_version is not None and record_version(old) != expected_version:
+                raise VersionConflict(old)
+            record = dict(old)
+            record.update(fields)
+            record['id'] = record_id
+            record['version'] = record_version(old) + 1
+            self.db.connect().execute(UPSERT_RECORD_SQL, _record_row(record))
+            self._notify(old, record)
+        return record
+
+    def delete(self, record_id):
+        with self.transaction():
+            old = self.get(record_id)
+            deleted = self.db.connect().execute('DELETE FROM records WHERE id = ?', (record_id,)).rowcount > 0
+            if deleted and old:
+                self._notify(old, None)
+        return deleted
+
+    def replace_all(self, records):
+        self._write(records, replace=True)
+        with self._refresh_lock:
+            self._reset_listeners()
+
+    def import_json(self, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            self.replace_all(json.load(f))
+
+    def export_json(self, path):
+        write_json_atomic(path, self.all())
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class SQLiteEmployeeStore:
+    """JsonEmployeeStore 와 같은 인터페이스의 SQLite 직원 저장소"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def exists(self):
+        return self.db.connect().execute('SELECT 1 FROM employees LIMIT 1').fetchone() is not None
+
+    def load(self):
+        rows = self.db.connect().execute('SELECT emp_id, data FROM employees ORDER BY rowid')
+        return {emp_id: json.loads(data) for emp_id, data in rows}
+
+    def transaction(self):
+        """직원 읽기-수정-저장을 다른 스레드/프로세스와 겹치지 않게 (기록 저장소와 같은 쓰기 트랜잭션)"""
+        return self.db.records.transaction()
+
+    def save(self, employees):
+        with self.transaction():
+            conn = self.db.connect()
+            conn.execute('DELETE FROM employees')
+            conn.executemany(
+                'INSERT INTO employees (emp_id, data) VALUES (?, ?)',
+                [(emp_id, json.dumps(info, ensure_ascii=False)) for emp_id, info in employees.items()]
+            )
+
+    def upsert(self, employees):
+        """직원 여러 명을 한 트랜잭션으로 추가/덮어쓰기"""
+        with self.transaction():
+            self.db.connect().executemany(
+                'INSERT INTO employees (emp_id, data) VALUES (?, ?) '
+                'ON CONFLICT(emp_id) DO UPDATE SET data = excluded.data',
+                [(emp_id, json.dumps(info, ensure_ascii=False)) for emp_id, info in employees.items()]
+            )
+
+    def stats(self):
+        return {'backend': 'sqlite'}
+
+
+def migrate(data_file, employee_file, sqlite_path):
+    """point_data.json / employee_data.json 을 SQLite 로 한 번에 옮기기"""
+    from storage import RecordStore
+
+    # 저널에만 있는 최근 변경까지 포함해서 읽는다
+    json_store = RecordStore(data_file)
+    records = json_store.all()
+    json_store.close()
+
+    employees = {}
+    if os.path.exists(employee_file):
+        with open(employee_file, 'r', encoding='utf-8') as f:
+            employees = json.load(f)
+
+    db = SQLiteStorage(sqlite_path)
+    db.records.replace_all(records)
+    db.employees.save(employees)
+    return len(records), len(employees)
+
+
+if __name__ == '__main__':
+    # 사용법: python sqlite_storage.py [point_data.json] [employee_data.json] [point_data.db]
+    args = sys.argv[1:]
+    data_file = args[0] if len(args) > 0 else 'point_data.json'
+    employee_file = args[1] if len(args) > 1 else 'employee_data.json'
+    sqlite_path = args[2] if len(args) > 2 else 'point_data.db'
+
+    record_count, employee_count = migrate(data_file, employee_file, sqlite_path)
+    print(f"SQLite 마이그레이션 완료: {sqlite_path}")
+    print(f"- 기록: {record_count}건")
+    print(f"- 직원: {employee_count}명")
@@ -0,0 +1,95 @@
+import threading
+from bisect import bisect_left, insort
+
+
+def waiting_key(record):
+    """대기중 요청 정렬 키: 생성 시각이 같으면 ID 가 작은 쪽이 최근 (SQLite ORDER BY created_at DESC, id 와 같음)"""
+    return (record.get('created_at') or '', -record['id'])
+
+
+def progress_key(record):
+    """진행중 요청 정렬 키: 수정 시각 (없으면 생성 시각)"""
+    return (record.get('updated_at') or record.get('created_at') or '', -record['id'])
+
+
+class StatusIndex:
+    """대기중/진행중 요청 색인 (기록 저장소 변경을 받아 증분 갱신)
+
+    웹훅이 답장을 처리할 때 찾는 '가장 최근 대기중 요청' (전달자 없음 / 메시지 ID 별) 과
+    '가장 최근 진행중 요청' 을 정렬 목록 끝에서 바로 꺼내므로 전체 기록을 훑지 않는다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiting = []
+        self._by_message = {}
+        self._in_progress = []
+
+    def reset(self, records):
+        """전체 기록으로 다시 만들기"""
+        with self._lock:
+            self._waiting = []
+            self._by_message = {}
+            self._in_progress = []
+            for record in records:
+                self._add(record)
+            self._waiting.sort()
+            self._in_progress.sort()
+            for keys in self._by_message.values():
+                keys.sort()
+
+    def apply(self, old, new):
+        """기록 하나가 old → new 로 바뀜 (추가는 old=None, 삭제는 new=None)"""
+        with self._lock:
+            if old:
+                self._remove(old)
+            if new:
+                self._add(new, insort)
+
+    def _add(self, record, add=list.append):
+        status = record.get('status')
+        if status == '대기중':
+            key = waiting_key(record)
+            if not record.get('transporter'):
+                add(self._waiting, key)
+            if record.get('message_id'):
+                add(self._by_message.setdefault(record['message_id'], []), key)
+        elif status == '진행중':
+            add(self._in_progress, progress_key(record))
+
+    def _remove(self, record):
+        status = record.get('status')
+        if status == '대기중':
+            key = waiting_key(record)
+            if not record.get('transporter'):
+                discard(self._waiting, key)
+            keys = self._by_message.get(record.get('message_id'))
+            if keys is not None:
+                discard(keys, key)
+                if not keys:
+                    del self._by_message[record['message_id']]
+        elif status == '진행중':
+            discard(self._in_progress, progress_key(record))
+
+    def latest_waiting(self, reply_to=None):
+        """전달자를 기다리는 가장 최근 대기중 요청 ID (reply_to 가 있으면 해당 메시지, 없으면 None)"""
+        with self._lock:
+            keys = self._by_message.get(reply_to) if reply_to else self._waiting
+            return -keys[-1][1] if keys else None
+
+    def latest_in_progress(self):
+        """가장 최근에 진행중으로 바뀐 요청 ID (없으면 None)"""
+        with self._lock:
+            return -self._in_progress[-1][1] if self._in_progress else None
+
+    def stats(self):
+        with self._lock:
+            return {'waiting': len(self._waiting), 'messages': len(self._by_message),
+                    'in_progress': len(self._in_progress)}
+
+
+def discard(keys, key):
+    """정렬 목록에서 key 하나 제거 (없으면 그대로)"""
+    i = bisect_left(keys, key)
+    if i < len(keys) and keys[i] == key:
+        del keys[i]
@@ -0,0 +1,985 @@
+import atexit
+import base64
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from date_index import DateIndex, date_key
+from rollups import Rollups, group_records
+from search_index import SearchIndex
+from status_index import StatusIndex
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def write_json_atomic(path, data):
+    """임시 파일에 기록한 뒤 rename 으로 교체 (중간에 죽어도 기존 파일 유지)"""
+    # 여러 프로세스/스레드가 같은 파일을 써도 임시 파일이 겹치지 않게
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def file_signature(path):
+    """파일 변경 감지용 (inode, 크기, mtime), 파일이 없으면 None"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class FileLock:
+    """프로세스 간 배타 락 (fcntl.flock / msvcrt.locking)
+
+    같은 프로세스 안에서는 스레드끼리도 배타적이고, 같은 스레드는 다시 잡을 수 있다.
+    락 파일은 내용 없이 락 용도로만 쓴다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def acquire(self, blocking=True):
+        """락 잡기 (blocking=False 면 다른 쪽이 잡고 있을 때 기다리지 않고 False)"""
+        if not self._thread_lock.acquire(blocking):
+            return False
+        try:
+            if self._depth == 0:
+                if self._file is None:
+                    self._file = open(self.path, 'a+b')
+                if not self._lock_file(blocking):
+                    self._thread_lock.release()
+                    return False
+        except BaseException:
+            self._thread_lock.release()
+            raise
+        self._depth += 1
+        return True
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            self._unlock_file()
+        self._thread_lock.release()
+
+    def _lock_file(self, blocking=True):
+        if fcntl:
+            try:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            return True
+        # msvcrt.locking 은 약 10초 기다린 뒤 OSError 를 내므로 잡힐 때까지 반복
+        self._file.seek(0)
+        while True:
+            try:
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                if not blocking:
+                    return False
+
+    def _unlock_file(self):
+        if fcntl:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def close(self):
+        with self._thread_lock:
+            if self._file and self._depth == 0:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class VersionConflict(Exception):
+    """수정하려는 기록이 그 사이 바뀌었음 (record: 현재 기록)"""
+
+    def __init__(self, record):
+        super().__init__(f"{record['id']}번 기록이 다른 곳에서 수정되었습니다.")
+        self.record = record
+
+
+def record_version(record):
+    """기록 버전 (버전 도입 전 기록은 0)"""
+    return record.get('version', 0)
+
+
+class JsonFileCache:
+    """JSON 파일 파싱 결과 캐시
+
+    inode/크기/mtime 이 바뀌었을 때만 파일을 다시 읽는다.
+    load() 가 돌려주는 객체는 캐시 자체이므로 호출하는 쪽에서 복사해서 써야 한다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._data = None
+        self._signature = None
+
+    def load(self):
+        """파싱된 데이터 반환 (파일이 없으면 FileNotFoundError)"""
+        with self._lock:
+            signature = file_signature(self.path)
+            if signature is None:
+                raise FileNotFoundError(self.path)
+            if self._data is not None and signature == self._signature:
+                self.hits += 1
+                return self._data
+
+            self.misses += 1
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._data = json.load(f)
+            self._signature = signature
+            return self._data
+
+    def save(self, data):
+        """파일에 기록하고 캐시도 함께 갱신 (다시 읽지 않음)"""
+        with self._lock:
+            write_json_atomic(self.path, data)
+            self._data = data
+            self._signature = file_signature(self.path)
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+def date_matches(record, date_from='', date_to=''):
+    """/api/records, /api/stats 적립일 범위 조건 (범위가 있으면 적립일 없는 요청은 제외)"""
+    if not date_from and not date_to:
+        return True
+    accumulate_date = date_key(record)
+    if not accumulate_date:
+        return False
+    if date_from and accumulate_date < date_from:
+        return False
+    if date_to and accumulate_date > date_to:
+        return False
+    return True
+
+
+def summarize(records):
+    """필터링된 기록의 합계"""
+    return {
+        'total_applicant_amount': sum(r.get('applicant_amount', 0) for r in records),
+        'total_transporter_amount': sum(r.get('transporter_amount', 0) for r in records),
+        'total_records': len(records)
+    }
+
+
+# /api/records 정렬에 쓸 수 있는 필드와 값이 없을 때의 기본값
+SORT_FIELDS = {
+    'id': 0,
+    'request_date': '',
+    'accumulate_date': '',
+    'created_at': '',
+    'updated_at': '',
+    'applicant': '',
+    'transporter': '',
+    'status': '',
+    'applicant_amount': 0,
+    'transporter_amount': 0
+}
+
+
+def parse_sort(sort):
+    """'-request_date,applicant' → [('request_date', True), ('applicant', False), ('id', False)]
+
+    id 가 빠져 있으면 마지막 기준으로 붙여서 순서가 항상 유일하게 정해지도록 한다.
+    """
+    sort_keys = []
+    for part in (sort or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        desc = part.startswith('-')
+        field = part.lstrip('+-')
+        if field not in SORT_FIELDS:
+            raise ValueError(f'정렬할 수 없는 필드: {field}')
+        sort_keys.append((field, desc))
+    if 'id' not in [field for field, _ in sort_keys]:
+        sort_keys.append(('id', False))
+    return sort_keys
+
+
+def sort_value(record, field):
+    """정렬용 값 (없거나 타입이 다르면 필드 기본값 타입으로 맞춤)"""
+    default = SORT_FIELDS[field]
+    value = record.get(field)
+    if value is None:
+        return default
+    if isinstance(default, int) and not isinstance(value, int):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return default
+    if isinstance(default, str) and not isinstance(value, str):
+        return str(value)
+    return value
+
+
+def sort_records(records, sort_keys):
+    """여러 기준으로 정렬 (뒤쪽 기준부터 안정 정렬)"""
+    for field, desc in reversed(sort_keys):
+        records.sort(key=lambda r: sort_value(r, field), reverse=desc)
+    return records
+
+
+def encode_cursor(record, sort_keys):
+    """다음 페이지 커서 (마지막 기록의 정렬 키 값)"""
+    values = [sort_value(record, field) for field, _ in sort_keys]
+    return base64.urlsafe_b64encode(json.dumps(values, ensure_ascii=False).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor, sort_keys):
+    """커서 해석, 정렬 기준과 맞지 않으면 ValueError"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError('잘못된 커서') from e
+    if not isinstance(values, list) or len(values) != len(sort_keys):
+        raise ValueError('정렬 기준과 맞지 않는 커서')
+    return values
+
+
+def is_after(record, sort_keys, cursor_values):
+    """정렬 순서상 record 가 커서 위치보다 뒤인지"""
+    for (field, desc), cursor_value in zip(sort_keys, cursor_values):
+        value = sort_value(record, field)
+        if value != cursor_value:
+            return value < cursor_value if desc else value > cursor_value
+    return False
+
+
+def paginate(records, sort_keys, limit=None, offset=0, after=None):
+    """정렬 → 커서/offset → limit 적용, (페이지, 전체 건수) 반환"""
+    total = len(records)
+    records = sort_records(list(records), sort_keys)
+    if after is not None:
+        start = next((i for i, r in enumerate(records) if is_after(r, sort_keys, after)), total)
+    else:
+        start = offset
+    end = None if limit is None else start + limit
+    return records[start:end], total
+
+
+def project(record, fields):
+    """fields 에 지정된 필드만 남기기"""
+    if not fields:
+        return record
+    return {field: record[field] for field in fields if field in record}
+
+
+class JsonEmployeeStore:
+    """employee_data.json 기반 직원 저장소"""
+
+    def __init__(self, path):
+        self.path = path
+        self.cache = JsonFileCache(path)
+        self._file_lock = FileLock(f"{path}.lock")
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def load(self):
+        return self.cache.load()
+
+    @contextmanager
+    def transaction(self):
+        """직원 읽기-수정-저장을 다른 스레드/프로세스와 겹치지 않게 (중첩해서 써도 된다)"""
+        with self._file_lock:
+            yield self
+
+    def save(self, employees):
+        with self._file_lock:
+            self.cache.save(employees)
+
+    def upsert(self, employees):
+        """직원 여러 명을 한 번에 추가/덮어쓰기 (파일은 한 번만 기록)"""
+        with self._file_lock:
+            merged = {}
+            if self.exists():
+                merged = {emp_id: dict(info) for emp_id, info in self.cache.load().items()}
+            merged.update(employees)
+            self.cache.save(merged)
+
+    def load_if_exists(self):
+        """직원 dict (파일이 없으면 빈 dict, 바뀌지 않았으면 같은 객체)"""
+        try:
+            return self.cache.load()
+        except FileNotFoundError:
+            return {}
+
+    def stats(self):
+        return self.cache.stats()
+
+
+class RecordStore:
+    """스냅샷(JSON) + 추가 전용 저널 기반 기록 저장소
+
+    변경 사항은 저널(<DATA_FILE>.wal)에 한 줄씩 추가되고 fsync 는 묶어서 수행한다 (그룹 커밋).
+    durable=True 이면 변경 메서드/transaction() 은 자기 변경이 fsync 된 뒤에 반환한다.
+    fsync 는 백그라운드 커밋 스레드 하나가 맡고, 동시에 들어온 요청들은 fsync 한 번을 같이 기다린다.
+    커밋을 기다리는 요청이 여럿이면 commit_delay 초 또는 commit_batch 건까지 더 모아서 fsync 한다.
+    저널이 일정 크기를 넘으면 백그라운드에서 스냅샷(DATA_FILE)으로 압축한다.
+    시작 시에는 스냅샷을 읽고 저널 꼬리를 재적용해서 메모리 상태를 복원한다.
+    스냅샷은 기존 point_data.json 형식 그대로이므로 가져오기/내보내기에 그대로 쓸 수 있다.
+
+    조회할 때마다 스냅샷/저널 파일의 inode/크기/mtime 만 확인해서, 외부에서
+    파일이 바뀐 경우(init_data.py 등)에만 다시 읽는다. 저널이 뒤에 덧붙여지기만
+    했다면 늘어난 부분만 읽는다.
+
+    기록은 삽입 순서를 유지하는 id → 기록 dict 로 들고 있어서 ID 조회/수정/삭제가 O(1) 이다.
+    ID 는 단조 증가 시퀀스에서 발급하고, 시퀀스 값은 <DATA_FILE>.meta 에 함께 저장해서
+    가장 큰 ID 를 지운 뒤에도 같은 ID 가 다시 발급되지 않는다.
+
+    여러 프로세스(워커)가 같은 파일을 쓸 수 있도록, 모든 변경은 <DATA_FILE>.lock 파일 락을
+    잡고 다른 프로세스가 덧붙인 저널을 먼저 반영한 뒤에 기록한다 (transaction()).
+    ID 발급도 저널에 남기므로 프로세스가 달라도 같은 ID 가 두 번 발급되지 않는다.
+    기록마다 version 이 있어서 update(expected_version=...) 로 오래된 수정을 거절할 수 있다.
+
+    subscribe() 로 등록한 리스너는 기록이 바뀔 때마다 apply(old, new) 를,
+    전체를 다시 읽었을 때는 reset(records) 를 받는다 (집계/색인 유지용).
+    검색은 같은 방식으로 유지되는 SearchIndex 를 쓰고, name_source 가 있으면
+    (직원 dict 를 돌려주는 함수) 직원 표시 이름으로도 찾는다.
+    적립일 범위 조회는 DateIndex (적립일 정렬 목록 + bisect) 를, 검색어 없는 합계는
+    Rollups (적립일 기준 일/주/월 집계표) 를 쓴다.
+
+    반환되는 레코드는 공유 객체이므로 읽기 전용으로 취급해야 한다.
+    """
+
+    def __init__(self, path, durable=True, commit_delay=0.002, commit_batch=64, compact_threshold=500):
+        self.path = path
+        self.journal_path = f"{path}.wal"
+        self.rotated_path = f"{path}.wal.old"
+        self.meta_path = f"{path}.meta"
+        self.durable = durable
+        self.commit_delay = commit_delay
+        self.commit_batch = commit_batch
+        self.compact_threshold = compact_threshold
+
+        # 캐시 적중/재로드 횟수
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.RLock()
+        # 저널 쓰기 (프로세스 간) / 스냅샷 압축 (프로세스 간, 저널 쓰기는 막지 않음)
+        self._file_lock = FileLock(f"{path}.lock")
+        self._compact_lock = FileLock(f"{path}.compact.lock")
+        self._records = {}
+        self._next_id = 1
+        # 검색/적립일/상태 색인, 집계표는 맨 앞 리스너 (다른 리스너보다 먼저 갱신)
+        self.search_index = SearchIndex()
+        self.date_index = DateIndex()
+        self.status_index = StatusIndex()
+        self.rollups = Rollups()
+        self.name_source = None
+        self._listeners = [self.search_index, self.date_index, self.status_index, self.rollups]
+        self._notify = True
+        self._journal = None
+        self._journal_ino = None
+        self._journal_offset = 0
+        self._journal_entries = 0
+        self._snapshot_sig = None
+        # 그룹 커밋: 저널에 쓴 항목 번호 / fsync 까지 끝난 항목 번호
+        self._commit_cond = threading.Condition(threading.Lock())
+        self._written_seq = 0
+        self._durable_seq = 0
+        self._commit_waiters = 0
+        self._commits = 0
+        self._tx = threading.local()
+        self._compacting = False
+        self._compactor = None
+        self._closed = False
+
+        # 깨진 꼬리 정리/중단된 압축 마무리는 다른 프로세스가 쓰는 중이 아닐 때만
+        with self._file_lock:
+            self._load(repair=True)
+
+        self._syncer = threading.Thread(target=self._sync_loop, daemon=True)
+        self._syncer.start()
+        atexit.register(self.close)
+
+    # ------------------------------------------------------------------
+    # 로드 / 복원
+    # ------------------------------------------------------------------
+    def load(self):
+        """스냅샷 + 저널 꼬리로 메모리 상태 다시 읽기"""
+        with self._lock:
+            self._load(repair=False)
+
+    def _load(self, repair):
+        if self._journal:
+            # 다른 프로세스가 저널을 바꿨더라도 이 프로세스가 쓴 내용은 fsync 해 두고 닫는다
+            self._sync()
+            self._journal.close()
+            self._journal = None
+
+        # 전체를 다시 읽는 동안은 개별 변경 대신 마지막에 reset 으로 알린다
+        self._notify = False
+        try:
+            self._load_files(repair)
+        finally:
+            self._notify = True
+        self._reset_listeners()
+
+    def _load_files(self, repair):
+        # 스냅샷/밀려난 저널/저널을 한 덩어리로 읽는다: 그 사이 다른 쪽 압축이 스냅샷을 쓰고
+        # .wal.old 를 지우면 밀려난 저널 항목이 통째로 빠진다
+        with self._compact_lock:
+            self._snapshot_sig = file_signature(self.path)
+            self._records = {}
+            self._next_id = self._read_meta().get('next_id', 1)
+            for record in self._read_snapshot():
+                self._apply_put(record)
+            self._journal_entries = self._replay(self.rotated_path, repair=repair)[0]
+
+            self._journal = open(self.journal_path, 'ab')
+            self._journal_ino = os.fstat(self._journal.fileno()).st_ino
+            count, self._journal_offset = self._replay(self.journal_path, repair=repair)
+            self._journal_entries += count
+
+            # 이전 압축이 중간에 끊긴 경우 지금 정리
+            if repair and os.path.exists(self.rotated_path):
+                self._compact_locked()
+
+    def _read_meta(self):
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_meta(self, next_id):
+        write_json_atomic(self.meta_path, {'next_id': next_id})
+
+    def _read_snapshot(self):
+        if not os.path.exists(self.path):
+            return []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def _replay(self, path, offset=0, repair=False):
+        """저널 파일을 offset 부터 재적용, (적용한 항목 수, 다음 offset) 반환"""
+        if not os.path.exists(path):
+            return 0, 0
+
+        count = 0
+        try:
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break  # 기록 도중 끊긴 마지막 줄
+                    try:
+                        entry = json.loads(line.decode('utf-8'))
+                    except ValueError:
+                        break
+                    self._apply(entry)
+                    offset += len(line)
+                    count += 1
+
+            # 시작 시 깨진 꼬리는 잘라내야 다음 기록이 같은 줄에 붙지 않는다
+            if repair and offset != os.path.getsize(path):
+                with open(path, 'r+b') as f:
+                    f.truncate(offset)
+        except FileNotFoundError:
+            # 압축 락 밖에서 꼬리만 읽는 중에 저널이 밀려남 (inode 가 바뀌었으므로 다음 조회 때 전체를 다시 읽음)
+            pass
+        return count, offset
+
+    def _revalidate(self):
+        """파일이 외부에서 바뀌었는지 stat 으로만 확인하고 필요할 때만 다시 읽기"""
+        if self._snapshot_sig != file_signature(self.path):
+            self.misses += 1
+            self._load(repair=False)
+            return
+
+        try:
+            st = os.stat(self.journal_path)
+        except OSError:
+            st = None
+        if st is None or st.st_ino != self._journal_ino or st.st_size < self._journal_offset:
+            self.misses += 1
+            self._load(repair=False)
+        elif st.st_size > self._journal_offset:
+            # 다른 프로세스가 덧붙인 꼬리만 읽기 (압축 락: 그 사이 저널이 밀려나거나 비워지지 않게)
+            self.misses += 1
+            with self._compact_lock:
+                signature = file_signature(self.journal_path)
+                if signature is None or signature[0] != self._journal_ino:
+                    self._load(repair=False)
+                    return
+                count, self._journal_offset = self._replay(self.journal_path, self._journal_offset)
+            self._journal_entries += count
+        else:
+            self.hits += 1
+
+    def _apply(self, entry):
+        op = entry.get('op')
+        if op == 'put':
+            self._apply_put(entry['record'])
+        elif op == 'delete':
+            self._apply_delete(entry['id'])
+        elif op == 'seq':
+            self._next_id = max(self._next_id, entry['next_id'])
+
+    def _apply_put(self, record):
+        # 기존 키에 다시 넣으면 dict 안의 위치(삽입 순서)는 그대로 유지된다
+        old = self._records.get(record['id'])
+        self._records[record['id']] = record
+        if record['id'] >= self._next_id:
+            self._next_id = record['id'] + 1
+        self._notify_listeners(old, record)
+
+    def _apply_delete(self, record_id):
+        old = self._records.pop(record_id, None)
+        if old is None:
+            return False
+        self._notify_listeners(old, None)
+        return True
+
+    # ------------------------------------------------------------------
+    # 변경 리스너
+    # ------------------------------------------------------------------
+    def subscribe(self, listener):
+        """변경 리스너 등록 (등록 즉시 현재 전체 기록으로 reset)"""
+        with self._lock:
+            self._revalidate()
+            self._listeners.append(listener)
+            listener.reset(list(self._records.values()))
+
+    def _notify_listeners(self, old, new):
+        if self._notify:
+            for listener in self._listeners:
+                listener.apply(old, new)
+
+    def _reset_listeners(self):
+        records = list(self._records.values())
+        for listener in self._listeners:
+            listener.reset(records)
+
+    def refresh(self):
+        """외부 변경 확인 (리스너 상태를 최신으로 맞출 때 호출)"""
+        with self._lock:
+            self._revalidate()
+
+    @contextmanager
+    def transaction(self):
+        """변경 트랜잭션 (다른 스레드/프로세스의 변경을 막고 최신 상태에서 시작)
+
+        안에서 조회 후 수정하면 그 사이 다른 곳에서 끼어들 수 없다. 중첩해서 써도 된다.
+        """
+        depth = getattr(self._tx, 'depth', 0)
+        if depth == 0:
+            self._tx.wait_seq = 0
+        self._tx.depth = depth + 1
+        try:
+            with self._lock, self._file_lock:
+                self._revalidate()
+                self._repair_tail()
+                yield self
+        finally:
+            self._tx.depth = depth
+
+        # 락을 놓은 뒤 가장 바깥 트랜잭션에서만 fsync 를 기다린다
+        if depth == 0 and self._tx.wait_seq and self.durable:
+            self._wait_durable(self._tx.wait_seq)
+
+    def _repair_tail(self):
+        """락을 잡은 상태에서 저널 끝에 남은 쓰다 만 줄 (다른 프로세스가 죽은 흔적) 잘라내기"""
+        size = os.fstat(self._journal.fileno()).st_size
+        if size > self._journal_offset:
+            print(f"저널 끝의 불완전한 기록 {size - self._journal_offset}바이트 정리")
+            self._journal.truncate(self._journal_offset)
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    def all(self):
+        """전체 기록 (얕은 복사본 리스트)"""
+        with self._lock:
+            self._revalidate()
+            return list(self._records.values())
+
+    def get(self, record_id):
+        """ID로 기록 조회"""
+        with self._lock:
+            self._revalidate()
+            return self._records.get(record_id)
+
+    def count(self):
+        """전체 기록 수"""
+        with self._lock:
+            self._revalidate()
+            return len(self._records)
+
+    def query(self, search='', date_from='', date_to=''):
+        """검색어(요청자/전달자/물품/수령자/직원 이름)/적립일 범위로 필터링
+
+        적립일 범위가 있으면 적립일이 없는 요청 (대기중/진행중) 은 나오지 않는다.
+        """
+        employees = self.name_source() if search and self.name_source else None
+        with self._lock:
+            self._revalidate()
+            if search:
+                # 검색 결과가 보통 더 적으므로 검색 결과에 날짜 조건만 확인
+                records = [self._records[record_id]
+                           for record_id in self.search_index.search(search, employees)]
+                if date_from or date_to:
+                    records = [r for r in records if date_matches(r, date_from, date_to)]
+                return records
+            if date_from or date_to:
+                return [self._records[record_id] for record_id in self.date_index.between(date_from, date_to)]
+            return list(self._records.values())
+
+    def iter_query(self, search='', date_from='', date_to='', sort_keys=None):
+        """필터 + 정렬된 기록을 하나씩 (내보내기용)"""
+        yield from sort_records(self.query(search, date_from, date_to), sort_keys or parse_sort(''))
+
+    def page(self, search='', date_from='', date_to='', sort_keys=None, limit=None, offset=0, after=None):
+        """필터 + 정렬 + 페이지, (기록 목록, 필터된 전체 건수) 반환"""
+        return paginate(self.query(search, date_from, date_to), sort_keys or parse_sort(''),
+                        limit, offset, after)
+
+    def totals(self, search='', date_from='', date_to=''):
+        """필터링된 기록의 금액 합계 (검색어가 없으면 집계표에서)"""
+        if search:
+            return summarize(self.query(search, date_from, date_to))
+        with self._lock:
+            self._revalidate()
+            return self.rollups.totals(date_from, date_to)
+
+    def grouped_totals(self, group_by, search='', date_from='', date_to=''):
+        """group_by (rollups.GROUP_BY) 기준 그룹별 금액 합계 (검색어가 없으면 집계표에서)"""
+        if search:
+            return group_records(self.query(search, date_from, date_to), group_by)
+        with self._lock:
+            self._revalidate()
+            return self.rollups.grouped(group_by, date_from, date_to)
+
+    def latest_waiting(self, reply_to=None):
+        """전달자를 기다리는 가장 최근 대기중 요청 (reply_to 가 있으면 해당 메시지)"""
+        with self._lock:
+            self._revalidate()
+            record_id = self.status_index.latest_waiting(reply_to)
+            return self._records[record_id] if record_id is not None else None
+
+    def latest_in_progress(self):
+        """가장 최근에 진행중으로 바뀐 요청"""
+        with self._lock:
+            self._revalidate()
+            record_id = self.status_index.latest_in_progress()
+            return self._records[record_id] if record_id is not None else None
+
+    def next_id(self):
+        """다음에 발급될 기록 ID (발급하지는 않음)"""
+        with self._lock:
+            self._revalidate()
+            return self._next_id
+
+    def allocate_id(self):
+        """새 기록 ID 발급 (삭제된 ID 도 재사용하지 않음)"""
+        return self.allocate_ids(1)[0]
+
+    def allocate_ids(self, count):
+        """연속된 ID count 개를 한 번에 발급 (저널에 남겨서 다른 프로세스와 겹치지 않음)"""
+        with self.transaction():
+            first = self._next_id
+            self._next_id += count
+            # 발급만으로는 기다리지 않음 (이 ID 를 쓰는 기록이 저장될 때 함께 fsync 됨)
+            self._append({'op': 'seq', 'next_id': self._next_id}, wait=False)
+            return list(range(first, first + count))
+
+    def stats(self):
+        """캐시 적중 / 그룹 커밋 / 검색·적립일·상태 색인 / 집계표 통계"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'records': len(self._records),
+                'journal_entries': self._journal_entries,
+                'journal_writes': self._written_seq,
+                'fsyncs': self._commits,
+                'search_index': self.search_index.stats(),
+                'date_index': self.date_index.stats(),
+                'status_index': self.status_index.stats(),
+                'rollups': self.rollups.stats()
+            }
+
+    # ------------------------------------------------------------------
+    # 변경
+    # ------------------------------------------------------------------
+    def insert(self, record):
+        """새 기록 추가"""
+        record = dict(record)
+        record.setdefault('version', 1)
+        with self.transaction():
+            self._apply_put(record)
+            self._append({'op': 'put', 'record': record})
+        return record
+
+    def insert_many(self, records):
+        """여러 기록을 한 번에 추가"""
+        records = [dict(r) for r in records]
+        for record in records:
+            record.setdefault('version', 1)
+        with self.transaction():
+            for record in records:
+                self._apply_put(record)
+                self._append({'op': 'put', 'record': record})
+        return records
+
+    def update(self, record_id, fields, expected_version=None):
+        """기록 일부 필드 수정, 수정된 기록 반환 (없으면 None)
+
+        expected_version 이 현재 버전과 다르면 VersionConflict.
+        """
+        with self.transaction():
+            current = self._records.get(record_id)
+            if current is None:
+                return None
+            if expected_version is not None and record_version(current) != expected_version:
+                raise VersionConflict(current)
+            record = dict(current)
+            record.update(fields)
+            record['id'] = record_id
+            record['version'] = record_version(current) + 1
+            self._apply_put(record)
+            self._append({'op': 'put', 'record': record})
+            return record
+
+    def delete(self, record_id):
+        """기록 삭제, 삭제 여부 반환"""
+        with self.transaction():
+            if not self._apply_delete(record_id):
+                return False
+            self._append({'op': 'delete', 'id': record_id})
+            return True
+
+    def replace_all(self, records):
+        """전체 기록 교체 (JSON 가져오기 / 기존 save_data 호환)"""
+        records = [dict(r) for r in records]
+        with self.transaction():
+            self._records = {}
+            self._notify = False
+            try:
+                for record in records:
+                    self._apply_put(record)
+            finally:
+                self._notify = True
+            self._compact_locked()
+            self._reset_listeners()
+
+    # ------------------------------------------------------------------
+    # 가져오기 / 내보내기
+    # ------------------------------------------------------------------
+    def import_json(self, path):
+        """point_data.json 형식 파일을 읽어서 전체 교체"""
+        with open(path, 'r', encoding='utf-8') as f:
+            self.replace_all(json.load(f))
+
+    def export_json(self, path):
+        """현재 상태를 point_data.json 형식으로 내보내기"""
+        write_json_atomic(path, self.all())
+
+    # ------------------------------------------------------------------
+    # 저널 / fsync
+    # ------------------------------------------------------------------
+    def _append(self, entry, wait=True):
+        """락을 잡은 상태에서 저널에 한 줄 추가 (fsync 는 커밋 스레드가 묶어서)"""
+        line = (json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8')
+        self._journal.write(line)
+        self._journal.flush()
+        self._journal_offset += len(line)
+        self._journal_entries += 1
+        with self._commit_cond:
+            self._written_seq += 1
+            if wait:
+                self._tx.wait_seq = self._written_seq
+            self._commit_cond.notify_all()
+        if self._journal_entries >= self.compact_threshold:
+            self.compact(background=True)
+
+    def _sync(self):
+        """락을 잡은 상태에서 바로 fsync (압축/닫기 전)"""
+        if self._journal and self._durable_seq < self._written_seq:
+            target = self._written_seq
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._mark_durable(target)
+
+    def _mark_durable(self, seq):
+        with self._commit_cond:
+            if seq > self._durable_seq:
+                self._durable_seq = seq
+                self._commits += 1
+                self._commit_cond.notify_all()
+
+    def _wait_durable(self, seq):
+        with self._commit_cond:
+            self._commit_waiters += 1
+            try:
+                while self._durable_seq < seq and not self._closed:
+                    self._commit_cond.wait()
+            finally:
+                self._commit_waiters -= 1
+
+    def _sync_loop(self):
+        """커밋 스레드: 쓰인 저널이 있으면 모아서 fsync 하고 기다리는 요청들을 깨움"""
+        while True:
+            with self._commit_cond:
+                while not self._closed and self._durable_seq >= self._written_seq:
+                    self._commit_cond.wait()
+                if self._closed:
+                    return
+                # 다른 요청도 커밋을 기다리는 중이면 조금 더 모아서 한 번에
+                if self._commit_waiters > 1 and self._written_seq - self._durable_seq < self.commit_batch:
+                    self._commit_cond.wait(self.commit_delay)
+
+            # 저널 쓰기는 막지 않도록 파일을 복제해서 락 밖에서 fsync
+            with self._lock:
+                if self._closed or self._journal is None:
+                    continue
+                target = self._written_seq
+                fd = os.dup(self._journal.fileno())
+            try:
+                os.fsync(fd)
+            except OSError as e:
+                print(f"저널 fsync 오류: {str(e)}")
+                time.sleep(self.commit_delay)
+                continue
+            finally:
+                os.close(fd)
+            self._mark_durable(target)
+
+    def flush(self):
+        """밀린 저널을 즉시 fsync"""
+        with self._lock:
+            self._sync()
+
+    # ------------------------------------------------------------------
+    # 압축
+    # ------------------------------------------------------------------
+    def _open_new_journal(self):
+        self._journal = open(self.journal_path, 'ab')
+        self._journal_ino = os.fstat(self._journal.fileno()).st_ino
+        self._journal_offset = 0
+        self._journal_entries = 0
+
+    def compact(self, background=True):
+        """저널을 스냅샷으로 압축"""
+        with self.transaction():
+            if self._compacting:
+                return
+            if os.path.exists(self.rotated_path):
+                # 이전 압축이 실패한 경우: 동기로 전부 정리
+                self._compact_locked()
+                return
+
+            self._compacting = True
+            self._sync()
+            self._journal.close()
+            # 다시 읽는 쪽 (_load_files) 이 스냅샷과 저널 사이에서 밀려난 저널을 놓치지 않게
+            with self._compact_lock:
+                os.replace(self.journal_path, self.rotated_path)
+                self._open_new_journal()
+            snapshot = list(self._records.values())
+            next_id = self._next_id
+
+        if background:
+            self._compactor = threading.Thread(target=self._write_snapshot, args=(snapshot, next_id), daemon=True)
+            self._compactor.start()
+        else:
+            self._write_snapshot(snapshot, next_id)
+
+    def _write_snapshot(self, snapshot, next_id):
+        signature = None
+        try:
+            with self._compact_lock:
+                # 그 사이 (다른 프로세스의) 동기 압축이 더 최신 스냅샷을 썼다면 건너뛴다
+                if not os.path.exists(self.rotated_path):
+                    return
+                self._write_meta(next_id)
+                write_json_atomic(self.path, snapshot)
+                signature = file_signature(self.path)
+                os.remove(self.rotated_path)
+        except OSError as e:
+            print(f"스냅샷 압축 중 오류: {str(e)}")
+        finally:
+            # 락 순서 (_lock → _compact_lock) 를 지키려고 압축 락을 놓은 뒤 반영한다.
+            # 그 사이 다른 쪽이 스냅샷을 또 썼다면 서명이 달라서 다음 조회 때 다시 읽힌다
+            with self._lock:
+                if signature is not None:
+                    self._snapshot_sig = signature
+                self._compacting = False
+
+    def _compact_locked(self):
+        """락을 잡은 상태에서 동기 압축 (저널 비우기)"""
+        with self._compact_lock:
+            self._sync()
+            self._write_meta(self._next_id)
+            write_json_atomic(self.path, list(self._records.values()))
+            self._snapshot_sig = file_signature(self.path)
+            self._journal.close()
+            open(self.journal_path, 'wb').close()
+            if os.path.exists(self.rotated_path):
+                os.remove(self.rotated_path)
+            self._open_new_journal()
+
+    def close(self):
+        """저널 fsync 후 닫기"""
+        with self._lock:
+            if self._closed:
+                return
+            if self._journal:
+                self._sync()
+                self._journal.close()
+                self._journal = None
+            self._closed = True
+            compactor = self._compactor
+        with self._commit_cond:
+            self._commit_cond.notify_all()
+
+        # 진행 중인 백그라운드 압축이 끝나야 파일 상태가 정리된다
+        if compactor:
+            compactor.join()
+        self._file_lock.close()
+        self._compact_lock.close()
+
+
+def open_storage(backend, data_file, employee_file, sqlite_path):
+    """설정된 백엔드의 (기록 저장소, 직원 저장소) 생성"""
+    if backend == 'sqlite':
+        from sqlite_storage import SQLiteStorage
+        db = SQLiteStorage(sqlite_path)
+        return db.records, db.employees
+    records, employees = RecordStore(data_file), JsonEmployeeStore(employee_file)
+    records.name_source = employees.load_if_exists
+    return records, employees
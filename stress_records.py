@@ -0,0 +1,258 @@
+"""여러 프로세스/스레드에서 동시에 웹훅을 보내서 기록이 사라지거나 중복되지 않는지 확인
+
+사용법: python stress_records.py [--backend json|sqlite] [--processes 4] [--threads 8] [--requests 10]
+
+임시 폴더에 빈 저장소를 만들고, 프로세스마다 server 를 따로 불러와서 (워커 여러 개와 같은 상황)
+1. 운송 요청 웹훅을 동시에 보내고: 요청 수만큼 기록이 생겼는지, ID 가 겹치지 않는지
+2. 같은 요청에 여러 사람이 동시에 '/싣고받고 접수 번호' 를 보내고: 요청마다 한 명만 배정되는지
+3. 모든 요청에 여러 사람이 동시에 '/싣고받고 완료 번호' 를 보내고: 요청마다 한 번만 완료되는지
+4. 같은 버전으로 동시에 수정(PUT)하고: 한 번만 성공하고 나머지는 409 인지
+5. 직원 목록을 내보낸 그대로 다시 업로드해도 (total_points = 기초 포인트) 잔액이 그대로인지
+6. 포인트 원장에 완료 적립이 기록마다 정확히 한 번씩 남았는지
+확인한다. 잔디 알림은 보내지 않는다. 실패하면 종료 코드 1.
+"""
+import argparse
+import csv
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+_server = None
+
+
+def init_worker(workdir, backend, quiet=True):
+    """워커 프로세스: 임시 폴더에서 server 불러오기 (웹훅 디버그 출력은 숨김)"""
+    global _server
+    if quiet:
+        sys.stdout = open(os.devnull, 'w')
+    os.chdir(workdir)
+    os.environ['POINT_STORAGE'] = backend
+    os.environ['POINT_SQLITE_FILE'] = os.path.join(workdir, 'point_data.db')
+    sys.path.insert(0, ROOT)
+    import server
+    server.send_jandi_notification = lambda *args, **kwargs: True
+    _server = server
+
+
+def admin_client():
+    client = _server.app.test_client()
+    with client.session_transaction() as session:
+        session['user_type'] = 'admin'
+    return client
+
+
+def create_requests(worker, threads, count):
+    """운송 요청 웹훅 threads x count 건 → [(표식, 기록 ID)]"""
+    def send(thread):
+        client = _server.app.test_client()
+        created = []
+        for i in range(count):
+            marker = f"stress-{worker}-{thread}-{i}"
+            response = client.post('/webhook', json={'data': f'평촌 판교 {marker} Anna', 'writerName': f'W{worker}'})
+            body = response.get_json()
+            if body.get('success'):
+                created.append((marker, body['record']['id']))
+        return created
+
+    with ThreadPoolExecutor(threads) as pool:
+        return [item for result in pool.map(send, range(threads)) for item in result]
+
+
+def accept_requests(worker, threads, record_ids):
+    """모든 요청에 '/싣고받고 접수 번호' → 배정에 성공한 [(기록 ID, 전달자)]"""
+    def send(thread):
+        client = _server.app.test_client()
+        sender = f"T{worker}-{thread}"
+        accepted = []
+        for record_id in record_ids[thread::threads]:
+            response = client.post('/webhook', json={'text': f'/싣고받고 접수 {record_id}', 'writerName': sender})
+            if response.get_json().get('success'):
+                accepted.append((record_id, sender))
+        return accepted
+
+    with ThreadPoolExecutor(threads) as pool:
+        return [item for result in pool.map(send, range(threads)) for item in result]
+
+
+def complete_requests(worker, threads, record_ids):
+    """모든 요청에 '/싣고받고 완료 번호' → 완료에 성공한 기록 ID 목록"""
+    def send(thread):
+        client = _server.app.test_client()
+        completed = []
+        for record_id in record_ids[thread::threads]:
+            response = client.post('/webhook', json={'text': f'/싣고받고 완료 {record_id}', 'writerName': 'C'})
+            if response.get_json().get('success'):
+                completed.append(record_id)
+        return completed
+
+    with ThreadPoolExecutor(threads) as pool:
+        return [item for result in pool.map(send, range(threads)) for item in result]
+
+
+def edit_records(worker, threads, targets):
+    """[(기록 ID, 버전)] 을 같은 버전으로 수정 → 상태 코드 목록 [(기록 ID, 코드)]"""
+    def send(thread):
+        client = admin_client()
+        results = []
+        for record_id, version in targets[thread::threads]:
+            response = client.put(f'/api/records/{record_id}',
+                                  json={'item': f'edited-{worker}-{thread}', 'version': version})
+            results.append((record_id, response.status_code))
+        return results
+
+    with ThreadPoolExecutor(threads) as pool:
+        return [item for result in pool.map(send, range(threads)) for item in result]
+
+
+def employee_round_trip():
+    """직원 목록 API 내용을 CSV 로 내보내서 그대로 업로드 → 오류 목록 (적립분이 두 번 잡히면 안 됨)"""
+    errors = []
+    client = admin_client()
+    # 잔액이 기초 포인트와 달라지도록 조정 (적립/조정분이 업로드 뒤 두 번 잡히면 안 됨)
+    for emp_id in list(client.get('/api/employees').get_json())[:3]:
+        client.post(f'/api/employees/{emp_id}/points', json={'adjustment': 700, 'reason': '내보내기 확인'})
+    before = client.get('/api/employees').get_json()
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(['ID', '이름', '부서', '포인트'])
+    for emp_id, info in before.items():
+        writer.writerow([emp_id, info['name'], info['department'], info['total_points']])
+    response = client.post('/api/employees/upload', content_type='multipart/form-data',
+                           data={'file': (io.BytesIO(buffer.getvalue().encode('utf-8')), 'employees.csv')})
+    if response.status_code != 200:
+        errors.append(f"직원 업로드 {response.status_code}: {response.get_json()}")
+
+    # 기초 포인트 수정은 바뀐 만큼만 잔액에 반영
+    emp_id = next(iter(before))
+    client.put(f'/api/employees/{emp_id}', json={'total_points': before[emp_id]['total_points'] + 500})
+    after = client.get('/api/employees').get_json()
+    for other, info in before.items():
+        expected = info['balance'] + (500 if other == emp_id else 0)
+        if after[other]['balance'] != expected:
+            errors.append(f"{other} 잔액 {info['balance']} → {after[other]['balance']} (기대 {expected})")
+    check = client.get('/api/points/check').get_json()
+    if not check['ok']:
+        errors.append(f"업로드 후 원장 불일치: {check['mismatches'][:3]}")
+    print(f"직원 {len(before)}명 내보내기 → 업로드: 잔액 바뀐 직원 "
+          f"{sum(1 for other in before if after[other]['balance'] != before[other]['balance'])}명 (수정한 1명)")
+    return errors
+
+
+def run_phase(pool, processes, func, *args):
+    futures = [pool.submit(func, worker, *args) for worker in range(processes)]
+    return [item for future in futures for item in future.result()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='동시 웹훅 스트레스 테스트')
+    parser.add_argument('--backend', choices=['json', 'sqlite'], default='json')
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=10, help='스레드당 요청 수')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='stress_records_')
+    errors = []
+    try:
+        with open(os.path.join(workdir, 'point_data.json'), 'w', encoding='utf-8') as f:
+            f.write('[]')
+
+        with ProcessPoolExecutor(args.processes, initializer=init_worker,
+                                 initargs=(workdir, args.backend)) as pool:
+            started = time.perf_counter()
+            created = run_phase(pool, args.processes, create_requests, args.threads, args.requests)
+            expected = args.processes * args.threads * args.requests
+            ids = [record_id for _, record_id in created]
+            print(f"요청 {expected}건 → 생성 응답 {len(created)}건, {time.perf_counter() - started:.2f}초")
+            if len(created) != expected:
+                errors.append(f"생성 응답 {len(created)}건 (기대 {expected}건)")
+            if len(set(ids)) != len(ids):
+                errors.append(f"중복 ID {len(ids) - len(set(ids))}건")
+
+            # 모든 프로세스가 모든 요청을 동시에 접수 시도
+            started = time.perf_counter()
+            accepted = run_phase(pool, args.processes, accept_requests, args.threads, sorted(set(ids)))
+            print(f"접수 시도 {len(set(ids)) * args.processes}건 → 성공 {len(accepted)}건, "
+                  f"{time.perf_counter() - started:.2f}초")
+            winners = {}
+            for record_id, sender in accepted:
+                winners.setdefault(record_id, []).append(sender)
+            double = [record_id for record_id, senders in winners.items() if len(senders) > 1]
+            if double:
+                errors.append(f"두 명 이상 배정된 요청 {len(double)}건 (예: {double[:5]})")
+            if len(winners) != len(set(ids)):
+                errors.append(f"배정되지 않은 요청 {len(set(ids)) - len(winners)}건")
+
+            # 모든 프로세스가 모든 요청을 동시에 완료 시도: 기록마다 한 번만 완료 (원장 적립도 한 번)
+            started = time.perf_counter()
+            completed = run_phase(pool, args.processes, complete_requests, args.threads, sorted(winners))
+            print(f"완료 시도 {len(winners) * args.processes}건 → 성공 {len(completed)}건, "
+                  f"{time.perf_counter() - started:.2f}초")
+            if sorted(completed) != sorted(winners):
+                errors.append(f"완료 성공 {len(completed)}건 (기대: 요청마다 한 번, {len(winners)}건)")
+
+            # 완료 후 버전으로 동시에 수정: 기록마다 한 번만 성공해야 함
+            init_worker(workdir, args.backend, quiet=False)
+            current = [_server.store.get(record_id) for record_id in sorted(winners)]
+            versions = [(record['id'], record.get('version', 0)) for record in current if record]
+            edited = run_phase(pool, args.processes, edit_records, args.threads, versions)
+            ok = {}
+            for record_id, status in edited:
+                if status == 200:
+                    ok[record_id] = ok.get(record_id, 0) + 1
+                elif status != 409:
+                    errors.append(f"{record_id}번 수정 응답 {status}")
+            print(f"같은 버전으로 수정 {len(edited)}건 → 성공 {sum(ok.values())}건, "
+                  f"409 {sum(1 for _, status in edited if status == 409)}건")
+            if any(count != 1 for count in ok.values()) or len(ok) != len(versions):
+                errors.append('같은 버전 수정이 기록당 정확히 한 번 성공하지 않음')
+
+            errors += employee_round_trip()
+
+        # 새로 열어서 (저널/DB 에서 다시 읽어서) 최종 상태 확인
+        _server.store.close()
+        _server.ledger.close()
+        from storage import open_storage
+        store, employee_store = open_storage(args.backend, os.path.join(workdir, 'point_data.json'),
+                                os.path.join(workdir, 'employee_data.json'),
+                                os.path.join(workdir, 'point_data.db'))
+        records = {r['id']: r for r in store.all() if r.get('source') == 'webhook'}
+        lost = [marker for marker, record_id in created if record_id not in records]
+        if lost:
+            errors.append(f"사라진 기록 {len(lost)}건 (예: {lost[:5]})")
+        if len(records) != expected:
+            errors.append(f"저장된 기록 {len(records)}건 (기대 {expected}건)")
+        wrong = [record_id for record_id, senders in winners.items()
+                 if record_id in records and records[record_id].get('transporter') != senders[0]]
+        if wrong:
+            errors.append(f"전달자가 접수 성공 응답과 다른 기록 {len(wrong)}건")
+        print(f"다시 열어서 확인: 기록 {len(records)}건, 다음 ID {store.next_id()}")
+
+        # 포인트 원장: 기록마다 완료 적립이 한 번씩 (중복 적립/누락 없음)
+        from points_ledger import PointsLedger
+        ledger = PointsLedger(os.path.join(workdir, 'points_ledger.jsonl'))
+        employees = employee_store.load() if employee_store.exists() else {}
+        mismatches = ledger.verify(store.all(), employees)
+        print(f"포인트 원장: {ledger.stats()}, 불일치 {len(mismatches)}건")
+        if mismatches:
+            errors.append(f"포인트 원장 불일치 {len(mismatches)}건 (예: {mismatches[:3]})")
+        ledger.close()
+        store.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    for error in errors:
+        print(f"실패: {error}")
+    print('통과' if not errors else '실패')
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,148 @@
+import asyncio
+import itertools
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QueueFull(Exception):
+    """웹훅 수신 큐가 가득 참 (잠시 후 다시 보내야 함)"""
+
+
+class WebhookPipeline:
+    """웹훅 비동기 처리 파이프라인 (asyncio)
+
+    수신 쪽은 submit() 으로 큐에 넣기만 하고 바로 응답한다. 큐 크기가 정해져 있어서
+    처리가 밀리면 QueueFull 로 거절한다 (배압: 수신 쪽이 503 + Retry-After 로 응답).
+    처리 태스크 workers 개가 큐에서 꺼내 handler(payload) (파싱 → 기록 변경 → 알림 적재) 를
+    같은 수의 스레드 풀에서 실행한다. 기다리는 웹훅은 스레드를 잡지 않고 큐에만 있으므로
+    동시에 몰려도 디스크/네트워크를 기다리는 OS 스레드는 workers 개를 넘지 않는다.
+    처리 결과는 티켓 번호로 최근 keep_results 건까지 보관한다.
+    """
+
+    def __init__(self, handler, maxsize=1000, workers=4, keep_results=1000):
+        self.handler = handler
+        self.maxsize = maxsize
+        self.workers = workers
+        self.keep_results = keep_results
+        self._queue = None
+        self._executor = None
+        self._tasks = []
+        self._tickets = itertools.count(1)
+        self._queued = set()
+        self._results = OrderedDict()  # 티켓 → (응답 JSON, HTTP 상태), 오래된 결과가 앞
+        self._latencies = deque(maxlen=1000)
+        self._counters = {'accepted': 0, 'processed': 0, 'failed': 0, 'rejected': 0}
+        self._in_flight = 0
+
+    @property
+    def running(self):
+        return self._queue is not None
+
+    async def start(self):
+        """이벤트 루프 안에서 큐와 처리 태스크 시작"""
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='webhook')
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, timeout=30.0):
+        """남은 웹훅을 처리하고 종료 (timeout 초가 지나면 남은 것은 버림)"""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            print(f"웹훅 큐에 남은 {self._queue.qsize()}건을 처리하지 못하고 종료합니다")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._executor.shutdown(wait=True)
+        self._queue = None
+
+    # ------------------------------------------------------------------
+    # 수신
+    # ------------------------------------------------------------------
+    def submit(self, payload):
+        """큐에 넣고 티켓 번호 반환 (가득 차면 QueueFull)"""
+        ticket = next(self._tickets)
+        try:
+            self._queue.put_nowait((ticket, payload, time.perf_counter(), None))
+        except asyncio.QueueFull:
+            self._counters['rejected'] += 1
+            raise QueueFull()
+        self._accepted(ticket)
+        return ticket
+
+    async def process(self, payload, timeout=None):
+        """큐에 넣고 처리될 때까지 기다림 → (티켓, 응답 JSON, HTTP 상태)
+
+        큐가 가득 차 있으면 timeout 초까지 자리가 나길 기다리고, 그래도 없으면 QueueFull.
+        """
+        ticket = next(self._tickets)
+        future = asyncio.get_running_loop().create_future()
+        try:
+            await asyncio.wait_for(self._queue.put((ticket, payload, time.perf_counter(), future)), timeout)
+        except asyncio.TimeoutError:
+            self._counters['rejected'] += 1
+            raise QueueFull()
+        self._accepted(ticket)
+        body, status = await future
+        return ticket, body, status
+
+    def _accepted(self, ticket):
+        self._queued.add(ticket)
+        self._counters['accepted'] += 1
+
+    # ------------------------------------------------------------------
+    # 처리
+    # ------------------------------------------------------------------
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            ticket, payload, enqueued_at, future = await self._queue.get()
+            self._in_flight += 1
+            try:
+                result = await loop.run_in_executor(self._executor, self.handler, payload)
+                self._counters['processed'] += 1
+            except Exception as e:
+                print(f"웹훅 처리 오류 (티켓 {ticket}): {e}")
+                result = ({'success': False, 'error': str(e)}, 500)
+                self._counters['failed'] += 1
+            finally:
+                self._in_flight -= 1
+                self._queue.task_done()
+
+            self._latencies.append(time.perf_counter() - enqueued_at)
+            self._queued.discard(ticket)
+            self._results[ticket] = result
+            while len(self._results) > self.keep_results:
+                self._results.popitem(last=False)
+            if future is not None and not future.done():
+                future.set_result(result)
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    def status(self, ticket):
+        """티켓 처리 상태 → ('queued', None) / ('done', (응답 JSON, HTTP 상태)) / (None, None) (모르는 티켓)"""
+        if ticket in self._results:
+            return 'done', self._results[ticket]
+        if ticket in self._queued:
+            return 'queued', None
+        return None, None
+
+    def metrics(self):
+        """큐 길이, 처리 건수, 수신부터 처리 완료까지 지연 시간(초)"""
+        latencies = sorted(self._latencies)
+        result = dict(self._counters)
+        result['depth'] = self._queue.qsize() if self.running else 0
+        result['maxsize'] = self.maxsize
+        result['in_flight'] = self._in_flight
+        result['workers'] = self.workers
+        if latencies:
+            result['latency_avg'] = sum(latencies) / len(latencies)
+            result['latency_p95'] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            result['latency_max'] = latencies[-1]
+        else:
+            result['latency_avg'] = result['latency_p95'] = result['latency_max'] = 0.0
+        return result
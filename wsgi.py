@@ -0,0 +1,159 @@
+"""운영 서버 실행 (워커 프로세스 여러 개 x 스레드)
+
+사용법: python wsgi.py [--workers 4] [--threads 8] [--host 0.0.0.0] [--port 8000] [--server auto|gunicorn|builtin]
+
+- gunicorn 이 설치되어 있으면 gunicorn (gthread 워커) 으로 실행한다.
+- 없으면 (builtin) 리슨 소켓 하나를 워커 프로세스들이 나눠 받고, 워커마다 werkzeug 스레드 서버를 띄운다.
+  Windows 는 소켓을 자식 프로세스에 넘길 수 없으므로 프로세스 하나 + 스레드로 실행한다.
+- gunicorn/uWSGI 에서 직접 불러올 때는 'wsgi:application' (예: gunicorn -w 4 --threads 8 wsgi:application).
+
+server 는 워커 프로세스마다 따로 불러온다 (fork 전에 미리 불러오지 않음: 저장소 커밋 스레드/알림 워커는 워커마다 있어야 함).
+기록/직원/원장/ID 발급은 파일 락(JSON) 또는 SQLite 트랜잭션으로 워커끼리 공유하고,
+다른 워커의 변경은 server 의 갱신 스레드가 POINT_REFRESH_INTERVAL 초마다 리스너(순위/변경 피드/SSE)에 반영한다.
+
+SSE 스트림 (/api/stream) 은 연결 동안 스레드 하나를 차지하므로 워커당 SSE_MAX_STREAMS 개까지만 받는다
+(gunicorn: 기본 스레드 수의 절반, 나머지 스레드는 일반 API 용. 넘으면 503 → 화면은 폴링으로 전환).
+builtin 은 연결마다 스레드를 새로 만들므로 일반 API 가 막히지 않아서 더 많이 (기본 100개) 받는다.
+"""
+import argparse
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:  # gunicorn 없음 → builtin
+    BaseApplication = None
+
+if __name__ != '__main__':
+    # gunicorn/uWSGI 가 'wsgi:application' 으로 불러올 때 (워커 프로세스마다)
+    from server import app as application
+
+
+def quiet_handler():
+    """요청마다 찍는 접근 로그를 끈 werkzeug 요청 핸들러 (오류 로그는 그대로)"""
+    from werkzeug.serving import WSGIRequestHandler
+
+    class QuietRequestHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    return QuietRequestHandler
+
+
+def serve_worker(host, port, fd=None):
+    """워커 프로세스 하나: server 를 불러와서 스레드 서버 실행 (fd 는 부모가 연 리슨 소켓)"""
+    from werkzeug.serving import make_server
+    from server import app
+
+    # 종료 신호를 받으면 atexit (저장소 flush, 원장 체크포인트) 가 돌도록 정상 종료
+    signal.signal(signal.SIGTERM, lambda *args: sys.exit(0))
+    httpd = make_server(host, port, app, threaded=True, request_handler=quiet_handler(), fd=fd)
+    print(f"워커 {os.getpid()} 시작")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+
+def serve_builtin(host, port, workers):
+    """리슨 소켓 하나를 만들고 워커 프로세스 workers 개에 넘겨서 실행 (죽은 워커는 다시 띄움)"""
+    if workers == 1 or os.name == 'nt':
+        if workers > 1:
+            print("Windows 에서는 워커 프로세스 하나로 실행합니다 (여러 프로세스는 gunicorn/uWSGI 사용)")
+        serve_worker(host, port)
+        return
+
+    listener = socket.create_server((host, port), backlog=1024)
+    fd = listener.fileno()
+    command = [sys.executable, os.path.abspath(__file__), '--worker-fd', str(fd), '--host', host, '--port', str(port)]
+
+    def spawn():
+        return subprocess.Popen(command, pass_fds=(fd,))
+
+    # SIGTERM 도 Ctrl+C 처럼 워커를 정리하고 종료
+    signal.signal(signal.SIGTERM, lambda *args: sys.exit(0))
+    children = [spawn() for _ in range(workers)]
+    try:
+        while True:
+            time.sleep(1)
+            for i, child in enumerate(children):
+                if child.poll() is not None:
+                    print(f"워커 {child.pid} 종료 (코드 {child.returncode}), 다시 시작")
+                    children[i] = spawn()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        for child in children:
+            child.terminate()
+        for child in children:
+            try:
+                child.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                child.kill()
+        listener.close()
+
+
+def serve_gunicorn(host, port, workers, threads):
+    """gunicorn (gthread 워커) 으로 실행"""
+    class Application(BaseApplication):
+        def load_config(self):
+            settings = {
+                'bind': f'{host}:{port}',
+                'workers': workers,
+                'threads': threads,
+                'worker_class': 'gthread',
+                'preload_app': False,
+                'timeout': 60
+            }
+            for key, value in settings.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from server import app
+            return app
+
+    Application().run()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='포인트 관리 서버 (운영용, 여러 워커)')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 8000)))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('WEB_WORKERS', 4)))
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('WEB_THREADS', 8)),
+                        help='워커당 스레드 수 (gunicorn 만, builtin 은 연결마다 스레드)')
+    parser.add_argument('--server', choices=('auto', 'gunicorn', 'builtin'), default='auto')
+    parser.add_argument('--worker-fd', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker_fd is not None:
+        serve_worker(args.host, args.port, args.worker_fd)
+        return 0
+
+    server = args.server
+    if server == 'auto':
+        server = 'gunicorn' if BaseApplication and os.name != 'nt' else 'builtin'
+    if server == 'gunicorn' and BaseApplication is None:
+        print("gunicorn 이 설치되어 있지 않습니다 (pip install gunicorn)")
+        return 1
+
+    print(f"서버 시작: http://{args.host}:{args.port} ({server}, 워커 {args.workers}개"
+          f"{f', 스레드 {args.threads}개' if server == 'gunicorn' else ''})")
+    # 워커 프로세스는 server 를 불러올 때 이 값을 읽는다 (환경 변수로 직접 지정하면 그 값)
+    if server == 'gunicorn':
+        os.environ.setdefault('SSE_MAX_STREAMS', str(max(1, args.threads // 2)))
+        serve_gunicorn(args.host, args.port, args.workers, args.threads)
+    else:
+        os.environ.setdefault('SSE_MAX_STREAMS', '100')
+        serve_builtin(args.host, args.port, args.workers)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())